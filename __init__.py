@@ -1,5 +1,7 @@
 from . import models
+from . import wizard
+from . import controllers
 
 # Import post_init_hook into the module’s root namespace.
 # Odoo requires this so it can find and execute the hook after installation.
-from .hooks import post_init_hook
\ No newline at end of file
+from .hooks import post_init_hook, uninstall_hook
\ No newline at end of file
@@ -1,6 +1,6 @@
 {
     'name': 'Legal Practice Management',
-    'version': '1.0',
+    'version': '1.9',
     'summary': 'Transform Odoo Projects, CRM and Contacts into Legal Practice Management for law firms, with suitable legal fields in CRM client profiles.',
     'description': 'Customizes the Odoo Project app for legal case and matter management, and adds suitable legal fields in the client\'s CRM profile.',
     'author': 'Mohamed Essam',
@@ -11,9 +11,15 @@
         'security/security.xml',
         'security/ir.model.access.csv',
         'data/legal_case_data.xml',
+        'data/legal_deadline_data.xml',
         'views/project_views.xml',
         'views/crm_client_fields_view.xml',
         'views/res_partner_view.xml',
+        'views/legal_case_report_views.xml',
+        'views/legal_deadline_views.xml',
+        'views/legal_migration_task_views.xml',
+        'wizard/legal_case_import_views.xml',
+        'wizard/legal_lead_convert_views.xml',
     ],
     'installable': True,
     'application': True,
@@ -33,5 +39,6 @@
     # Here we call a function that ensures 'sale_project' is uninstalled,
     # because that module introduces unwanted links between Sales and Projects
     # which conflict with the Legal Practice Management logic.
-    'post_init_hook': 'post_init_hook'
+    'post_init_hook': 'post_init_hook',
+    'uninstall_hook': 'uninstall_hook',
 }
\ No newline at end of file
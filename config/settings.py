@@ -6,7 +6,7 @@ Centralized configuration settings.
 
 # Module configuration
 MODULE_NAME = 'legal_practice_management'
-MODULE_VERSION = '1.0'
+MODULE_VERSION = '1.9'
 MODULE_AUTHOR = 'Mohamed Essam'
 MODULE_WEBSITE = 'https://essamsalem.com'
 
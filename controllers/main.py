@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management Controllers
+HTTP endpoints of the legal practice management module.
+"""
+
+import io
+import json
+import tempfile
+
+from werkzeug.exceptions import BadRequest, Forbidden
+from werkzeug.wsgi import wrap_file
+
+from odoo import http
+from odoo.http import request, content_disposition
+
+from ..utils.instrumentation import format_prometheus, get_metrics
+
+
+class LegalCaseRegisterController(http.Controller):
+
+    @http.route('/legal_practice_management/case_register/<string:file_format>', type='http', auth='user')
+    def export_case_register(self, file_format, entity_type='all', domain=None, **kwargs):
+        """Download the case register as CSV or XLSX.
+
+        The register is spooled to a temporary file on disk and streamed back
+        from there, so the worker never holds the whole register in memory.
+        """
+        if file_format not in ('csv', 'xlsx'):
+            raise BadRequest()
+        domain = json.loads(domain) if domain else []
+        Register = request.env['legal.case.register']
+
+        spool = tempfile.TemporaryFile()
+        if file_format == 'csv':
+            stream = io.TextIOWrapper(spool, encoding='utf-8-sig', newline='')
+            Register.export_register(stream, 'csv', entity_type, domain)
+            stream.flush()
+            stream.detach()
+            mimetype = 'text/csv;charset=utf-8'
+        else:
+            Register.export_register(spool, 'xlsx', entity_type, domain)
+            mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        size = spool.tell()
+        spool.seek(0)
+
+        return request.make_response(
+            wrap_file(request.httprequest.environ, spool),
+            headers=[
+                ('Content-Type', mimetype),
+                ('Content-Length', size),
+                ('Content-Disposition', content_disposition('case_register.%s' % file_format)),
+            ],
+        )
+
+
+class LegalMetricsController(http.Controller):
+
+    @http.route('/legal_practice_management/metrics', type='http', auth='user')
+    def metrics(self, **kwargs):
+        """Expose the instrumentation counters in Prometheus text format.
+
+        Counters live in each worker process, so with several workers every
+        scrape shows the worker that answered it.
+        """
+        if not request.env.user.has_group('base.group_system'):
+            raise Forbidden()
+        return request.make_response(
+            format_prometheus(get_metrics()),
+            headers=[('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')],
+        )
@@ -15,11 +15,20 @@ _logger = logging.getLogger(__name__)
 # - In Legal Practice Management, projects represent legal cases, not sales orders.
 # - Keeping 'sale_project' would create unwanted dependencies and behaviors,
 #   so we ensure it’s uninstalled cleanly at module setup.
+#
+# It also links the existing cases sharing a party, so the related matters
+# are complete from the start.
 def post_init_hook(env):
     """Automatically uninstall sale_project right after module installation."""
+    env['legal.case.link'].rebuild()
     module = env['ir.module.module'].search([('name', '=', 'sale_project')], limit=1)
     if module and module.state == 'installed':
         _logger.info("Uninstalling 'sale_project' via post_init_hook.")
         module.button_uninstall()
     else:
-        _logger.info("'sale_project' module is not installed.")
\ No newline at end of file
+        _logger.info("'sale_project' module is not installed.")
+
+
+def uninstall_hook(env):
+    """Drop the case statistics trigger, which would outlive the module."""
+    env['legal.case.report']._drop_sql_objects(env.cr)
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Backfill legal_entity_type from the Case / Matter tags.
+
+    On a large table the backfill is queued for the online migration cron,
+    one committed chunk at a time, instead of locking project_project for the
+    rest of the upgrade.
+    """
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    case_tag = env.ref('legal_practice_management.project_tag_case', raise_if_not_found=False)
+    matter_tag = env.ref('legal_practice_management.project_tag_matter', raise_if_not_found=False)
+    # Task assignments are plain SQL, the tag ids are inlined as integers
+    tag_ids = {
+        'case': int(case_tag.id) if case_tag else 'NULL',
+        'matter': int(matter_tag.id) if matter_tag else 'NULL',
+    }
+    env['legal.migration.task']._queue_sql_backfill(
+        'backfill project_project.legal_entity_type', 'project_project', """
+            legal_entity_type = CASE
+                WHEN EXISTS (
+                    SELECT 1 FROM project_project_project_tags_rel rel
+                    WHERE rel.project_project_id = t.id AND rel.project_tags_id = {case}
+                ) THEN 'case'
+                WHEN EXISTS (
+                    SELECT 1 FROM project_project_project_tags_rel rel
+                    WHERE rel.project_project_id = t.id AND rel.project_tags_id = {matter}
+                ) THEN 'matter'
+            END
+        """.format(**tag_ids))
+    env['project.project'].invalidate_model(['legal_entity_type'])
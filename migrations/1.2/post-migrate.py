@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Parse the docket numbers of existing projects, online on large databases."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['legal.migration.task']._queue_recompute('project.project', [
+        'first_degree_case_number', 'first_degree_case_year',
+        'second_degree_case_number', 'second_degree_case_year',
+    ])
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+from odoo.addons.legal_practice_management.utils.migration import add_column
+
+DOCKET_COLUMNS = [
+    'first_degree_case_number',
+    'first_degree_case_year',
+    'second_degree_case_number',
+    'second_degree_case_year',
+]
+
+
+def migrate(cr, version):
+    """Create the parsed docket columns up front so the ORM does not compute
+    them for every project in one go; post-migrate backfills them in chunks."""
+    for column in DOCKET_COLUMNS:
+        add_column(cr, 'project_project', column, 'int4')
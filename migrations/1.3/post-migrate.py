@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Build the case details search text of existing projects, online on
+    large databases."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['legal.migration.task']._queue_recompute('project.project', ['legal_search_text'])
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+from odoo.addons.legal_practice_management.utils.migration import add_column
+
+
+def migrate(cr, version):
+    """Create the case details search column up front so the ORM does not
+    compute it for every project in one go; post-migrate backfills it in chunks."""
+    add_column(cr, 'project_project', 'legal_search_text', 'varchar')
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Normalize the phone numbers of existing cases and partners, online on
+    large databases."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    Tasks = env['legal.migration.task']
+    Tasks._queue_recompute('project.project', ['opponent_phone_e164', 'opponent_attorney_phone_e164'])
+    Tasks._queue_recompute('res.partner', ['legal_phone_e164', 'legal_mobile_e164'])
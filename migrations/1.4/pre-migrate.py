@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+from odoo.addons.legal_practice_management.utils.migration import add_column
+
+PHONE_KEY_COLUMNS = {
+    'project_project': ['opponent_phone_e164', 'opponent_attorney_phone_e164'],
+    'res_partner': ['legal_phone_e164', 'legal_mobile_e164'],
+}
+
+
+def migrate(cr, version):
+    """Create the normalized phone columns up front so the ORM does not
+    compute them for every record in one go; post-migrate backfills them in chunks."""
+    for table, columns in PHONE_KEY_COLUMNS.items():
+        for column in columns:
+            add_column(cr, table, column, 'varchar')
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+from odoo.tools.sql import column_exists
+
+from odoo.addons.legal_practice_management.config.settings import CLIENT_FIELDS
+from odoo.addons.legal_practice_management.models.legal_client_profile import IDENTITY_KEY_FIELDS
+from odoo.addons.legal_practice_management.utils.migration import move_columns
+
+PROFILE_OWNER_TABLES = ['res_partner', 'crm_lead']
+
+
+def migrate(cr, version):
+    """Move the client profile columns of partners and leads into
+    legal_client_profile, then drop them to narrow both tables."""
+    for table in PROFILE_OWNER_TABLES:
+        columns = [
+            column for column in CLIENT_FIELDS + list(IDENTITY_KEY_FIELDS.values())
+            if column_exists(cr, table, column)
+        ]
+        if not columns:
+            continue
+        move_columns(cr, table, 'legal_client_profile', 'legal_profile_id', columns)
+        cr.execute("ALTER TABLE %s %s" % (
+            table, ', '.join('DROP COLUMN %s' % column for column in columns)))
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    for model_name in ('res.partner', 'crm.lead', 'legal.client.profile'):
+        env[model_name].invalidate_model()
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+from odoo.addons.legal_practice_management.utils.migration import add_column, backfill_in_chunks
+
+
+def migrate(cr, version):
+    """Put the existing file numbers in the global series, before the unique
+    index on (scope, number) replaces the one on the number alone."""
+    add_column(cr, 'project_project', 'file_number_scope', 'varchar')
+    backfill_in_chunks(
+        cr, 'project_project',
+        "file_number_scope = CASE WHEN t.office_file_number > 0 THEN 'global' END",
+    )
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Date the cases already in a closed stage from their last change, so
+    the archival delay counts from when they were closed, not from today."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['legal.migration.task']._queue_sql_backfill(
+        'backfill project_project.legal_closed_date', 'project_project', """
+            legal_closed_date = (
+                SELECT t.write_date::date
+                FROM project_project_stage s
+                WHERE s.id = t.stage_id AND s.fold
+            )
+        """)
+    env['project.project'].invalidate_model(['legal_closed_date'])
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Link the existing cases sharing a client, opponent or opponent attorney.
+
+    The links table is new, so filling it locks nothing the users work with;
+    the cases are only read, one id range at a time.
+
+    Also renormalize the stored phone numbers, which now follow the record's
+    own country instead of the company of whoever saved the record.
+
+    The phonetic key of the English name moved to the client profile, where
+    the name lives; the ORM fills the new column, the old one is dropped.
+    """
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['legal.case.link'].rebuild()
+    Tasks = env['legal.migration.task']
+    Tasks._queue_recompute('project.project', ['opponent_phone_e164', 'opponent_attorney_phone_e164'])
+    Tasks._queue_recompute('res.partner', ['legal_phone_e164', 'legal_mobile_e164'])
+    cr.execute("ALTER TABLE res_partner DROP COLUMN IF EXISTS legal_phonetic_key_en")
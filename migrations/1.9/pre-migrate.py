@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from odoo.tools.sql import table_exists
+
+# Indexes replaced or made redundant by the partial indexes of the active cases
+DROPPED_INDEXES = [
+    'project_project_active_court_name_index',  # btree, rebuilt as a trigram index
+    'project_project_active_opponent_name_key_index',
+    'project_project_office_file_number_index',
+    'project_project_legal_search_text_index',
+]
+
+
+def migrate(cr, version):
+    """Drop the btree indexes ilike searches could not use and the full
+    indexes the partial ones duplicate, with their unbuilt online tasks."""
+    for name in DROPPED_INDEXES:
+        cr.execute(f'DROP INDEX IF EXISTS "{name}"')
+    # The task table is only created by the 1.7 upgrade, after pre-migrate
+    # scripts: databases upgraded from an older version have no task yet
+    if table_exists(cr, 'legal_migration_task'):
+        cr.execute("""
+            DELETE FROM legal_migration_task
+            WHERE name = ANY(%s) AND state != 'done'
+        """, [DROPPED_INDEXES])
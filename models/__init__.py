@@ -1,6 +1,19 @@
 from . import constants
 from . import legal_case_mixin
+from . import file_number_counter
 from . import project
+from . import legal_reminder_mixin
+from . import legal_deadline_rule
+from . import legal_deadline
+from . import legal_hearing
+from . import legal_case_register
+from . import legal_case_report
+from . import legal_conflict_check
+from . import legal_client_profile
+from . import legal_client_identity
+from . import legal_phone
 from . import crm_lead
 from . import res_partner
-from . import ir_ui_menu 
\ No newline at end of file
+from . import ir_ui_menu
+from . import legal_case_link
+from . import legal_migration_task
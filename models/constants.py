@@ -45,4 +45,71 @@ CASE_TYPE_SELECTION = [
     ('family', _('Family')),
     ('administrative', _('Administrative')),
     ('other', _('Other')),
-] 
\ No newline at end of file
+] 
+# Office file number series used when no partitioning is configured
+FILE_NUMBER_DEFAULT_SCOPE = 'global'
+
+# Ways the office file number series can be partitioned
+FILE_NUMBER_SCOPE_SELECTION = [
+    ('global', _('One series for the whole database')),
+    ('company', _('One series per company')),
+    ('branch', _('One series per branch')),
+    ('year', _('One series per filing year')),
+]
+
+# Legal entity type options, kept in sync with the Case / Matter tags
+LEGAL_ENTITY_TYPE_SELECTION = [
+    ('case', _('Case')),
+    ('matter', _('Matter')),
+]
+
+# Hearing states
+HEARING_STATE_SELECTION = [
+    ('scheduled', _('Scheduled')),
+    ('postponed', _('Postponed')),
+    ('held', _('Held')),
+    ('cancelled', _('Cancelled')),
+]
+
+# Deadline states
+DEADLINE_STATE_SELECTION = [
+    ('open', _('Open')),
+    ('done', _('Done')),
+    ('cancelled', _('Cancelled')),
+]
+
+# Events a deadline rule counts from
+DEADLINE_TRIGGER_SELECTION = [
+    ('filing', _('Lawsuit Filing')),
+    ('hearing', _('Hearing')),
+    ('judgment', _('Judgment')),
+]
+
+# Units of deadline rule offsets
+DEADLINE_OFFSET_UNIT_SELECTION = [
+    ('days', _('Days')),
+    ('weeks', _('Weeks')),
+    ('months', _('Months')),
+]
+
+# Online migration task types
+MIGRATION_TASK_TYPE_SELECTION = [
+    ('index', _('Index')),
+    ('recompute', _('Recompute Fields')),
+    ('sql', _('SQL Backfill')),
+]
+
+# Online migration task states
+MIGRATION_TASK_STATE_SELECTION = [
+    ('pending', _('Pending')),
+    ('running', _('Running')),
+    ('done', _('Done')),
+    ('failed', _('Failed')),
+]
+
+# Parties two related cases can share
+CASE_LINK_TYPE_SELECTION = [
+    ('client', _('Same Client')),
+    ('opponent', _('Same Opponent')),
+    ('opponent_attorney', _('Same Opponent Attorney')),
+]
@@ -5,25 +5,65 @@ Extends crm.lead with legal practice management fields.
 """
 
 from odoo import models, fields, _
-from .constants import LANGUAGE_SELECTION, ENTITY_TYPE_SELECTION, SEX_SELECTION
+from ..config.settings import CLIENT_FIELDS
+from ..utils.normalize import normalize_identifier
+
+# Identity numbers used to find the existing client of a lead
+LEAD_MATCH_FIELDS = ['x_national_id', 'x_commercial_register_no']
 
 class CrmLead(models.Model):
-    _inherit = 'crm.lead'
+    _inherit = ['crm.lead', 'legal.client.identity.mixin']
     _description = 'Legal Case Lead'
 
-    x_client_open_date = fields.Date(string=_('Client Open Date'))
-    x_name_en = fields.Char(string=_('Name in English'))
-    x_nationality = fields.Many2one('res.country', string=_('Nationality'))
-    x_residence_country = fields.Many2one('res.country', string=_('Residence Country'))
-    x_national_id = fields.Char(string=_('National ID'))
-    x_passport_number = fields.Char(string=_('Passport Number'))
-    x_birth_date = fields.Date(string=_('Birth Date'))
-    x_sex = fields.Selection(SEX_SELECTION, string=_('Sex'))
-    x_preferred_language = fields.Selection(LANGUAGE_SELECTION, string=_('Preferred Language'))
-    x_communication_preferences = fields.Text(string=_('Communication Preferences'))
-    x_representative = fields.Char(string=_('Representative'))
-    x_representative_title = fields.Char(string=_('Representative Title'))
-    x_entity_type = fields.Selection(ENTITY_TYPE_SELECTION, string=_('Entity Type'))
-    x_commercial_register_no = fields.Char(string=_('Commercial Register No.'))
-    x_tax_registration_number = fields.Char(string=_('Tax Registration Number'))
-    x_company_activity = fields.Char(string=_('Company Activity')) 
\ No newline at end of file
+    def _get_identity_exclusions(self):
+        """The lead's own customer is not a duplicate of the lead."""
+        exclusions = super()._get_identity_exclusions()
+        if self.partner_id:
+            exclusions.add(('res.partner', self.partner_id.id))
+        return exclusions
+
+    # ========== Client Conversion ==========
+
+    def _get_client_field_values(self):
+        """Return the CLIENT_FIELDS of the lead as values for res.partner."""
+        self.ensure_one()
+        return {
+            name: self._fields[name].convert_to_write(self[name], self)
+            for name in CLIENT_FIELDS
+        }
+
+    def _prepare_customer_values(self, partner_name, is_company=False, parent_id=False):
+        """Carry the client profile over to the partner created from the lead."""
+        values = super()._prepare_customer_values(partner_name, is_company=is_company, parent_id=parent_id)
+        values.update({
+            name: value for name, value in self._get_client_field_values().items() if value
+        })
+        return values
+
+    def _get_identity_match_keys(self):
+        self.ensure_one()
+        return [key for key in (normalize_identifier(self[name]) for name in LEAD_MATCH_FIELDS) if key]
+
+    def _find_identity_partners(self):
+        """Find the existing partner of each lead from its identity numbers,
+        with one query for all the leads.
+
+        Returns:
+            dict: Lead id -> res.partner, for the leads with a match
+        """
+        identifiers = [lead[name] for lead in self for name in LEAD_MATCH_FIELDS if lead[name]]
+        if not identifiers:
+            return {}
+        result = self.env['legal.client.identity.mixin'].find_identity_matches(identifiers)
+        readable = set(result['partners'].ids)
+        partners = {}
+        for lead in self:
+            partner_ids = sorted({
+                res_id
+                for key in lead._get_identity_match_keys()
+                for model_name, res_id in result['matches'].get(key, [])
+                if model_name == 'res.partner' and res_id in readable
+            })
+            if partner_ids:
+                partners[lead.id] = self.env['res.partner'].browse(partner_ids[0])
+        return partners
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - File Number Counter
+Gapless allocator for office file numbers.
+"""
+
+import time
+
+from odoo import models, fields, api, _
+from .constants import FILE_NUMBER_DEFAULT_SCOPE, FILE_NUMBER_SCOPE_SELECTION
+from ..utils.instrumentation import record_lock
+
+# How office file numbers are partitioned: global, company, branch or year
+FILE_NUMBER_SCOPE_PARAM = 'legal_practice_management.file_number_scope'
+
+class LegalFileNumberCounter(models.Model):
+    """One row per numbering scope holding the last allocated file number.
+
+    Allocation is a single ``UPDATE ... RETURNING`` on the scope row. The row
+    lock is held by the allocating transaction only, and a rollback hands the
+    numbers back, so the series stays free of gaps and duplicates.
+
+    The series can be partitioned per company, per branch or per filing year
+    (``legal_practice_management.file_number_scope``). Every partition has
+    its own row, so offices allocating in different scopes never wait on
+    each other.
+    """
+    _name = 'legal.file.number.counter'
+    _description = 'Office File Number Counter'
+    _rec_name = 'scope'
+
+    scope = fields.Char(string=_("Scope"), required=True, readonly=True)
+    last_number = fields.Integer(string=_("Last Number"), default=0, readonly=True)
+
+    _sql_constraints = [
+        ('scope_uniq', 'unique(scope)', 'Each numbering scope can only have one counter.'),
+    ]
+
+    @api.model
+    def _get_scope_type(self):
+        """Return the configured partitioning of the file number series."""
+        scope_type = self.env['ir.config_parameter'].sudo().get_param(FILE_NUMBER_SCOPE_PARAM)
+        return scope_type if scope_type in dict(FILE_NUMBER_SCOPE_SELECTION) else FILE_NUMBER_DEFAULT_SCOPE
+
+    @api.model
+    def _make_scope(self, company=None, filing_date=None, scope_type=None):
+        """Return the numbering scope of a case.
+
+        Args:
+            company (res.company): Company of the case, the current company when empty
+            filing_date (date): Lawsuit filing date, today when empty
+            scope_type (str): Partitioning to use, the configured one by default
+
+        Returns:
+            str: Scope key, e.g. ``global``, ``company:1``, ``branch:4`` or ``year:2024``
+        """
+        scope_type = scope_type or self._get_scope_type()
+        company = company or self.env.company
+        if scope_type == 'company':
+            return f'company:{company.root_id.id}'
+        if scope_type == 'branch':
+            return f'branch:{company.id}'
+        if scope_type == 'year':
+            return f'year:{(filing_date or fields.Date.context_today(self)).year}'
+        return FILE_NUMBER_DEFAULT_SCOPE
+
+    @api.model
+    def _reserve(self, count=1, scope=FILE_NUMBER_DEFAULT_SCOPE):
+        """Reserve a contiguous block of file numbers.
+
+        Args:
+            count (int): How many numbers to reserve
+            scope (str): Numbering scope the block is taken from
+
+        Returns:
+            range: The reserved numbers, in ascending order
+        """
+        if count <= 0:
+            return range(0)
+        started = time.perf_counter()
+        self.env.cr.execute("""
+            UPDATE legal_file_number_counter
+            SET last_number = last_number + %s
+            WHERE scope = %s
+            RETURNING last_number
+        """, (count, scope))
+        result = self.env.cr.fetchone()
+        record_lock(self.env.cr.rowcount, time.perf_counter() - started)
+        if result is None:
+            self._seed(scope)
+            return self._reserve(count, scope)
+        self.invalidate_model(['last_number'])
+        return range(result[0] - count + 1, result[0] + 1)
+
+    @api.model
+    def _bump(self, number, scope=FILE_NUMBER_DEFAULT_SCOPE):
+        """Move the counter forward past a manually entered file number.
+
+        Args:
+            number (int): Highest file number written outside the allocator
+            scope (str): Numbering scope the number belongs to
+        """
+        if not number or number <= 0:
+            return
+        started = time.perf_counter()
+        self.env.cr.execute("""
+            UPDATE legal_file_number_counter
+            SET last_number = GREATEST(last_number, %s)
+            WHERE scope = %s
+        """, (number, scope))
+        record_lock(self.env.cr.rowcount, time.perf_counter() - started)
+        if not self.env.cr.rowcount:
+            self._seed(scope)
+            self._bump(number, scope)
+            return
+        self.invalidate_model(['last_number'])
+
+    @api.model
+    def _seed(self, scope):
+        """Create the counter row of a scope from the numbers already in use.
+
+        Concurrent seeders are harmless: the first insert wins and the others
+        fall through to the regular update path.
+        """
+        self.env['project.project'].flush_model(['office_file_number', 'file_number_scope'])
+        self.env.cr.execute("""
+            INSERT INTO legal_file_number_counter
+                (scope, last_number, create_uid, create_date, write_uid, write_date)
+            SELECT %s, COALESCE(MAX(office_file_number), 0),
+                   %s, NOW() AT TIME ZONE 'UTC', %s, NOW() AT TIME ZONE 'UTC'
+            FROM project_project
+            WHERE office_file_number > 0 AND file_number_scope = %s
+            ON CONFLICT (scope) DO NOTHING
+        """, (scope, self.env.uid, self.env.uid, scope))
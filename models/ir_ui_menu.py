@@ -1,16 +1,44 @@
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 
 class IrUiMenu(models.Model):
     _inherit = 'ir.ui.menu'
 
     @api.model
+    @tools.ormcache('self.env.lang', 'menu_id')
     def _get_menu_name(self, menu_id):
-        """Get the translated menu name based on the current language"""
-        menu = self.browse(menu_id)
-        if menu.name == "Cases & Matters":
+        """Get the translated menu name based on the current language.
+
+        Cached per language; writing menus or their translations clears it.
+        """
+        return self.browse(menu_id)._translate_menu_name()
+
+    def _translate_menu_name(self):
+        self.ensure_one()
+        if self.name == "Cases & Matters":
             return _("Cases & Matters")
-        return menu.name
+        return self.name
 
     def get_menu_name(self):
         """Return the translated menu name"""
-        return self._get_menu_name(self.id) 
\ No newline at end of file
+        return self._get_menu_name(self.id)
+
+    @api.model
+    @tools.ormcache('self.env.lang')
+    def _get_legal_menu_names(self):
+        """Translated names of all legal practice menus, read in one go.
+
+        Returns:
+            dict: Menu id -> translated name
+        """
+        menu_ids = self.env['ir.model.data'].sudo().search([
+            ('module', '=', 'legal_practice_management'),
+            ('model', '=', 'ir.ui.menu'),
+        ]).mapped('res_id')
+        return {menu.id: menu._translate_menu_name() for menu in self.sudo().browse(menu_ids).exists()}
+
+    def _update_field_translations(self, field_name, translations, digest=None):
+        # Translations are written without going through write(), which
+        # clears the registry caches for menus
+        result = super()._update_field_translations(field_name, translations, digest=digest)
+        self.env.registry.clear_cache()
+        return result
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Case Links
+Precomputed related-matters graph between cases sharing a party.
+"""
+
+import logging
+
+from odoo import models, fields, api, _
+from .constants import CASE_LINK_TYPE_SELECTION
+from ..utils.migration import iter_id_ranges
+
+_logger = logging.getLogger(__name__)
+
+# Case fields the links are derived from
+CASE_LINK_SOURCE_FIELDS = [
+    'partner_id',
+    'opponent_name',
+    'opponent_attorney_name',
+    'tag_ids',
+]
+
+# Partner fields the client link of a case is read from; parent and company
+# flag decide the commercial partner
+CASE_LINK_PARTNER_FIELDS = ['name', 'parent_id', 'is_company']
+
+# Related matters counted per case, the smart button shows at most this
+RELATED_CASE_COUNT_LIMIT = 100
+
+# One SELECT per link type: (project id, link type, party key, party name)
+CASE_LINK_SELECTS = [
+    """
+    SELECT p.id, 'client', cp.id::varchar, cp.name
+    FROM project_project p
+    JOIN res_partner rp ON rp.id = p.partner_id
+    JOIN res_partner cp ON cp.id = COALESCE(rp.commercial_partner_id, rp.id)
+    WHERE p.legal_entity_type IS NOT NULL AND {where}
+    """,
+    """
+    SELECT p.id, 'opponent', p.opponent_name_key, p.opponent_name
+    FROM project_project p
+    WHERE p.legal_entity_type IS NOT NULL AND p.opponent_name_key <> '' AND {where}
+    """,
+    """
+    SELECT p.id, 'opponent_attorney', p.opponent_attorney_name_key, p.opponent_attorney_name
+    FROM project_project p
+    WHERE p.legal_entity_type IS NOT NULL AND p.opponent_attorney_name_key <> '' AND {where}
+    """,
+]
+
+
+class LegalCaseLink(models.Model):
+    """The parties of each case, as a case-to-party adjacency table.
+
+    A case has at most one row per link type: its client (the commercial
+    partner, so contacts of one company count as one client), its opponent
+    and its opponent's attorney, the names matched on their normalized keys.
+    Two cases are related when they share a (link type, party key) row, so
+    the related matters of a case are one indexed self-join. Storing the
+    shared parties instead of every pair of related cases keeps the table
+    linear in the number of cases, even for a party involved in thousands of
+    them.
+
+    Rows are derived data: cases resync theirs when a source field changes,
+    partners those of their cases when their name or commercial partner
+    changes, and ``rebuild`` recreates the whole table.
+    """
+    _name = 'legal.case.link'
+    _description = 'Legal Case Party Link'
+    _log_access = False
+    _order = 'project_id, link_type'
+
+    project_id = fields.Many2one(
+        'project.project', string=_("Case"), required=True, ondelete='cascade', readonly=True)
+    link_type = fields.Selection(
+        CASE_LINK_TYPE_SELECTION, string=_("Shared Party"), required=True, readonly=True)
+    party_key = fields.Char(string=_("Party Key"), required=True, readonly=True)
+    party_name = fields.Char(string=_("Party"), readonly=True)
+
+    _sql_constraints = [
+        ('project_link_type_uniq', 'unique(project_id, link_type)',
+         'A case has only one party of each kind.'),
+    ]
+
+    def init(self):
+        """Index the parties, so the cases sharing one are an index lookup."""
+        self.pool.post_init(
+            self.env['legal.migration.task']._ensure_index, 'legal_case_link_party_index', self._table,
+            ['link_type', 'party_key', 'project_id'],
+        )
+
+    # ========== Maintenance ==========
+    @api.model
+    def _flush_sources(self, projects=None):
+        """Flush the case and partner values the links are read from."""
+        fnames = ['partner_id', 'opponent_name', 'opponent_name_key',
+                  'opponent_attorney_name', 'opponent_attorney_name_key', 'legal_entity_type']
+        if projects is None:
+            self.env['project.project'].flush_model(fnames)
+        else:
+            projects.flush_recordset(fnames)
+        self.env['res.partner'].flush_model(['commercial_partner_id', 'name'])
+
+    @api.model
+    def _insert_links(self, where, params):
+        """Insert the links of the cases matching ``where`` on ``p``."""
+        selects = ' UNION ALL '.join(select.format(where=where) for select in CASE_LINK_SELECTS)
+        self.env.cr.execute(f"""
+            INSERT INTO legal_case_link (project_id, link_type, party_key, party_name)
+            {selects}
+        """, params * len(CASE_LINK_SELECTS))
+        return self.env.cr.rowcount
+
+    @api.model
+    def _sync_projects(self, projects):
+        """Replace the links of the given cases with their current parties.
+
+        Args:
+            projects (project.project): Cases whose parties may have changed
+        """
+        if not projects:
+            return
+        self._flush_sources(projects)
+        self.env.cr.execute("DELETE FROM legal_case_link WHERE project_id = ANY(%s)", [projects.ids])
+        self._insert_links("p.id = ANY(%s)", [projects.ids])
+        self.invalidate_model()
+        projects.invalidate_recordset(['related_case_count'])
+
+    @api.model
+    def _sync_partners(self, partners, keys_changed=True):
+        """Resync the client links of the cases of partners that changed.
+
+        Args:
+            partners (res.partner): Changed partners
+            keys_changed (bool): Whether the commercial partners may have
+                changed, otherwise only the client names are updated
+        """
+        if not partners:
+            return
+        if keys_changed:
+            projects = self.env['project.project'].with_context(active_test=False).search([
+                ('partner_id', 'child_of', partners.ids),
+                ('legal_entity_type', '!=', False),
+            ])
+            self._sync_projects(projects)
+            return
+        self._flush_sources()
+        self.env.cr.execute("""
+            UPDATE legal_case_link l
+            SET party_name = cp.name
+            FROM res_partner cp
+            WHERE cp.id = ANY(%s)
+              AND l.link_type = 'client'
+              AND l.party_key = cp.id::varchar
+              AND l.party_name IS DISTINCT FROM cp.name
+        """, [partners.commercial_partner_id.ids])
+        self.invalidate_model(['party_name'])
+
+    @api.model
+    def rebuild(self, chunk_size=50000):
+        """Recreate the links of every case from their current parties.
+
+        Used to fill the table for existing data; also repairs links left
+        stale by changes made outside the ORM, such as partner merges.
+
+        Args:
+            chunk_size (int): Width of the case id ranges inserted at once
+
+        Returns:
+            int: Number of links created
+        """
+        self._flush_sources()
+        self.env.cr.execute("DELETE FROM legal_case_link")
+        count = 0
+        for start, stop in iter_id_ranges(self.env.cr, 'project_project', chunk_size):
+            count += self._insert_links("p.id >= %s AND p.id < %s", [start, stop])
+        self.env.cr.execute("ANALYZE legal_case_link")
+        self.invalidate_model()
+        self.env['project.project'].invalidate_model(['related_case_count'])
+        _logger.info("Rebuilt %s legal case links", count)
+        return count
+
+    # ========== Queries ==========
+    @api.model
+    def _count_related(self, project_ids):
+        """Count the other cases sharing a party with each case.
+
+        At most ``RELATED_CASE_COUNT_LIMIT`` cases are read per party, so a
+        party involved in thousands of cases costs as much as a small one.
+
+        Args:
+            project_ids (list): Case ids
+
+        Returns:
+            dict: Number of related cases by case id, capped at
+                ``RELATED_CASE_COUNT_LIMIT``, cases without any left out
+        """
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT mine.project_id, LEAST(COUNT(DISTINCT other.project_id), %(limit)s)
+            FROM legal_case_link mine
+            CROSS JOIN LATERAL (
+                SELECT l.project_id
+                FROM legal_case_link l
+                WHERE l.link_type = mine.link_type
+                  AND l.party_key = mine.party_key
+                  AND l.project_id <> mine.project_id
+                LIMIT %(limit)s
+            ) AS other
+            WHERE mine.project_id = ANY(%(ids)s)
+            GROUP BY mine.project_id
+        """, {'ids': list(project_ids), 'limit': RELATED_CASE_COUNT_LIMIT})
+        return dict(self.env.cr.fetchall())
+
+    @api.model
+    def _get_related(self, project_id):
+        """Return the other cases sharing a party with a case.
+
+        Args:
+            project_id (int): Case id
+
+        Returns:
+            list: Related case ids
+        """
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT DISTINCT other.project_id
+            FROM legal_case_link mine
+            JOIN legal_case_link other
+              ON other.link_type = mine.link_type
+             AND other.party_key = mine.party_key
+             AND other.project_id <> mine.project_id
+            WHERE mine.project_id = %s
+        """, [project_id])
+        return [row[0] for row in self.env.cr.fetchall()]
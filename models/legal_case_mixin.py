@@ -4,7 +4,7 @@ legal practice management Mixin
 Provides common functionality for legal practice management.
 """
 
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 
 class LegalCaseMixin(models.AbstractModel):
     """Mixin class for legal practice management functionality"""
@@ -19,6 +19,16 @@ class LegalCaseMixin(models.AbstractModel):
     @api.model
     def get_legal_terminology(self):
         """Return common legal terminology translations"""
+        return dict(self._get_legal_terminology())
+
+    @api.model
+    @tools.ormcache('self.env.lang')
+    def _get_legal_terminology(self):
+        """Build the terminology once per registry and language.
+
+        Code translations only change when modules are loaded, which resets
+        the registry caches, so no explicit invalidation is needed.
+        """
         return {
             'plaintiff': _("Plaintiff"),
             'defendant': _("Defendant"),
@@ -30,4 +40,21 @@ class LegalCaseMixin(models.AbstractModel):
             'lawsuit': _("Lawsuit"),
             'filing': _("Filing"),
             'appeal': _("Appeal"),
-        } 
\ No newline at end of file
+        }
+
+    @api.model
+    def get_legal_labels(self):
+        """Return every legal label of the current language in one call.
+
+        Meant for the web client, which loads the labels together with the
+        menus instead of asking for them one by one.
+
+        Returns:
+            dict: ``app_menu_name``, ``terminology`` (key -> label) and
+            ``menus`` (menu id -> name) of the module's menus
+        """
+        return {
+            'app_menu_name': self.get_app_menu_name(),
+            'terminology': self.get_legal_terminology(),
+            'menus': dict(self.env['ir.ui.menu']._get_legal_menu_names()),
+        }
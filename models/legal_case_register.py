@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Case Register
+Streaming export of the legal case register.
+"""
+
+import csv
+import uuid
+
+from odoo import models, api, _
+from odoo.exceptions import UserError
+from odoo.osv import expression
+from odoo.tools import SQL
+from odoo.tools.translate import _lt
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+# Register columns: (header, project field or (relation, field))
+REGISTER_COLUMNS = [
+    (_lt("File Number in the Office"), 'office_file_number'),
+    (_lt("Legal Entity Type"), 'legal_entity_type'),
+    (_lt("Name"), 'name'),
+    (_lt("Court Name"), 'court_name'),
+    (_lt("Court Circle"), 'court_circle'),
+    (_lt("Lawsuit Filing Date"), 'lawsuit_filing_date'),
+    (_lt("First Degree Case Number/Year"), 'first_degree_case_number_year'),
+    (_lt("Second Degree Case Number/Year"), 'second_degree_case_number_year'),
+    (_lt("Client"), ('partner_id', 'name')),
+    (_lt("Client National ID"), ('partner_id', 'x_national_id')),
+    (_lt("Client Commercial Register No."), ('partner_id', 'x_commercial_register_no')),
+    (_lt("Client Phone"), ('partner_id', 'phone')),
+    (_lt("Client Status"), 'client_status'),
+    (_lt("Opponent Status"), 'opponent_status'),
+    (_lt("Opponent Name"), 'opponent_name'),
+    (_lt("Opponent Address"), 'opponent_address'),
+    (_lt("Opponent Phone"), 'opponent_phone'),
+    (_lt("Opponent Attorney Name"), 'opponent_attorney_name'),
+    (_lt("Opponent Attorney Phone"), 'opponent_attorney_phone'),
+]
+
+# Domains of the All Legal Entities, Cases and Matters actions
+REGISTER_DOMAINS = {
+    'all': [('legal_entity_type', 'in', ['case', 'matter'])],
+    'case': [('legal_entity_type', '=', 'case')],
+    'matter': [('legal_entity_type', '=', 'matter')],
+}
+
+
+class LegalCaseRegister(models.AbstractModel):
+    """Stream the case register to CSV or XLSX.
+
+    Project ids are fetched in chunks from a named server-side cursor and the
+    ORM cache is dropped after every chunk, so peak memory depends on the
+    chunk size and not on the number of exported cases.
+    """
+    _name = 'legal.case.register'
+    _description = 'Legal Case Register Export'
+
+    @api.model
+    def export_register(self, fileobj, file_format='csv', entity_type='all', domain=None, chunk_size=2000):
+        """Write the case register to a file object.
+
+        Args:
+            fileobj: Text stream for CSV, binary file object for XLSX
+            file_format (str): 'csv' or 'xlsx'
+            entity_type (str): 'all', 'case' or 'matter', as in the menu actions
+            domain (list): Extra domain on project.project
+            chunk_size (int): Number of projects fetched per round trip
+
+        Returns:
+            int: Number of exported cases
+        """
+        if entity_type not in REGISTER_DOMAINS:
+            raise UserError(_("Unknown legal entity type: %s") % entity_type)
+        full_domain = expression.AND([REGISTER_DOMAINS[entity_type], domain or []])
+        rows = self._iter_register_rows(full_domain, chunk_size)
+        if file_format == 'csv':
+            return self._write_csv(rows, fileobj)
+        if file_format == 'xlsx':
+            return self._write_xlsx(rows, fileobj)
+        raise UserError(_("Unsupported export format: %s") % file_format)
+
+    @api.model
+    def _get_register_headers(self):
+        return [str(header) for header, _field in REGISTER_COLUMNS]
+
+    @api.model
+    def _iter_register_rows(self, domain, chunk_size):
+        """Yield one list of cell values per project matching the domain."""
+        Project = self.env['project.project']
+        query = Project._search(domain, order='office_file_number, id')
+        cursor_name = 'legal_case_register_%s' % uuid.uuid4().hex
+        cr = self.env.cr
+        cr.execute(SQL(
+            "DECLARE %s NO SCROLL CURSOR FOR %s",
+            SQL.identifier(cursor_name), query.select(SQL.identifier(Project._table, 'id')),
+        ))
+        try:
+            selections = {
+                name: dict(Project._fields[name]._description_selection(self.env))
+                for name in ('legal_entity_type', 'client_status', 'opponent_status')
+            }
+            while True:
+                cr.execute(SQL("FETCH FORWARD %s FROM %s", chunk_size, SQL.identifier(cursor_name)))
+                ids = [row[0] for row in cr.fetchall()]
+                if not ids:
+                    break
+                for project in Project.browse(ids):
+                    yield [self._get_cell(project, field, selections) for _header, field in REGISTER_COLUMNS]
+                # Forget the chunk so the cache does not grow with the register
+                self.env.invalidate_all(flush=False)
+        finally:
+            cr.execute(SQL("CLOSE %s", SQL.identifier(cursor_name)))
+
+    @api.model
+    def _get_cell(self, project, field, selections):
+        if isinstance(field, tuple):
+            value = project[field[0]][field[1]]
+        else:
+            value = project[field]
+            if field in selections:
+                value = selections[field].get(value, value)
+        if value is False or value is None:
+            return ''
+        return value
+
+    @api.model
+    def _write_csv(self, rows, stream):
+        writer = csv.writer(stream)
+        writer.writerow(self._get_register_headers())
+        count = 0
+        for row in rows:
+            writer.writerow([cell.isoformat() if hasattr(cell, 'isoformat') else cell for cell in row])
+            count += 1
+        return count
+
+    @api.model
+    def _write_xlsx(self, rows, fileobj):
+        if xlsxwriter is None:
+            raise UserError(_("The xlsxwriter library is required to export XLSX files."))
+        # constant_memory flushes every row to disk as soon as it is written
+        workbook = xlsxwriter.Workbook(fileobj, {'constant_memory': True, 'in_memory': False})
+        worksheet = workbook.add_worksheet(_("Case Register"))
+        date_format = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+        worksheet.write_row(0, 0, self._get_register_headers())
+        count = 0
+        for count, row in enumerate(rows, start=1):
+            for col, cell in enumerate(row):
+                if hasattr(cell, 'isoformat'):
+                    worksheet.write_datetime(count, col, cell, date_format)
+                else:
+                    worksheet.write(count, col, cell)
+        workbook.close()
+        return count
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Case Statistics
+Pre-aggregated case counts for the partner dashboards.
+"""
+
+import logging
+
+from odoo import models, fields, api, _
+from .constants import LEGAL_ENTITY_TYPE_SELECTION
+
+_logger = logging.getLogger(__name__)
+
+# Bump when the SQL objects below change, init() then recreates them
+CASE_REPORT_VERSION = 'legal_case_report v2'
+
+# Aggregated dimensions: (column, type, expression on a project_project row)
+CASE_REPORT_DIMENSIONS = [
+    ('company_id', 'int', '{row}.company_id'),
+    ('legal_entity_type', 'varchar', '{row}.legal_entity_type'),
+    ('court_name', 'varchar', '{row}.court_name'),
+    ('court_circle', 'varchar', '{row}.court_circle'),
+    ('client_status', 'varchar', '{row}.client_status'),
+    ('stage_id', 'int', '{row}.stage_id'),
+    ('filing_year', 'int', 'EXTRACT(YEAR FROM {row}.lawsuit_filing_date)::int'),
+]
+
+# Cases counted in the statistics: archived closed cases stay in
+CASE_REPORT_MEMBERSHIP = (
+    "({row}.active OR {row}.legal_closed_date IS NOT NULL) "
+    "AND {row}.legal_entity_type IN ('case', 'matter')"
+)
+
+# Project columns whose updates can move a case to another report row
+CASE_REPORT_SOURCE_COLUMNS = [
+    'company_id', 'legal_entity_type', 'court_name', 'court_circle', 'client_status',
+    'stage_id', 'lawsuit_filing_date', 'active', 'legal_closed_date',
+]
+
+
+class LegalCaseReport(models.Model):
+    """Case counts by court, circle, client status, stage, filing year and type.
+
+    The counts live in ``legal_case_report_data``, one row per combination
+    of the dimensions, so pivot and graph views read a few hundred rows
+    instead of grouping the live project table. They are maintained
+    incrementally: a row trigger on ``project_project`` appends the +1/-1
+    changes of every created, edited or deleted case to an insert-only
+    delta table, without touching the shared counters, and a cron folds the
+    pending deltas into the counts. Row ids are a hash of the dimensions, so
+    they survive refreshes.
+    """
+    _name = 'legal.case.report'
+    _description = 'Legal Case Statistics'
+    _auto = False
+    _rec_name = 'court_name'
+    _order = 'case_count desc'
+
+    company_id = fields.Many2one('res.company', string=_("Company"), readonly=True)
+    legal_entity_type = fields.Selection(
+        LEGAL_ENTITY_TYPE_SELECTION, string=_("Legal Entity Type"), readonly=True)
+    court_name = fields.Char(string=_("Court Name"), readonly=True)
+    court_circle = fields.Char(string=_("Court Circle"), readonly=True)
+    client_status = fields.Selection(
+        [('plaintiff', _('Plaintiff')), ('defendant', _('Defendant'))],
+        string=_("Client Status"), readonly=True)
+    stage_id = fields.Many2one('project.project.stage', string=_("Stage"), readonly=True)
+    is_closed = fields.Boolean(string=_("Closed"), readonly=True)
+    filing_year = fields.Integer(string=_("Filing Year"), group_operator=False, readonly=True)
+    case_count = fields.Integer(string=_("Number of Cases"), readonly=True)
+
+    def init(self):
+        """Create the counts, the delta log, the trigger and the report view.
+
+        They are only recreated, with one full aggregation of the cases,
+        when ``CASE_REPORT_VERSION`` changed; other upgrades leave them alone.
+        """
+        cr = self.env.cr
+        cr.execute("SELECT obj_description(to_regclass(%s), 'pg_class')", [self._table])
+        if cr.fetchone()[0] == CASE_REPORT_VERSION:
+            return
+        _logger.info("Creating the legal case statistics (%s)", CASE_REPORT_VERSION)
+        self._drop_sql_objects(cr)
+
+        columns = ', '.join(f'{column} {column_type}' for column, column_type, _expr in CASE_REPORT_DIMENSIONS)
+        cr.execute(f"""
+            CREATE TABLE legal_case_report_data (
+                id bigint PRIMARY KEY, {columns}, case_count int NOT NULL
+            );
+            CREATE TABLE legal_case_report_delta ({columns}, delta int NOT NULL);
+            CREATE FUNCTION legal_case_report_track() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'UPDATE'
+                   AND ({self._dimensions_sql('OLD')}, {self._membership_sql('OLD')})
+                       IS NOT DISTINCT FROM ({self._dimensions_sql('NEW')}, {self._membership_sql('NEW')}) THEN
+                    RETURN NULL;
+                END IF;
+                IF TG_OP <> 'INSERT' AND {self._membership_sql('OLD')} THEN
+                    INSERT INTO legal_case_report_delta VALUES ({self._dimensions_sql('OLD')}, -1);
+                END IF;
+                IF TG_OP <> 'DELETE' AND {self._membership_sql('NEW')} THEN
+                    INSERT INTO legal_case_report_delta VALUES ({self._dimensions_sql('NEW')}, 1);
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql;
+            CREATE TRIGGER legal_case_report_track
+                AFTER INSERT OR DELETE OR UPDATE OF {', '.join(CASE_REPORT_SOURCE_COLUMNS)}
+                ON project_project
+                FOR EACH ROW EXECUTE FUNCTION legal_case_report_track();
+            CREATE VIEW {self._table} AS (
+                SELECT d.id, {', '.join(f'd.{column}' for column, _type, _expr in CASE_REPORT_DIMENSIONS)},
+                       COALESCE(s.fold, FALSE) AS is_closed,
+                       d.case_count
+                FROM legal_case_report_data d
+                LEFT JOIN project_project_stage s ON s.id = d.stage_id
+            );
+            COMMENT ON VIEW {self._table} IS %s;
+        """, [CASE_REPORT_VERSION])
+        self._recount()
+
+    @api.model
+    def _drop_sql_objects(self, cr):
+        """Drop the report objects of any version, materialized view included."""
+        cr.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [self._table])
+        kind = {'m': 'MATERIALIZED VIEW', 'v': 'VIEW'}.get((cr.fetchone() or [None])[0])
+        if kind:
+            cr.execute(f"DROP {kind} {self._table} CASCADE")
+        cr.execute("""
+            DROP TRIGGER IF EXISTS legal_case_report_track ON project_project;
+            DROP FUNCTION IF EXISTS legal_case_report_track();
+            DROP TABLE IF EXISTS legal_case_report_data, legal_case_report_delta;
+        """)
+
+    @api.model
+    def _dimensions_sql(self, row, aliased=False):
+        return ', '.join(
+            expression.format(row=row) + (f' AS {column}' if aliased else '')
+            for column, _type, expression in CASE_REPORT_DIMENSIONS
+        )
+
+    @api.model
+    def _membership_sql(self, row):
+        return f'({CASE_REPORT_MEMBERSHIP.format(row=row)})'
+
+    @api.model
+    def _key_sql(self):
+        """Stable row id: 52 bits of the md5 of the dimensions, which stays an
+        exact integer in the web client."""
+        names = ', '.join(column for column, _type, _expr in CASE_REPORT_DIMENSIONS)
+        return f"('x' || substr(md5(ROW({names})::text), 1, 13))::bit(52)::bigint"
+
+    @api.model
+    def refresh_report(self, force=False):
+        """Fold the pending case changes into the counts.
+
+        Args:
+            force (bool): Recount every case instead, e.g. after changes made
+                with the trigger disabled. Case writes wait for the recount.
+
+        Returns:
+            bool: Whether the counts changed
+        """
+        self.env['project.project'].flush_model(CASE_REPORT_SOURCE_COLUMNS)
+        if force:
+            self._recount()
+            return True
+        names = ', '.join(column for column, _type, _expr in CASE_REPORT_DIMENSIONS)
+        # Deltas committed after this statement's snapshot stay for the next run
+        self.env.cr.execute(f"""
+            WITH consumed AS (
+                DELETE FROM legal_case_report_delta RETURNING *
+            ), changes AS (
+                SELECT {names}, SUM(delta)::int AS delta
+                FROM consumed
+                GROUP BY {names}
+            )
+            INSERT INTO legal_case_report_data AS d
+            SELECT {self._key_sql()}, {names}, delta
+            FROM changes
+            WHERE delta <> 0
+            ON CONFLICT (id) DO UPDATE SET case_count = d.case_count + EXCLUDED.case_count
+        """)
+        if not self.env.cr.rowcount:
+            return False
+        self.env.cr.execute("DELETE FROM legal_case_report_data WHERE case_count <= 0")
+        self.invalidate_model()
+        _logger.info("Refreshed the legal case statistics")
+        return True
+
+    @api.model
+    def _recount(self):
+        """Rebuild the counts from the cases, blocking case writes meanwhile."""
+        names = ', '.join(column for column, _type, _expr in CASE_REPORT_DIMENSIONS)
+        self.env.cr.execute(f"""
+            LOCK TABLE legal_case_report_delta IN EXCLUSIVE MODE;
+            DELETE FROM legal_case_report_delta;
+            DELETE FROM legal_case_report_data;
+            INSERT INTO legal_case_report_data
+            SELECT {self._key_sql()}, *
+            FROM (
+                SELECT {self._dimensions_sql('p', aliased=True)}, COUNT(*)
+                FROM project_project p
+                WHERE {self._membership_sql('p')}
+                GROUP BY {names}
+            ) AS aggregated;
+        """)
+        self.invalidate_model()
+        _logger.info("Recounted the legal case statistics")
+
+    @api.model
+    def _cron_refresh_report(self):
+        self.refresh_report()
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Client Identity
+Legal client profile and identity lookups shared by partners and leads.
+"""
+
+from collections import defaultdict
+
+from odoo import models, fields, api, _
+from .legal_client_profile import IDENTITY_KEY_FIELDS
+from ..config.settings import CLIENT_FIELDS
+from ..utils.normalize import normalize_identifier
+
+# Models linked to a legal client profile, with their table
+IDENTITY_MODELS = {
+    'res.partner': 'res_partner',
+    'crm.lead': 'crm_lead',
+}
+
+
+class LegalClientIdentityMixin(models.AbstractModel):
+    """Legal client profile fields with normalized identity lookups.
+
+    The profile lives in ``legal.client.profile`` and is exposed through
+    related fields, which are only read when a view or a flow asks for
+    them. The profile row is created the first time one of its fields is
+    set, so partners and leads that are not legal clients have none.
+    """
+    _name = 'legal.client.identity.mixin'
+    _description = 'Legal Client Identity Mixin'
+
+    legal_profile_id = fields.Many2one(
+        'legal.client.profile', string=_('Legal Client Profile'),
+        index='btree_not_null', ondelete='set null', copy=False)
+
+    x_client_open_date = fields.Date(related='legal_profile_id.x_client_open_date', readonly=False)
+    x_name_en = fields.Char(related='legal_profile_id.x_name_en', readonly=False)
+    x_nationality = fields.Many2one(related='legal_profile_id.x_nationality', readonly=False)
+    x_residence_country = fields.Many2one(related='legal_profile_id.x_residence_country', readonly=False)
+    x_national_id = fields.Char(related='legal_profile_id.x_national_id', readonly=False)
+    x_passport_number = fields.Char(related='legal_profile_id.x_passport_number', readonly=False)
+    x_birth_date = fields.Date(related='legal_profile_id.x_birth_date', readonly=False)
+    x_sex = fields.Selection(related='legal_profile_id.x_sex', readonly=False)
+    x_preferred_language = fields.Selection(related='legal_profile_id.x_preferred_language', readonly=False)
+    x_communication_preferences = fields.Text(related='legal_profile_id.x_communication_preferences', readonly=False)
+    x_representative = fields.Char(related='legal_profile_id.x_representative', readonly=False)
+    x_representative_title = fields.Char(related='legal_profile_id.x_representative_title', readonly=False)
+    x_entity_type = fields.Selection(related='legal_profile_id.x_entity_type', readonly=False)
+    x_commercial_register_no = fields.Char(related='legal_profile_id.x_commercial_register_no', readonly=False)
+    x_tax_registration_number = fields.Char(related='legal_profile_id.x_tax_registration_number', readonly=False)
+    x_company_activity = fields.Char(related='legal_profile_id.x_company_activity', readonly=False)
+
+    x_identity_duplicate_warning = fields.Char(
+        string=_('Possible Duplicate Client'),
+        compute='_compute_identity_duplicate_warning'
+    )
+
+    @api.depends(*IDENTITY_KEY_FIELDS)
+    def _compute_identity_duplicate_warning(self):
+        """Warn when another partner or lead shares an identity number."""
+        keys = {
+            normalize_identifier(record[field_name])
+            for record in self
+            for field_name in IDENTITY_KEY_FIELDS
+        } - {False}
+        rows = self._search_identity_rows(keys) if keys else []
+
+        for record in self:
+            excluded = record._get_identity_exclusions()
+            names = []
+            for model_name, res_id, display_name, field_name in self._iter_identity_hits(rows, record):
+                if (model_name, res_id) in excluded:
+                    continue
+                names.append(_("%(name)s (%(field)s)", name=display_name,
+                               field=self.env[model_name]._fields[field_name].string))
+            record.x_identity_duplicate_warning = _(
+                "A client with the same identity number already exists: %s", ", ".join(names)
+            ) if names else False
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        missing = [
+            vals for vals in vals_list
+            if not vals.get('legal_profile_id') and any(vals.get(name) for name in CLIENT_FIELDS)
+        ]
+        if missing:
+            # Empty profiles, the related fields fill them in
+            profiles = self.env['legal.client.profile'].create([{} for _vals in missing])
+            for vals, profile in zip(missing, profiles):
+                vals['legal_profile_id'] = profile.id
+        return super().create(vals_list)
+
+    def write(self, vals):
+        if 'legal_profile_id' not in vals and any(vals.get(name) for name in CLIENT_FIELDS):
+            self._ensure_legal_profile()
+        return super().write(vals)
+
+    def unlink(self):
+        profiles = self.legal_profile_id
+        result = super().unlink()
+        profiles.unlink()
+        return result
+
+    def copy_data(self, default=None):
+        """Give each copy its own copy of the profile, as the profile fields
+        are related fields that are not copied themselves."""
+        vals_list = super().copy_data(default=default)
+        if default and 'legal_profile_id' in default:
+            return vals_list
+        copied = [(vals, record.legal_profile_id) for record, vals in zip(self, vals_list) if record.legal_profile_id]
+        if copied:
+            profiles = self.env['legal.client.profile'].create([
+                profile.copy_data()[0] for _vals, profile in copied
+            ])
+            for (vals, _profile), profile in zip(copied, profiles):
+                vals['legal_profile_id'] = profile.id
+        return vals_list
+
+    def _ensure_legal_profile(self):
+        """Give a profile to the records that have none, with one create and
+        one UPDATE."""
+        missing = self.filtered(lambda record: not record.legal_profile_id)
+        if not missing:
+            return
+        profiles = self.env['legal.client.profile'].create([{} for _record in missing])
+        self.env.cr.execute(f"""
+            UPDATE {self._table} AS t
+            SET legal_profile_id = v.profile_id
+            FROM unnest(%s::int[], %s::int[]) AS v(id, profile_id)
+            WHERE t.id = v.id
+        """, [missing.ids, profiles.ids])
+        missing.invalidate_recordset(['legal_profile_id'])
+        missing.modified(['legal_profile_id'])
+
+    def _get_identity_exclusions(self):
+        """Records that must not be reported as duplicates of this one.
+
+        Returns:
+            set: (model name, id) pairs
+        """
+        self.ensure_one()
+        return {(self._name, self._origin.id)}
+
+    @api.model
+    def _iter_identity_hits(self, rows, record):
+        """Yield the rows sharing at least one identity key with the record."""
+        record_keys = {
+            key_name: normalize_identifier(record[field_name])
+            for field_name, key_name in IDENTITY_KEY_FIELDS.items()
+        }
+        for row in rows:
+            for field_name, key_name in IDENTITY_KEY_FIELDS.items():
+                if record_keys[key_name] and row[key_name] == record_keys[key_name]:
+                    yield row['model'], row['id'], row['name'], field_name
+                    break
+
+    @api.model
+    def _search_identity_rows(self, keys):
+        """Fetch the partners and leads matching any of the keys in one query.
+
+        Every key column of the profiles is compared with ``= ANY``, so
+        PostgreSQL combines the btree indexes of the key columns, then joins
+        the few matching profiles to their partner or lead.
+
+        Args:
+            keys (iterable): Normalized identity keys
+
+        Returns:
+            list: One dict per matching record with model, id, name and keys
+        """
+        self.env['legal.client.profile'].flush_model(IDENTITY_KEY_FIELDS.values())
+        key_columns = ', '.join('profile.%s' % key_name for key_name in IDENTITY_KEY_FIELDS.values())
+        condition = ' OR '.join(
+            'profile.%s = ANY(%%(keys)s)' % key_name for key_name in IDENTITY_KEY_FIELDS.values())
+        for model_name in IDENTITY_MODELS:
+            self.env[model_name].flush_model(['legal_profile_id', 'name', 'active'])
+        query = ' UNION ALL '.join(
+            "SELECT '%s' AS model, owner.id, owner.name, %s FROM legal_client_profile profile "
+            "JOIN %s owner ON owner.legal_profile_id = profile.id WHERE owner.active AND (%s)"
+            % (model_name, key_columns, table, condition)
+            for model_name, table in IDENTITY_MODELS.items()
+        )
+        self.env.cr.execute(query, {'keys': list(keys)})
+        return self.env.cr.dictfetchall()
+
+    @api.model
+    def find_identity_matches(self, identifiers):
+        """Find existing partners and leads for many identity numbers at once.
+
+        Args:
+            identifiers (iterable): Raw identity numbers, in any format
+
+        Returns:
+            dict: ``partners`` and ``leads`` recordsets of all matches, and
+            ``matches`` mapping each normalized key to the matching
+            (model name, id) pairs
+        """
+        keys = {normalize_identifier(value) for value in identifiers} - {False}
+        matches = defaultdict(list)
+        ids = defaultdict(set)
+        for row in self._search_identity_rows(keys) if keys else []:
+            for key_name in IDENTITY_KEY_FIELDS.values():
+                if row[key_name] in keys:
+                    matches[row[key_name]].append((row['model'], row['id']))
+            ids[row['model']].add(row['id'])
+        return {
+            'partners': self.env['res.partner'].browse(sorted(ids['res.partner']))._filter_access_rules('read'),
+            'leads': self.env['crm.lead'].browse(sorted(ids['crm.lead']))._filter_access_rules('read'),
+            'matches': dict(matches),
+        }
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Client Profile
+Legal client profile kept out of the partner and lead tables.
+"""
+
+from odoo import models, fields, api, _
+from .constants import LANGUAGE_SELECTION, ENTITY_TYPE_SELECTION, SEX_SELECTION
+from ..utils.normalize import normalize_identifier, phonetic_key
+
+# Identity fields and the stored key each one is matched on
+IDENTITY_KEY_FIELDS = {
+    'x_national_id': 'x_national_id_key',
+    'x_passport_number': 'x_passport_number_key',
+    'x_commercial_register_no': 'x_commercial_register_no_key',
+    'x_tax_registration_number': 'x_tax_registration_number_key',
+}
+
+
+class LegalClientProfile(models.Model):
+    """The CLIENT_FIELDS of one partner or lead.
+
+    Stored in its own table, one row per legal client, so that res_partner
+    and crm_lead stay narrow for the many flows reading them that have no
+    use for the profile. Partners and leads expose the profile through
+    related fields and create it the first time one of them is set.
+
+    Each identity number also gets a stored, btree-indexed key (separators
+    stripped, Arabic-Indic digits folded, upper-cased), so existing clients
+    can be found with index lookups. The phonetic key of the English name,
+    used by the conflict check, is kept here too.
+    """
+    _name = 'legal.client.profile'
+    _description = 'Legal Client Profile'
+
+    x_client_open_date = fields.Date(string=_('Client Open Date'))
+    x_name_en = fields.Char(string=_('Name in English'))
+    x_nationality = fields.Many2one('res.country', string=_('Nationality'))
+    x_residence_country = fields.Many2one('res.country', string=_('Residence Country'))
+    x_national_id = fields.Char(string=_('National ID'))
+    x_passport_number = fields.Char(string=_('Passport Number'))
+    x_birth_date = fields.Date(string=_('Birth Date'))
+    x_sex = fields.Selection(SEX_SELECTION, string=_('Sex'))
+    x_preferred_language = fields.Selection(LANGUAGE_SELECTION, string=_('Preferred Language'))
+    x_communication_preferences = fields.Text(string=_('Communication Preferences'))
+    x_representative = fields.Char(string=_('Representative'))
+    x_representative_title = fields.Char(string=_('Representative Title'))
+    x_entity_type = fields.Selection(ENTITY_TYPE_SELECTION, string=_('Entity Type'))
+    x_commercial_register_no = fields.Char(string=_('Commercial Register No.'))
+    x_tax_registration_number = fields.Char(string=_('Tax Registration Number'))
+    x_company_activity = fields.Char(string=_('Company Activity'))
+
+    x_national_id_key = fields.Char(
+        compute='_compute_identity_keys', store=True, index=True, copy=False)
+    x_passport_number_key = fields.Char(
+        compute='_compute_identity_keys', store=True, index=True, copy=False)
+    x_commercial_register_no_key = fields.Char(
+        compute='_compute_identity_keys', store=True, index=True, copy=False)
+    x_tax_registration_number_key = fields.Char(
+        compute='_compute_identity_keys', store=True, index=True, copy=False)
+    x_name_en_phonetic_key = fields.Char(
+        compute='_compute_name_en_phonetic_key', store=True, index=True, copy=False)
+
+    @api.depends(*IDENTITY_KEY_FIELDS)
+    def _compute_identity_keys(self):
+        for profile in self:
+            for field_name, key_name in IDENTITY_KEY_FIELDS.items():
+                profile[key_name] = normalize_identifier(profile[field_name])
+
+    @api.depends('x_name_en')
+    def _compute_name_en_phonetic_key(self):
+        for profile in self:
+            profile.x_name_en_phonetic_key = phonetic_key(profile.x_name_en)
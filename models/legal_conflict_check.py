@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Conflict Check
+Conflict-of-interest detection between clients and opponents.
+"""
+
+from contextlib import contextmanager
+
+from psycopg2.extensions import TRANSACTION_STATUS_INERROR
+
+from odoo import models, api
+from ..utils.normalize import normalize_name, phonetic_key
+
+# Opponent parties of a case: (role, name field, name key field, phonetic key field)
+OPPONENT_PARTIES = [
+    ('opponent', 'opponent_name', 'opponent_name_key', 'opponent_phonetic_key'),
+    ('opponent_attorney', 'opponent_attorney_name', 'opponent_attorney_name_key', 'opponent_attorney_phonetic_key'),
+]
+
+# Scores of the match kinds, fuzzy matches are scaled below phonetic ones
+SCORE_EXACT = 1.0
+SCORE_PHONETIC = 0.9
+SCORE_FUZZY_FACTOR = 0.8
+
+
+class LegalConflictCheck(models.AbstractModel):
+    """Match case parties against clients and other cases' opponents.
+
+    Names are compared on precomputed keys: the normalized name, a
+    script-independent phonetic key, and trigram similarity when pg_trgm is
+    available. Phonetic keys are coarse ('Omar', 'Amr' and 'عمر' share one),
+    so a phonetic hit also needs a trigram similarity above the threshold,
+    against the name or, across scripts, the client's English name; without
+    pg_trgm only exact matches are reported. Opponents are only matched
+    against clients: partners with a legal client profile or a case. Any
+    number of cases is checked with a constant number of queries.
+    """
+    _name = 'legal.conflict.check'
+    _description = 'Legal Conflict of Interest Check'
+
+    @api.model
+    def check_projects(self, projects, threshold=0.4):
+        """Run the conflict check for one case or a whole batch.
+
+        Args:
+            projects (project.project): Cases to check
+            threshold (float): Minimum trigram similarity of fuzzy matches
+
+        Returns:
+            list: Hits as dicts, best score first, with ``project_id``,
+            ``role`` and ``party`` (the checked name), ``match_model``,
+            ``match_id``, ``match_name``, ``match_role`` and ``score``
+        """
+        if not projects:
+            return []
+        projects.flush_model()
+        self.env['res.partner'].flush_model(['legal_name_key', 'legal_phonetic_key', 'legal_profile_id'])
+        self.env['legal.client.profile'].flush_model(['x_name_en', 'x_name_en_phonetic_key'])
+        with self._trigram_threshold(threshold):
+            hits = self._check_opponents_against_partners(projects, threshold)
+            hits += self._check_clients_against_opponents(projects, threshold)
+        hits.sort(key=lambda hit: hit['score'], reverse=True)
+        return hits
+
+    @api.model
+    def _fuzzy_sql(self, left, right):
+        """Return the fuzzy match condition and score expressions, if available."""
+        if not self.env.registry.has_trigram:
+            return '', '0'
+        return f'OR {left} %% {right}', f'similarity({left}, {right}) * {SCORE_FUZZY_FACTOR}'
+
+    @api.model
+    def _phonetic_sql(self, left, right, *names):
+        """Return the condition of a phonetic hit confirmed by trigram similarity.
+
+        Args:
+            left (str): Phonetic key column of the matched record
+            right (str): Phonetic key of the checked party
+            names (tuple): (matched name, checked name) expression pairs, any
+                of which may confirm the hit
+
+        Returns:
+            str: SQL condition, FALSE when pg_trgm is not available
+        """
+        if not self.env.registry.has_trigram:
+            return 'FALSE'
+        similar = ' OR '.join(f'similarity({a}, {b}) >= %(threshold)s' for a, b in names)
+        return f'({left} = {right} AND ({similar}))'
+
+    @api.model
+    def _check_opponents_against_partners(self, projects, threshold):
+        """Does an opponent or opposing attorney match an existing partner?"""
+        parties = []
+        for project in projects:
+            for role, name_field, key_field, phonetic_field in OPPONENT_PARTIES:
+                if project[key_field]:
+                    parties.append((project, role, project[name_field], project[key_field], project[phonetic_field]))
+        if not parties:
+            return []
+
+        fuzzy_condition, fuzzy_score = self._fuzzy_sql('p.legal_name_key', 'q.name_key')
+        confirmations = [('p.legal_name_key', 'q.name_key'), ('lp.x_name_en', 'q.name')]
+        phonetic = self._phonetic_sql('p.legal_phonetic_key', 'q.phonetic', *confirmations)
+        phonetic_en = self._phonetic_sql('lp.x_name_en_phonetic_key', 'q.phonetic', *confirmations)
+        # The candidates are found through the key indexes of the partners
+        # and of the profiles, the WHERE keeps the clients and the phonetic
+        # hits confirmed by similarity
+        self.env.cr.execute(f"""
+            WITH q AS (
+                SELECT * FROM unnest(%(idx)s::int[], %(names)s::varchar[], %(name_keys)s::varchar[],
+                                     %(phonetics)s::varchar[]) AS q(idx, name, name_key, phonetic)
+            ), candidates AS (
+                SELECT q.idx, p.id
+                FROM q
+                JOIN res_partner p ON p.legal_name_key = q.name_key
+                                   OR p.legal_phonetic_key = q.phonetic
+                                   {fuzzy_condition}
+                UNION
+                SELECT q.idx, p.id
+                FROM q
+                JOIN legal_client_profile lp ON lp.x_name_en_phonetic_key = q.phonetic
+                JOIN res_partner p ON p.legal_profile_id = lp.id
+            )
+            SELECT q.idx, p.id, p.name,
+                   CASE WHEN p.legal_name_key = q.name_key THEN {SCORE_EXACT}
+                        WHEN {phonetic} OR {phonetic_en} THEN {SCORE_PHONETIC}
+                        ELSE {fuzzy_score}
+                   END AS score
+            FROM candidates c
+            JOIN q ON q.idx = c.idx
+            JOIN res_partner p ON p.id = c.id AND p.active
+            LEFT JOIN legal_client_profile lp ON lp.id = p.legal_profile_id
+            WHERE (p.legal_profile_id IS NOT NULL
+                   OR EXISTS (SELECT 1 FROM project_project c WHERE c.partner_id = p.id))
+              AND (p.legal_name_key = q.name_key OR {phonetic} OR {phonetic_en} {fuzzy_condition})
+        """, {
+            'idx': list(range(len(parties))),
+            'names': [party[2] for party in parties],
+            'name_keys': [party[3] for party in parties],
+            'phonetics': [party[4] or None for party in parties],
+            'threshold': threshold,
+        })
+        return [
+            self._make_hit(parties[idx][0], parties[idx][1], parties[idx][2], 'res.partner', res_id, name, 'client', score)
+            for idx, res_id, name, score in self.env.cr.fetchall()
+        ]
+
+    @api.model
+    def _check_clients_against_opponents(self, projects, threshold):
+        """Does the client appear as an opponent or attorney in another case?"""
+        parties = []
+        for project in projects:
+            client = project.partner_id
+            for name in {client.name, client.x_name_en} - {False, None}:
+                parties.append((project, 'client', name, normalize_name(name), phonetic_key(name)))
+        if not parties:
+            return []
+
+        opponent_fuzzy, opponent_score = self._fuzzy_sql('pp.opponent_name_key', 'q.name_key')
+        attorney_fuzzy, attorney_score = self._fuzzy_sql('pp.opponent_attorney_name_key', 'q.name_key')
+        opponent_phonetic = self._phonetic_sql(
+            'pp.opponent_phonetic_key', 'q.phonetic', ('pp.opponent_name_key', 'q.name_key'))
+        attorney_phonetic = self._phonetic_sql(
+            'pp.opponent_attorney_phonetic_key', 'q.phonetic', ('pp.opponent_attorney_name_key', 'q.name_key'))
+        self.env.cr.execute(f"""
+            SELECT q.idx, pp.id,
+                   CASE WHEN pp.opponent_name_key = q.name_key THEN {SCORE_EXACT}
+                        WHEN {opponent_phonetic} THEN {SCORE_PHONETIC}
+                        WHEN pp.opponent_name_key IS NOT NULL THEN {opponent_score}
+                        ELSE 0
+                   END AS opponent_score,
+                   CASE WHEN pp.opponent_attorney_name_key = q.name_key THEN {SCORE_EXACT}
+                        WHEN {attorney_phonetic} THEN {SCORE_PHONETIC}
+                        WHEN pp.opponent_attorney_name_key IS NOT NULL THEN {attorney_score}
+                        ELSE 0
+                   END AS attorney_score
+            FROM unnest(%(idx)s::int[], %(name_keys)s::varchar[], %(phonetics)s::varchar[])
+                 AS q(idx, name_key, phonetic)
+            JOIN project_project pp ON (pp.active OR pp.legal_closed_date IS NOT NULL) AND pp.id != ALL(%(exclude)s) AND (
+                pp.opponent_name_key = q.name_key
+                OR pp.opponent_phonetic_key = q.phonetic
+                OR pp.opponent_attorney_name_key = q.name_key
+                OR pp.opponent_attorney_phonetic_key = q.phonetic
+                {opponent_fuzzy}
+                {attorney_fuzzy}
+            )
+        """, {
+            'idx': list(range(len(parties))),
+            'name_keys': [party[3] for party in parties],
+            'phonetics': [party[4] or None for party in parties],
+            'exclude': projects.ids,
+            'threshold': threshold,
+        })
+        rows = self.env.cr.fetchall()
+        # Project names are translatable, read them through the ORM in one go.
+        # The conflicting case may be hidden from the user by record rules,
+        # which must not hide the conflict: its name is read as superuser.
+        matched = self.env['project.project'].sudo().browse(list({row[1] for row in rows}))
+        names = dict(zip(matched.ids, matched.mapped('display_name')))
+        hits = []
+        for idx, res_id, opponent_score, attorney_score in rows:
+            project, role, party_name = parties[idx][:3]
+            for match_role, score in (('opponent', opponent_score), ('opponent_attorney', attorney_score)):
+                if score and score >= threshold * SCORE_FUZZY_FACTOR:
+                    hits.append(self._make_hit(project, role, party_name, 'project.project', res_id, names[res_id], match_role, score))
+        return hits
+
+    @api.model
+    @contextmanager
+    def _trigram_threshold(self, threshold):
+        """Use ``threshold`` for the ``%`` operator within the block.
+
+        The setting is local to the transaction and restored on exit, so it
+        never leaks to later queries or to the pooled connection.
+        """
+        if not self.env.registry.has_trigram:
+            yield
+            return
+        cr = self.env.cr
+        cr.execute("SELECT current_setting('pg_trgm.similarity_threshold')")
+        previous = cr.fetchone()[0]
+        cr.execute("SELECT set_config('pg_trgm.similarity_threshold', %s, true)", (str(threshold),))
+        try:
+            yield
+        finally:
+            # An aborted transaction resets the setting when it is rolled back
+            if cr._cnx.get_transaction_status() != TRANSACTION_STATUS_INERROR:
+                cr.execute("SELECT set_config('pg_trgm.similarity_threshold', %s, true)", (previous,))
+
+    @api.model
+    def _make_hit(self, project, role, party, match_model, match_id, match_name, match_role, score):
+        return {
+            'project_id': project.id,
+            'role': role,
+            'party': party,
+            'match_model': match_model,
+            'match_id': match_id,
+            'match_name': match_name,
+            'match_role': match_role,
+            'score': round(float(score), 2),
+        }
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Deadlines
+Statutory and procedural deadlines of legal cases.
+"""
+
+from odoo import models, fields, api, _
+from .constants import DEADLINE_STATE_SELECTION
+
+
+class LegalDeadline(models.Model):
+    """A dated obligation on a case, entered by hand or generated from a
+    deadline rule when the event it counts from is recorded."""
+    _name = 'legal.deadline'
+    _description = 'Legal Deadline'
+    _inherit = ['legal.reminder.mixin']
+    _order = 'date_deadline, id'
+    _reminder_state = 'open'
+    _reminder_date_field = 'date_deadline'
+
+    name = fields.Char(string=_("Name"), required=True)
+    date_deadline = fields.Date(string=_("Deadline"), required=True, index=True)
+    state = fields.Selection(
+        DEADLINE_STATE_SELECTION, string=_("Status"), required=True, default='open', index=True)
+    rule_id = fields.Many2one('legal.deadline.rule', string=_("Rule"), ondelete='set null', index=True)
+    hearing_id = fields.Many2one('legal.hearing', string=_("Hearing"), ondelete='cascade', index=True)
+    notes = fields.Text(string=_("Notes"))
+
+    def action_done(self):
+        self.write({'state': 'done'})
+        self.activity_id.sudo().action_feedback(feedback=_("Deadline met"))
+
+    def action_cancel(self):
+        self.write({'state': 'cancelled'})
+        self.activity_id.sudo().unlink()
+
+    def _prepare_reminder_activity_values(self):
+        return dict(super()._prepare_reminder_activity_values(), summary=_("Deadline: %s", self.name))
+
+    @api.model
+    def _sync_rule_deadlines(self, trigger, events):
+        """Create, move or cancel the rule deadlines counted from events.
+
+        Args:
+            trigger (str): Event kind, see DEADLINE_TRIGGER_SELECTION
+            events (list): (project, hearing or None, event date or False)
+                tuples; a missing date cancels the open deadlines of the event
+        """
+        rules = self.env['legal.deadline.rule'].search([('trigger', '=', trigger)])
+        if not rules or not events:
+            return
+        projects = self.env['project.project'].union(*(event[0] for event in events))
+        existing = {
+            (deadline.rule_id.id, deadline.project_id.id, deadline.hearing_id.id): deadline
+            for deadline in self.search([
+                ('rule_id', 'in', rules.ids),
+                ('project_id', 'in', projects.ids),
+                ('state', '=', 'open'),
+            ])
+        }
+        to_cancel = self.browse()
+        vals_list = []
+        for project, hearing, event_date in events:
+            for rule in rules:
+                deadline = existing.get((rule.id, project.id, hearing.id if hearing else False))
+                date_deadline = rule._get_deadline_date(event_date) if event_date and rule._applies_to(project) else False
+                if deadline and not date_deadline:
+                    to_cancel |= deadline
+                elif deadline and deadline.date_deadline != date_deadline:
+                    deadline.date_deadline = date_deadline
+                elif not deadline and date_deadline:
+                    vals_list.append({
+                        'name': rule.name,
+                        'project_id': project.id,
+                        'hearing_id': hearing.id if hearing else False,
+                        'rule_id': rule.id,
+                        'date_deadline': date_deadline,
+                        'reminder_days': rule.reminder_days,
+                        'user_id': project.user_id.id or self.env.user.id,
+                    })
+        if to_cancel:
+            to_cancel.action_cancel()
+        if vals_list:
+            self.create(vals_list)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Deadline Rules
+Configurable offsets turning case events into statutory deadlines.
+"""
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import models, fields, _
+from .constants import DEADLINE_OFFSET_UNIT_SELECTION, DEADLINE_TRIGGER_SELECTION, LEGAL_ENTITY_TYPE_SELECTION
+from .legal_reminder_mixin import DEFAULT_REMINDER_DAYS
+
+
+class LegalDeadlineRule(models.Model):
+    """A deadline counted from a case event, e.g. the appeal window after
+    a judgment."""
+    _name = 'legal.deadline.rule'
+    _description = 'Legal Deadline Rule'
+    _order = 'sequence, id'
+
+    name = fields.Char(string=_("Name"), required=True, translate=True)
+    sequence = fields.Integer(default=10)
+    active = fields.Boolean(default=True)
+    trigger = fields.Selection(
+        DEADLINE_TRIGGER_SELECTION, string=_("Counted From"), required=True, default='judgment')
+    offset_number = fields.Integer(
+        string=_("Offset"), required=True, default=0,
+        help=_("Negative offsets place the deadline before the event"))
+    offset_unit = fields.Selection(
+        DEADLINE_OFFSET_UNIT_SELECTION, string=_("Offset Unit"), required=True, default='days')
+    legal_entity_type = fields.Selection(
+        LEGAL_ENTITY_TYPE_SELECTION, string=_("Applies To"),
+        help=_("Leave empty to apply the rule to cases and matters"))
+    reminder_days = fields.Integer(string=_("Remind Days Before"), default=DEFAULT_REMINDER_DAYS)
+
+    def _get_deadline_date(self, event_date):
+        """Return the deadline of the rule for an event on the given date."""
+        self.ensure_one()
+        return event_date + relativedelta(**{self.offset_unit: self.offset_number})
+
+    def _applies_to(self, project):
+        self.ensure_one()
+        return not self.legal_entity_type or self.legal_entity_type == project.legal_entity_type
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Hearings
+Court hearings of legal cases.
+"""
+
+from odoo import models, fields, api, _
+from .constants import HEARING_STATE_SELECTION
+
+# Hearing fields the rule deadlines depend on
+HEARING_DEADLINE_FIELDS = {'date', 'state', 'is_judgment', 'project_id', 'user_id'}
+
+
+class LegalHearing(models.Model):
+    """A court session of a case. Hearing rules count from its date, and
+    judgment rules from the date of a held judgment hearing."""
+    _name = 'legal.hearing'
+    _description = 'Legal Hearing'
+    _inherit = ['legal.reminder.mixin']
+    _order = 'date desc, id desc'
+    _reminder_state = 'scheduled'
+    _reminder_date_field = 'date'
+
+    name = fields.Char(string=_("Subject"), required=True)
+    date = fields.Datetime(string=_("Hearing Date"), required=True, index=True)
+    state = fields.Selection(
+        HEARING_STATE_SELECTION, string=_("Status"), required=True, default='scheduled', index=True)
+    court_name = fields.Char(string=_("Court Name"))
+    court_circle = fields.Char(string=_("Court Circle"))
+    is_judgment = fields.Boolean(
+        string=_("Judgment"), help=_("Judgment rules count from the date of this hearing once it is held"))
+    deadline_ids = fields.One2many('legal.deadline', 'hearing_id', string=_("Deadlines"))
+    notes = fields.Text(string=_("Notes"))
+
+    @api.onchange('project_id')
+    def _onchange_project_id(self):
+        for hearing in self:
+            hearing.court_name = hearing.court_name or hearing.project_id.court_name
+            hearing.court_circle = hearing.court_circle or hearing.project_id.court_circle
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        hearings = super().create(vals_list)
+        hearings._sync_deadlines()
+        return hearings
+
+    def write(self, vals):
+        result = super().write(vals)
+        if HEARING_DEADLINE_FIELDS.intersection(vals):
+            self._sync_deadlines()
+        return result
+
+    def _sync_deadlines(self):
+        """Bring the hearing and judgment rule deadlines in line with the hearings."""
+        Deadline = self.env['legal.deadline']
+        Deadline._sync_rule_deadlines('hearing', [
+            (hearing.project_id, hearing, hearing.state != 'cancelled' and hearing._get_reminder_event_date())
+            for hearing in self
+        ])
+        Deadline._sync_rule_deadlines('judgment', [
+            (hearing.project_id, hearing, hearing.is_judgment and hearing.state == 'held' and hearing._get_reminder_event_date())
+            for hearing in self
+        ])
+
+    def _prepare_reminder_activity_values(self):
+        return dict(
+            super()._prepare_reminder_activity_values(),
+            summary=_("Hearing: %s", self.name),
+            note=self.court_name or False,
+        )
@@ -0,0 +1,452 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Online Migrations
+Index builds and backfills deferred out of the module upgrade.
+"""
+
+import json
+import logging
+import time
+
+import psycopg2
+
+from odoo import models, fields, api, _
+from .constants import MIGRATION_TASK_STATE_SELECTION, MIGRATION_TASK_TYPE_SELECTION
+from ..utils.migration import (
+    ONLINE_MIN_ROWS, create_index_concurrently, estimate_rows, get_index_state, index_sql,
+)
+
+_logger = logging.getLogger(__name__)
+
+MODULE_NAME = 'legal_practice_management'
+
+# Estimated table size from which indexes and backfills are deferred
+ONLINE_MIN_ROWS_PARAM = 'legal_practice_management.online_migration_min_rows'
+
+# Rows recomputed per committed chunk
+RECOMPUTE_CHUNK_SIZE = 1000
+
+
+class LegalMigrationTask(models.Model):
+    """Schema and data work deferred out of ``-u legal_practice_management``.
+
+    Building an index or computing a stored field over a large table inside
+    the upgrade keeps ``project_project`` or ``res_partner`` locked until the
+    whole upgrade commits. From ``legal_practice_management.online_migration_min_rows``
+    estimated rows on, that work is queued here instead:
+
+    - index tasks are built with ``CREATE INDEX CONCURRENTLY`` by
+      ``scripts/online_migrate.py``, which runs outside of any Odoo
+      transaction (a concurrent build waits for every older snapshot);
+    - recompute and SQL backfill tasks are run by a cron, one committed
+      chunk of ids at a time. An interrupted task resumes after the last
+      processed id.
+
+    Smaller tables are migrated right away, as before.
+    """
+    _name = 'legal.migration.task'
+    _description = 'Legal Online Migration Task'
+    _order = 'sequence, id'
+
+    name = fields.Char(string=_("Name"), required=True, readonly=True)
+    task_type = fields.Selection(MIGRATION_TASK_TYPE_SELECTION, string=_("Type"), required=True, readonly=True)
+    state = fields.Selection(
+        MIGRATION_TASK_STATE_SELECTION, string=_("Status"), required=True, default='pending', readonly=True)
+    sequence = fields.Integer(default=10)
+    table_name = fields.Char(string=_("Table"), readonly=True)
+
+    # Index tasks
+    index_expressions = fields.Char(string=_("Indexed Expressions"), readonly=True)
+    index_unique = fields.Boolean(string=_("Unique"), readonly=True)
+    index_method = fields.Char(string=_("Method"), default='btree', readonly=True)
+    index_where = fields.Char(string=_("Condition"), readonly=True)
+    index_replaces = fields.Char(string=_("Replaced Index"), readonly=True)
+
+    # Recompute tasks
+    model_name = fields.Char(string=_("Model"), readonly=True)
+    field_names = fields.Char(string=_("Fields"), readonly=True)
+
+    # SQL backfill tasks
+    assignment = fields.Text(string=_("Assignment"), readonly=True)
+
+    # Backfill progress: ids in (start_id, stop_id] are processed up to last_id
+    chunk_size = fields.Integer(string=_("Chunk Size"), default=RECOMPUTE_CHUNK_SIZE)
+    start_id = fields.Integer(readonly=True)
+    stop_id = fields.Integer(readonly=True)
+    last_id = fields.Integer(readonly=True)
+    done_count = fields.Integer(string=_("Processed Rows"), readonly=True)
+    progress = fields.Float(string=_("Progress"), compute='_compute_progress')
+    date_start = fields.Datetime(string=_("Started"), readonly=True)
+    date_done = fields.Datetime(string=_("Finished"), readonly=True)
+    error = fields.Text(string=_("Error"), readonly=True)
+
+    _sql_constraints = [
+        ('name_uniq', 'unique(name)', 'A migration task with this name already exists.'),
+    ]
+
+    def init(self):
+        # Runs before the ORM computes new stored fields and builds field indexes
+        self.pool.post_init(self._defer_module_work)
+
+    def _compute_progress(self):
+        index_progress = self._get_index_build_progress()
+        for task in self:
+            if task.state == 'done':
+                task.progress = 100.0
+            elif task.task_type == 'index':
+                task.progress = index_progress.get(task.name, 0.0)
+            elif task.stop_id > task.start_id:
+                task.progress = 100.0 * (task.last_id - task.start_id) / (task.stop_id - task.start_id)
+            else:
+                task.progress = 0.0
+
+    def _get_index_build_progress(self):
+        """Read the progress of the running concurrent builds from Postgres.
+
+        Returns:
+            dict: Percentage of blocks processed, keyed by index name
+        """
+        names = [task.name for task in self if task.task_type == 'index' and task.state == 'running']
+        if not names:
+            return {}
+        self.env.cr.execute("""
+            SELECT c.relname, p.blocks_done, p.blocks_total
+            FROM pg_stat_progress_create_index p
+            JOIN pg_class c ON c.oid = p.index_relid
+            WHERE c.relname = ANY(%s)
+        """, (names,))
+        return {
+            name: 100.0 * done / total if total else 0.0
+            for name, done, total in self.env.cr.fetchall()
+        }
+
+    # ========== Queueing ==========
+
+    @api.model
+    def _get_online_min_rows(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param(ONLINE_MIN_ROWS_PARAM, ONLINE_MIN_ROWS))
+
+    @api.model
+    def _is_large_table(self, table):
+        return estimate_rows(self.env.cr, table) >= self._get_online_min_rows()
+
+    @api.model
+    def _queue(self, name, values):
+        """Create a task, or put an existing task with that name back in the queue.
+
+        Returns:
+            legal.migration.task: The queued task
+        """
+        task = self.search([('name', '=', name)], limit=1)
+        if not task:
+            return self.create(dict(values, name=name))
+        if task.state == 'done':
+            task.write(dict(values, state='pending', last_id=0, done_count=0, date_done=False))
+        return task
+
+    @api.model
+    def _ensure_index(self, name, table, expressions, unique=False, method='btree', where=None, replaces=None):
+        """Create an index now on a small table, queue it on a large one.
+
+        Args:
+            name (str): Index name
+            table (str): Indexed table
+            expressions (list): Indexed columns or expressions
+            unique (bool): Whether the index is unique
+            method (str): Index access method
+            where (str): Predicate of a partial index
+            replaces (str): Index made redundant by this one. It is only
+                dropped once this one is valid, so a queued or failed build
+                never leaves the table without either.
+        """
+        state = get_index_state(self.env.cr, name)
+        if state is None and not self._is_large_table(table):
+            try:
+                with self.env.cr.savepoint(flush=False):
+                    self.env.cr.execute(index_sql(name, table, expressions, unique, method, where))
+            except psycopg2.Error:
+                _logger.warning("Index %s could not be created.", name, exc_info=True)
+                return
+            state = 'valid'
+        if state == 'valid':
+            if replaces:
+                self.env.cr.execute(f'DROP INDEX IF EXISTS "{replaces}"')
+            return
+        _logger.info("Index %s on %s queued for an online build.", name, table)
+        self._queue(name, {
+            'task_type': 'index',
+            'sequence': 5,
+            'table_name': table,
+            'index_expressions': json.dumps(expressions),
+            'index_unique': unique,
+            'index_method': method,
+            'index_where': where or False,
+            'index_replaces': replaces or False,
+        })
+
+    @api.model
+    def _queue_recompute(self, model_name, field_names, chunk_size=RECOMPUTE_CHUNK_SIZE):
+        """Recompute stored fields of all records, in chunks.
+
+        Runs right away on a small table and through the cron on a large one.
+
+        Args:
+            model_name (str): Model of the fields
+            field_names (list): Stored computed fields to recompute
+            chunk_size (int): Records recomputed per committed chunk
+
+        Returns:
+            legal.migration.task: The task
+        """
+        task = self._queue(f'recompute {model_name}: {", ".join(field_names)}', {
+            'task_type': 'recompute',
+            'table_name': self.env[model_name]._table,
+            'model_name': model_name,
+            'field_names': ','.join(field_names),
+            'chunk_size': chunk_size,
+        })
+        return task._run_now_or_later()
+
+    @api.model
+    def _queue_sql_backfill(self, name, table, assignment, chunk_size=10000):
+        """Run ``UPDATE table AS t SET assignment`` over all rows, in chunks.
+
+        Runs right away on a small table and through the cron on a large one.
+
+        Args:
+            name (str): Task name
+            table (str): Table to update, aliased as ``t``
+            assignment (str): SQL ``SET`` clause
+            chunk_size (int): Width of the id range updated per committed chunk
+
+        Returns:
+            legal.migration.task: The task
+        """
+        task = self._queue(name, {
+            'task_type': 'sql',
+            'table_name': table,
+            'assignment': assignment,
+            'chunk_size': chunk_size,
+        })
+        return task._run_now_or_later()
+
+    def _run_now_or_later(self):
+        self.ensure_one()
+        if not self._is_large_table(self.table_name):
+            self._run_backfill()
+            return self
+        _logger.info("%s queued for an online backfill.", self.name)
+        cron = self.env.ref(f'{MODULE_NAME}.ir_cron_legal_migration_tasks', raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+        return self
+
+    @api.model
+    def _defer_module_work(self):
+        """Take the full-table work of the module's fields out of the upgrade.
+
+        Called once all tables of the module exist, before the ORM computes
+        the stored fields of new columns and creates the missing field
+        indexes. On large tables, both are queued instead.
+        """
+        min_rows = self._get_online_min_rows()
+        large_tables = {}
+        recomputes = {}
+        for model_name, Model in self.env.registry.items():
+            if not Model._auto or Model._abstract:
+                continue
+            for field in Model._fields.values():
+                if field._module != MODULE_NAME or not field.store or not field.column_type:
+                    continue
+                if Model._table not in large_tables:
+                    large_tables[Model._table] = estimate_rows(self.env.cr, Model._table) >= min_rows
+                if not large_tables[Model._table]:
+                    continue
+                if field.compute:
+                    records = self.env.records_to_compute(field)
+                    if len(records) >= min_rows:
+                        self.env.remove_to_compute(field, records)
+                        recomputes.setdefault(model_name, []).append(field.name)
+                if field.index:
+                    self._defer_field_index(Model, field)
+        for model_name, field_names in recomputes.items():
+            self._queue_recompute(model_name, field_names)
+
+    @api.model
+    def _defer_field_index(self, Model, field):
+        """Queue the index the ORM would build for ``field`` when it is missing.
+
+        The field is flagged as not indexed for the current registry only, so
+        the ORM does not build the index inside the upgrade transaction; the
+        queued task builds it under the name the ORM expects, and later
+        upgrades find it in place.
+        """
+        name = f'{Model._table}_{field.name}_index'
+        if get_index_state(self.env.cr, name) is not None:
+            return
+        column = f'"{field.name}"'
+        if field.index == 'trigram':
+            if field.translate or not self.env.registry.has_trigram or (
+                    getattr(field, 'unaccent', False) and self.env.registry.has_unaccent):
+                return
+            expression, method, where = f'{column} gin_trgm_ops', 'gin', None
+        elif field.translate:
+            return
+        else:
+            expression, method = column, 'btree'
+            where = f'{column} IS NOT NULL' if field.index == 'btree_not_null' else None
+        self._ensure_index(name, Model._table, [expression], method=method, where=where)
+        field.index = False
+
+    # ========== Running ==========
+
+    def _start(self):
+        """Fix the id range of a backfill: later records are computed on creation."""
+        self.ensure_one()
+        self.env.cr.execute(f'SELECT COALESCE(MIN(id), 1) - 1, COALESCE(MAX(id), 0) FROM "{self.table_name}"')
+        start_id, stop_id = self.env.cr.fetchone()
+        self.write({
+            'state': 'running',
+            'start_id': start_id,
+            'stop_id': stop_id,
+            'last_id': start_id,
+            'done_count': 0,
+            'date_start': fields.Datetime.now(),
+            'error': False,
+        })
+
+    def _run_chunk(self):
+        """Process the next chunk of ids of a backfill.
+
+        Returns:
+            bool: Whether ids are left to process
+        """
+        self.ensure_one()
+        if self.state == 'pending':
+            self._start()
+        start_id = self.last_id
+        stop_id = min(start_id + self.chunk_size, self.stop_id)
+        if self.task_type == 'recompute':
+            Model = self.env[self.model_name].with_context(active_test=False)
+            field_names = self.field_names.split(',')
+            self.env.cr.execute(
+                f'SELECT id FROM "{Model._table}" WHERE id > %s AND id <= %s', (start_id, stop_id))
+            records = Model.browse([row[0] for row in self.env.cr.fetchall()])
+            for field_name in field_names:
+                self.env.add_to_compute(Model._fields[field_name], records)
+            records.flush_recordset(field_names)
+            count = len(records)
+        else:
+            self.env.cr.execute(
+                f'UPDATE "{self.table_name}" AS t SET {self.assignment} WHERE t.id > %s AND t.id <= %s',
+                (start_id, stop_id))
+            count = self.env.cr.rowcount
+        finished = stop_id >= self.stop_id
+        self.write({
+            'state': 'done' if finished else 'running',
+            'last_id': stop_id,
+            'done_count': self.done_count + count,
+            'date_done': fields.Datetime.now() if finished else False,
+        })
+        return not finished
+
+    def _run_backfill(self, time_limit=None, auto_commit=False):
+        """Process a recompute or SQL backfill task chunk by chunk.
+
+        Args:
+            time_limit (float): Seconds after which to stop, the task resumes
+                at the next run
+            auto_commit (bool): Commit after every chunk; a failing chunk is
+                rolled back and the task marked as failed
+
+        Returns:
+            bool: Whether the task is finished
+        """
+        self.ensure_one()
+        started = time.monotonic()
+        while True:
+            try:
+                more = self._run_chunk()
+            except Exception as e:
+                if not auto_commit:
+                    raise
+                self.env.cr.rollback()
+                _logger.error("Online migration %s failed", self.name, exc_info=True)
+                self.write({'state': 'failed', 'error': str(e)})
+                self.env.cr.commit()  # pylint: disable=invalid-commit
+                return False
+            if auto_commit:
+                self.env.cr.commit()  # pylint: disable=invalid-commit
+            self.env.invalidate_all()
+            _logger.info("Online migration %s: %.1f%% (%s rows)", self.name, self.progress, self.done_count)
+            if not more:
+                return True
+            if time_limit and time.monotonic() - started > time_limit:
+                return False
+
+    def _run_index(self):
+        """Build a queued index with ``CREATE INDEX CONCURRENTLY``.
+
+        The current transaction is committed first and the build runs on its
+        own connection. Only call it from a process holding no other open
+        transaction on the database, i.e. ``scripts/online_migrate.py``.
+
+        Returns:
+            bool: Whether the index was built
+        """
+        self.ensure_one()
+        # Read everything before committing: a read afterwards would open a
+        # new snapshot on this cursor, which the build would wait for
+        args = (self.env.cr.dbname, self.name, self.table_name, json.loads(self.index_expressions))
+        options = {
+            'unique': self.index_unique,
+            'method': self.index_method,
+            'where': self.index_where or None,
+            'replaces': self.index_replaces or None,
+        }
+        self.write({'state': 'running', 'date_start': fields.Datetime.now(), 'error': False})
+        self.env.cr.commit()  # pylint: disable=invalid-commit
+        try:
+            create_index_concurrently(*args, **options)
+        except psycopg2.Error as e:
+            _logger.error("Online build of index %s failed", self.name, exc_info=True)
+            self.write({'state': 'failed', 'error': str(e)})
+        else:
+            self.write({'state': 'done', 'date_done': fields.Datetime.now()})
+        self.env.cr.commit()  # pylint: disable=invalid-commit
+        return self.state == 'done'
+
+    @api.model
+    def _cron_run_backfills(self, time_limit=240):
+        """Advance the queued backfills, committing after every chunk.
+
+        Index tasks are left to ``scripts/online_migrate.py``: the cron job
+        runs while the scheduler holds a transaction open, which a concurrent
+        index build would wait for.
+
+        Args:
+            time_limit (float): Seconds to work before handing over to the
+                next run, which is triggered right away when work is left
+        """
+        started = time.monotonic()
+        domain = [('task_type', '!=', 'index'), ('state', 'in', ('pending', 'running'))]
+        for task in self.search(domain):
+            remaining = time_limit - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            task._run_backfill(time_limit=remaining, auto_commit=True)
+        if self.search_count(domain):
+            self.env.ref(f'{MODULE_NAME}.ir_cron_legal_migration_tasks')._trigger()
+        pending_indexes = self.search_count([('task_type', '=', 'index'), ('state', '!=', 'done')])
+        if pending_indexes:
+            _logger.warning(
+                "%s legal indexes wait for an online build, run scripts/online_migrate.py", pending_indexes)
+
+    # ========== Actions ==========
+
+    def action_retry(self):
+        """Put failed tasks back in the queue; backfills resume where they stopped."""
+        for task in self.filtered(lambda task: task.state == 'failed'):
+            task.write({'state': 'running' if task.task_type != 'index' and task.stop_id else 'pending'})
+        if self.filtered(lambda task: task.task_type != 'index'):
+            self.env.ref(f'{MODULE_NAME}.ir_cron_legal_migration_tasks')._trigger()
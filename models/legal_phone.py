@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Phone Lookup
+Caller lookup on normalized opponent, attorney and partner phone numbers.
+"""
+
+from odoo import models, api, tools
+from ..utils.migration import backfill_with_python
+from ..utils.normalize import normalize_phone
+
+# Default country of national phone numbers (ISO code), the company country if unset
+PHONE_COUNTRY_PARAM = 'legal_practice_management.phone_default_country'
+
+# Tables with normalized phone columns: model -> (table, own country column
+# or None, [(phone column, key column)])
+PHONE_KEY_COLUMNS = {
+    'project.project': ('project_project', None, [
+        ('opponent_phone', 'opponent_phone_e164'),
+        ('opponent_attorney_phone', 'opponent_attorney_phone_e164'),
+    ]),
+    'res.partner': ('res_partner', 'country_id', [
+        ('phone', 'legal_phone_e164'),
+        ('mobile', 'legal_mobile_e164'),
+    ]),
+}
+
+
+class LegalPhoneLookup(models.AbstractModel):
+    """Find cases and partners from the number of an incoming call.
+
+    Phone numbers are stored a second time in E.164 form with a btree index,
+    so a caller is found with index lookups whatever the typed format.
+    National numbers of a record are read in its own country (a partner's
+    ``country_id``), else the default country parameter, else the country of
+    the record's company or of the main company. The stored keys therefore
+    do not depend on the user who triggered the recompute. Looked up numbers
+    follow the same chain, from the current company.
+    """
+    _name = 'legal.phone.lookup'
+    _description = 'Legal Phone Lookup'
+
+    @api.model
+    def _get_phone_country(self):
+        """Return the ISO code and calling code of numbers without a record,
+        resolved like the numbers of a record of the current company."""
+        return self._get_record_phone_country(False, self.env.company.sudo().country_id.id)
+
+    @api.model
+    @tools.ormcache('code')
+    def _get_phone_country_by_code(self, code):
+        country = self.env['res.country'].sudo().search([('code', '=', code)], limit=1)
+        return country.code or False, country.phone_code or False
+
+    @api.model
+    @tools.ormcache('country_id')
+    def _get_phone_country_by_id(self, country_id):
+        country = self.env['res.country'].sudo().browse(country_id).exists()
+        return country.code or False, country.phone_code or False
+
+    @api.model
+    def _get_record_phone_country(self, country_id=False, company_country_id=False):
+        """Return the ISO code and calling code used for a record's numbers.
+
+        Args:
+            country_id (int): The record's own country, if any
+            company_country_id (int): The country of the record's company, if any
+
+        Returns:
+            tuple: ISO code and calling code, False when no country is known
+        """
+        if country_id:
+            return self._get_phone_country_by_id(country_id)
+        code = self.env['ir.config_parameter'].sudo().get_param(PHONE_COUNTRY_PARAM)
+        if code:
+            return self._get_phone_country_by_code(code.upper())
+        if not company_country_id:
+            main_company = self.env.ref('base.main_company', raise_if_not_found=False)
+            company_country_id = main_company.sudo().country_id.id if main_company else False
+        return self._get_phone_country_by_id(company_country_id) if company_country_id else (False, False)
+
+    @api.model
+    def _normalize_record_phones(self, records, phone_fields, country_field=None):
+        """Normalize the phones of records, each in the record's country.
+
+        Args:
+            records: Records holding the phones
+            phone_fields (list): Phone field names
+            country_field (str): Field holding the record's own country
+
+        Returns:
+            list: One tuple of E.164 keys per record, in ``phone_fields`` order
+        """
+        keys = []
+        for record in records:
+            region, calling_code = self._get_record_phone_country(
+                record[country_field].id if country_field else False, record.company_id.sudo().country_id.id)
+            keys.append(tuple(normalize_phone(record[name], region, calling_code) for name in phone_fields))
+        return keys
+
+    @api.model
+    def _normalize_phones(self, values):
+        """Normalize many phone numbers with the current company's default
+        country, e.g. the numbers of incoming calls.
+
+        Returns:
+            list: E.164 keys, in the order of the values
+        """
+        region, calling_code = self._get_phone_country()
+        return [normalize_phone(value, region, calling_code) for value in values]
+
+    @api.model
+    def lookup_phone(self, phone):
+        """Find the cases and partners matching a phone number.
+
+        Args:
+            phone (str): Number as shown by the telephone system, any format
+
+        Returns:
+            dict: ``key`` (the E.164 number looked up), ``project_ids`` of
+            the cases whose opponent or opposing attorney has the number and
+            ``partner_ids`` of the partners with that phone or mobile,
+            archived ones included (a caller whose case was archived is not
+            unknown), and the archived subsets of both as
+            ``archived_project_ids`` and ``archived_partner_ids``
+        """
+        Project = self.env['project.project'].with_context(active_test=False)
+        Partner = self.env['res.partner'].with_context(active_test=False)
+        key = self._normalize_phones([phone])[0]
+        if not key:
+            return {'key': False, 'project_ids': [], 'partner_ids': [],
+                    'archived_project_ids': [], 'archived_partner_ids': []}
+        queries = []
+        for model_name, (table, _country, columns) in PHONE_KEY_COLUMNS.items():
+            self.env[model_name].flush_model([key_column for _phone, key_column in columns])
+            condition = ' OR '.join('%s = %%(key)s' % key_column for _phone, key_column in columns)
+            queries.append("SELECT '%s' AS model, id FROM %s WHERE %s" % (model_name, table, condition))
+        self.env.cr.execute(' UNION ALL '.join(queries), {'key': key})
+        ids = {model_name: [] for model_name in PHONE_KEY_COLUMNS}
+        for model_name, res_id in self.env.cr.fetchall():
+            ids[model_name].append(res_id)
+        projects = Project.browse(ids['project.project'])._filter_access_rules('read')
+        partners = Partner.browse(ids['res.partner'])._filter_access_rules('read')
+        return {
+            'key': key,
+            'project_ids': projects.ids,
+            'partner_ids': partners.ids,
+            'archived_project_ids': projects.filtered(lambda project: not project.active).ids,
+            'archived_partner_ids': partners.filtered(lambda partner: not partner.active).ids,
+        }
+
+    @api.model
+    def rebuild_phone_keys(self):
+        """Recompute every normalized phone in chunks, e.g. after changing
+        the default country or a company's country.
+
+        Returns:
+            int: Number of updated rows
+        """
+        def compute(country_id, company_country_id, *phones):
+            region, calling_code = self._get_record_phone_country(country_id, company_country_id)
+            return tuple(normalize_phone(phone, region, calling_code) for phone in phones)
+
+        updated = 0
+        for model_name, (table, country_column, columns) in PHONE_KEY_COLUMNS.items():
+            self.env[model_name].flush_model()
+            updated += backfill_with_python(
+                self.env.cr, table,
+                [country_column or 'NULL',
+                 f'(SELECT country_id FROM res_company c WHERE c.id = {table}.company_id)']
+                + [phone for phone, _key in columns],
+                [key_column for _phone, key_column in columns],
+                ['varchar'] * len(columns),
+                compute,
+            )
+            self.env[model_name].invalidate_model([key_column for _phone, key_column in columns])
+        return updated
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Reminders
+Activity reminders for dated legal events (hearings, deadlines).
+"""
+
+import datetime
+import logging
+
+from odoo import models, fields, api, _
+from odoo.tools.sql import create_index, index_exists
+
+_logger = logging.getLogger(__name__)
+
+# Days before the event the reminder activity is created, when not set by a rule
+REMINDER_DAYS_PARAM = 'legal_practice_management.reminder_days'
+DEFAULT_REMINDER_DAYS = 7
+
+
+class LegalReminderMixin(models.AbstractModel):
+    """Create a to-do activity on the case when an event comes close.
+
+    Each record stores the date its reminder is due. Records still waiting
+    for a reminder are kept in a partial index on (reminder_date, id), so
+    the cron only reads the records due now, in batches, resuming after the
+    last processed (reminder_date, id), and never scans past or far future
+    events.
+
+    Inheriting models define a ``state`` field, ``_reminder_state`` (the
+    state in which a reminder is still needed), ``_reminder_date_field``
+    (the date or datetime of the event). Datetime events are reminded on
+    the local date of the responsible user, so an evening hearing is not
+    reminded a day early in timezones ahead of UTC.
+    """
+    _name = 'legal.reminder.mixin'
+    _description = 'Legal Reminder Mixin'
+    _reminder_state = None
+    _reminder_date_field = None
+
+    project_id = fields.Many2one(
+        'project.project', string=_("Case"), required=True, index=True, ondelete='cascade')
+    user_id = fields.Many2one(
+        'res.users', string=_("Responsible"), default=lambda self: self.env.user)
+    reminder_days = fields.Integer(
+        string=_("Remind Days Before"),
+        default=lambda self: self._default_reminder_days())
+    reminder_date = fields.Date(
+        string=_("Reminder Date"), compute='_compute_reminder_date', store=True)
+    reminder_sent = fields.Boolean(string=_("Reminder Sent"), copy=False, readonly=True)
+    activity_id = fields.Many2one(
+        'mail.activity', string=_("Reminder Activity"), ondelete='set null', copy=False, readonly=True)
+
+    def init(self):
+        if self._abstract:
+            return
+        index_name = f'{self._table}_reminder_queue_index'
+        if not index_exists(self.env.cr, index_name):
+            create_index(
+                self.env.cr, index_name, self._table, ['reminder_date', 'id'],
+                where=f"state = '{self._reminder_state}' AND reminder_sent IS NOT TRUE",
+            )
+
+    @api.model
+    def _default_reminder_days(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param(REMINDER_DAYS_PARAM, DEFAULT_REMINDER_DAYS))
+
+    @api.depends(lambda self: (self._reminder_date_field, 'reminder_days', 'user_id.tz') if self._reminder_date_field else ())
+    def _compute_reminder_date(self):
+        for record in self:
+            event_date = record._get_reminder_event_date()
+            record.reminder_date = event_date - datetime.timedelta(days=record.reminder_days) if event_date else False
+
+    def write(self, vals):
+        # A rescheduled event needs a new reminder
+        if self._reminder_date_field in vals or 'reminder_days' in vals:
+            self.activity_id.sudo().unlink()
+            vals = dict(vals, reminder_sent=False)
+        return super().write(vals)
+
+    def _get_reminder_event_date(self):
+        """Return the local date of the event of the record.
+
+        Returns:
+            datetime.date: Date of the event in the timezone of the
+                responsible user, or False when the event has no date
+        """
+        self.ensure_one()
+        value = self[self._reminder_date_field]
+        if value and self._fields[self._reminder_date_field].type == 'datetime':
+            record = self.with_context(tz=self.user_id.tz or self.env.context.get('tz') or self.env.user.tz)
+            return fields.Datetime.context_timestamp(record, value).date()
+        return fields.Date.to_date(value)
+
+    def _prepare_reminder_activity_values(self):
+        """Return the values of the reminder activity of the record.
+
+        Inheriting models extend them with their own summary and note.
+        """
+        self.ensure_one()
+        return {
+            'res_model_id': self.env['ir.model']._get_id('project.project'),
+            'res_id': self.project_id.id,
+            'activity_type_id': self._get_reminder_activity_type().id,
+            'summary': self.display_name,
+            'date_deadline': self._get_reminder_event_date(),
+            'user_id': (self.user_id or self.project_id.user_id or self.env.user).id,
+        }
+
+    @api.model
+    def _cron_send_reminders(self, batch_size=1000, auto_commit=False):
+        """Create the reminder activities that are due.
+
+        Args:
+            batch_size (int): Number of records processed per batch
+            auto_commit (bool): Commit after every batch, so an interrupted
+                run keeps the reminders already created
+
+        Returns:
+            int: Number of created activities
+        """
+        self.flush_model()
+        today = fields.Date.context_today(self)
+        watermark = (datetime.date.min, 0)
+        created = 0
+        while True:
+            self.env.cr.execute(f"""
+                SELECT id, reminder_date
+                FROM {self._table}
+                WHERE state = '{self._reminder_state}' AND reminder_sent IS NOT TRUE
+                AND reminder_date <= %s
+                AND (reminder_date, id) > (%s, %s)
+                ORDER BY reminder_date, id
+                LIMIT %s
+            """, (today, watermark[0], watermark[1], batch_size))
+            rows = self.env.cr.fetchall()
+            if not rows:
+                break
+            watermark = (rows[-1][1], rows[-1][0])
+            records = self.browse([row[0] for row in rows])
+            activities = self.env['mail.activity'].sudo().create([
+                record._prepare_reminder_activity_values() for record in records
+            ])
+            self.env['mail.activity'].flush_model()
+            self.env.cr.execute(f"""
+                UPDATE {self._table} AS t
+                SET activity_id = v.activity_id, reminder_sent = TRUE
+                FROM unnest(%s::int[], %s::int[]) AS v(id, activity_id)
+                WHERE t.id = v.id
+            """, (records.ids, activities.ids))
+            self.invalidate_model(['activity_id', 'reminder_sent'])
+            created += len(activities)
+            if auto_commit:
+                self.env.cr.commit()  # pylint: disable=invalid-commit
+            self.env.invalidate_all()
+            _logger.info("Created %s %s reminders", created, self._description)
+        return created
+
+    @api.model
+    def _get_reminder_activity_type(self):
+        return self.env.ref('mail.mail_activity_data_todo')
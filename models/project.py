@@ -1,14 +1,87 @@
+import contextlib
+import datetime
 import logging
-from odoo import models, fields, api, _
+import re
+import time
+from collections import defaultdict
+
+from markupsafe import Markup
+
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import ValidationError, UserError
+from odoo.osv import expression
+from .constants import FILE_NUMBER_DEFAULT_SCOPE, LEGAL_ENTITY_TYPE_SELECTION
+from .legal_case_link import CASE_LINK_SOURCE_FIELDS
+from ..utils.instrumentation import instrumented
+from ..utils.normalize import build_search_text, normalize_name, parse_case_number, phonetic_key
 
 _logger = logging.getLogger(__name__)
 
+# "1234/2023", "1234 - 2023", "1234 لسنة 2023" (digits in any script)
+DOCKET_REFERENCE = re.compile(r'^\s*\d+\s*(?:[/\\\-.]|لسنة|\s)\s*\d{2,4}\s*$')
+
+# Legal fields folded into the trigram-indexed search text
+LEGAL_SEARCH_FIELDS = [
+    'opponent_name',
+    'opponent_attorney_name',
+    'court_name',
+    'court_circle',
+    'opponent_address',
+    'first_degree_case_number_year',
+    'second_degree_case_number_year',
+]
+
+# Trigram indexes cannot serve shorter search terms
+LEGAL_SEARCH_MIN_LENGTH = 3
+
+# Days a case stays closed before it is archived, 0 disables the archival
+ARCHIVE_AFTER_DAYS_PARAM = 'legal_practice_management.archive_closed_after_days'
+DEFAULT_ARCHIVE_AFTER_DAYS = 365
+
 class ProjectProject(models.Model):
     _inherit = 'project.project'
     _description = 'Legal Case Project'
 
+    def init(self):
+        """Make office file numbers unique per numbering scope at the database
+        level, index docket numbers by court and index the hot legal columns
+        of the active cases only.
+        
+        On large tables the indexes are built online, see legal.migration.task.
+        """
+        super().init()
+        Tasks = self.env['legal.migration.task']
+        for degree in ('first', 'second'):
+            self.pool.post_init(
+                Tasks._ensure_index, f'project_project_{degree}_degree_docket_index', self._table,
+                ['court_name', f'{degree}_degree_case_year', f'{degree}_degree_case_number'],
+            )
+        # The global index of unpartitioned databases is replaced by (scope, number),
+        # and only dropped once the new one is valid
+        self.pool.post_init(
+            Tasks._ensure_index, 'project_project_file_number_scope_uniq', self._table,
+            ['file_number_scope', 'office_file_number'], unique=True, where='office_file_number > 0',
+            replaces='project_project_office_file_number_uniq',
+        )
+        # Archived closed cases are most of the table: day-to-day lists and
+        # searches only read the active ones, through these smaller indexes.
+        # File number MAX and uniqueness must see the archived cases too, they
+        # use the scope index above.
+        for column in ('office_file_number', 'legal_closed_date'):
+            self.pool.post_init(
+                Tasks._ensure_index, f'project_project_active_{column}_index', self._table,
+                [column], where='active',
+            )
+        # Court and details searches are ilike, which needs trigrams
+        if self.env.registry.has_trigram:
+            for column in ('court_name', 'legal_search_text'):
+                self.pool.post_init(
+                    Tasks._ensure_index, f'project_project_active_{column}_index', self._table,
+                    [f'{column} gin_trgm_ops'], method='gin', where='active',
+                )
+
     # ========== ORM Overrides ==========
+    @instrumented('project.write')
     def write(self, vals):
         """Override write to handle file number locking."""
         if 'office_file_number' in vals and any(rec.is_file_number_locked for rec in self):
@@ -19,17 +92,51 @@ class ProjectProject(models.Model):
         # Set the lock if office_file_number is being set
         if 'office_file_number' in vals and vals.get('office_file_number') and not self._context.get('skip_lock_update'):
             vals['is_file_number_locked'] = True
-            
-        return super().write(vals)
+
+        # A number belongs to the scope of its case, which may differ per record
+        if 'office_file_number' in vals and 'file_number_scope' not in vals:
+            if not vals['office_file_number']:
+                vals['file_number_scope'] = False
+            else:
+                scopes = self._group_by_file_number_scope()
+                if len(scopes) > 1:
+                    return all(
+                        records.write(dict(vals, file_number_scope=scope))
+                        for scope, records in scopes.items()
+                    )
+                vals['file_number_scope'] = next(iter(scopes), False)
+
+        result = super().write(vals)
+
+        # Keep the allocator ahead of manually entered numbers
+        if self and vals.get('office_file_number') and not self._context.get('file_number_reserved'):
+            self.env['legal.file.number.counter']._bump(vals['office_file_number'], vals['file_number_scope'])
+
+        # Filing rule deadlines follow the filing date and the entity type
+        if 'lawsuit_filing_date' in vals or 'tag_ids' in vals:
+            self._sync_filing_deadlines()
+
+        # A restored closed case gets a full archival delay again
+        if vals.get('active') and 'legal_closed_date' not in vals:
+            self.filtered('legal_closed_date').write({'legal_closed_date': fields.Date.context_today(self)})
+
+        # Related matters follow the parties of the case
+        if any(fname in vals for fname in CASE_LINK_SOURCE_FIELDS):
+            self.env['legal.case.link']._sync_projects(self)
+
+        return result
     
     # ========== Field Definitions ==========
+    # The conflict check tells clients apart by the cases they are party to
+    partner_id = fields.Many2one(index='btree_not_null')
+
     office_file_number = fields.Integer(
         string=_("File Number in the Office"),
         # required=True,
         help=_("Internal reference number used by the law firm (positive integers only)"),
         readonly=False,
         copy=False,
-        index=True  # For faster lookups
+        index=False  # Partial index on the active cases, see init()
     )
     
     is_file_number_locked = fields.Boolean(
@@ -38,9 +145,17 @@ class ProjectProject(models.Model):
         copy=False,
         help="Indicates if the file number is locked from editing"
     )
+
+    file_number_scope = fields.Char(
+        string=_("File Number Series"),
+        help=_("Numbering series the office file number was taken from"),
+        readonly=True,
+        copy=False,
+    )
     
     # Legal Case Information
-    court_name = fields.Char(string=_("Court Name"))
+    # Searched without unaccent(), so the trigram index of the column applies
+    court_name = fields.Char(string=_("Court Name"), unaccent=False)
     court_circle = fields.Char(string=_("Court Circle"))
     lawsuit_filing_date = fields.Date(string=_("Lawsuit Filing Date"))
     first_degree_case_number_year = fields.Char(
@@ -49,6 +164,24 @@ class ProjectProject(models.Model):
     second_degree_case_number_year = fields.Char(
         string=_("Second Degree Case Number/Year")
     )
+
+    # Docket numbers parsed from the "Number/Year" fields
+    first_degree_case_number = fields.Integer(
+        string=_("First Degree Case Number"),
+        compute='_compute_case_numbers', store=True, index=True
+    )
+    first_degree_case_year = fields.Integer(
+        string=_("First Degree Case Year"),
+        compute='_compute_case_numbers', store=True
+    )
+    second_degree_case_number = fields.Integer(
+        string=_("Second Degree Case Number"),
+        compute='_compute_case_numbers', store=True, index=True
+    )
+    second_degree_case_year = fields.Integer(
+        string=_("Second Degree Case Year"),
+        compute='_compute_case_numbers', store=True
+    )
     
     # Client Information
     client_status = fields.Selection(
@@ -67,10 +200,110 @@ class ProjectProject(models.Model):
     opponent_attorney_name = fields.Char(string=_("Opponent Attorney Name"))
     opponent_attorney_phone = fields.Char(string=_("Opponent Attorney Phone"))
 
+    # Conflict check keys
+    opponent_name_key = fields.Char(
+        compute='_compute_opponent_name_keys', store=True, index='trigram', copy=False)
+    opponent_phonetic_key = fields.Char(
+        compute='_compute_opponent_name_keys', store=True, index=True, copy=False)
+    opponent_attorney_name_key = fields.Char(
+        compute='_compute_opponent_name_keys', store=True, index='trigram', copy=False)
+    opponent_attorney_phonetic_key = fields.Char(
+        compute='_compute_opponent_name_keys', store=True, index=True, copy=False)
+
+    # Caller lookup keys, see legal.phone.lookup
+    opponent_phone_e164 = fields.Char(
+        compute='_compute_phone_keys', store=True, index=True, copy=False)
+    opponent_attorney_phone_e164 = fields.Char(
+        compute='_compute_phone_keys', store=True, index=True, copy=False)
+
+    # Full case details search, normalized like the conflict check keys
+    legal_search_text = fields.Char(
+        compute='_compute_legal_search_text', store=True, unaccent=False, copy=False)
+    legal_search = fields.Char(
+        string=_("Search All Case Details"),
+        compute='_compute_legal_search', search='_search_legal_search')
+
+    # Archival of closed cases
+    legal_closed_date = fields.Date(
+        string=_("Closing Date"),
+        compute='_compute_legal_closed_date', store=True, copy=False,
+        help=_("Date the case reached a closed stage; it is archived once the archival delay has passed"))
+
+    # Hearings and deadlines
+    hearing_ids = fields.One2many('legal.hearing', 'project_id', string=_("Hearings"))
+    deadline_ids = fields.One2many('legal.deadline', 'project_id', string=_("Deadlines"))
+
+    # Related matters
+    related_case_count = fields.Integer(
+        string=_("Related Matters"), compute='_compute_related_case_count',
+        help=_("Other cases with the same client, opponent or opponent attorney, counted up to 100"))
+
+    @api.depends('stage_id.fold')
+    def _compute_legal_closed_date(self):
+        today = fields.Date.context_today(self)
+        for project in self:
+            project.legal_closed_date = (project.legal_closed_date or today) if project.stage_id.fold else False
+
+    def _compute_related_case_count(self):
+        counts = self.env['legal.case.link']._count_related(self._origin.ids)
+        for project in self:
+            project.related_case_count = counts.get(project._origin.id, 0)
+
+    @api.depends('first_degree_case_number_year', 'second_degree_case_number_year')
+    def _compute_case_numbers(self):
+        for project in self:
+            number, year = parse_case_number(project.first_degree_case_number_year)
+            project.first_degree_case_number = number
+            project.first_degree_case_year = year
+            number, year = parse_case_number(project.second_degree_case_number_year)
+            project.second_degree_case_number = number
+            project.second_degree_case_year = year
+
+    @api.depends('opponent_name', 'opponent_attorney_name')
+    def _compute_opponent_name_keys(self):
+        for project in self:
+            project.opponent_name_key = normalize_name(project.opponent_name)
+            project.opponent_phonetic_key = phonetic_key(project.opponent_name)
+            project.opponent_attorney_name_key = normalize_name(project.opponent_attorney_name)
+            project.opponent_attorney_phonetic_key = phonetic_key(project.opponent_attorney_name)
+
+    @api.depends('opponent_phone', 'opponent_attorney_phone', 'company_id')
+    def _compute_phone_keys(self):
+        keys = self.env['legal.phone.lookup']._normalize_record_phones(
+            self, ['opponent_phone', 'opponent_attorney_phone'])
+        for project, (opponent_key, attorney_key) in zip(self, keys):
+            project.opponent_phone_e164 = opponent_key
+            project.opponent_attorney_phone_e164 = attorney_key
+
+    @api.depends(*LEGAL_SEARCH_FIELDS)
+    def _compute_legal_search_text(self):
+        for project in self:
+            project.legal_search_text = build_search_text(project[name] for name in LEGAL_SEARCH_FIELDS)
+
+    def _compute_legal_search(self):
+        self.legal_search = False
+
+    def _search_legal_search(self, operator, value):
+        """Search a fragment in any of the legal fields.
+
+        The term is normalized like the stored search text, so diacritics,
+        Arabic letter variants, Arabic-Indic digits and punctuation do not
+        matter, and the trigram index serves the ILIKE.
+        """
+        if operator not in ('ilike', 'not ilike') or not isinstance(value, str):
+            raise UserError(_("Unsupported search on case details: %s", operator))
+        term = normalize_name(value)
+        if not term:
+            return expression.TRUE_DOMAIN
+        return [('legal_search_text', operator, term)]
+
     # ========== File Number Generation Methods ==========
     
+    @instrumented('project.get_next_file_number')
     def _get_next_file_number(self):
-        """Get the next available file number with proper concurrency handling.
+        """Get the next available file number from the file number counter.
+        
+        The number is taken from the numbering scope of the case.
         
         Returns:
             int: The next available file number
@@ -78,73 +311,58 @@ class ProjectProject(models.Model):
         Raises:
             UserError: If unable to generate a valid file number
         """
-        # Use a more targeted lock approach for better performance
+        return self._reserve_file_numbers(1)[0]
+
+    @instrumented('project.reserve_file_numbers')
+    def _reserve_file_numbers(self, count, scope=None):
+        """Reserve a contiguous block of file numbers in a single statement.
+        
+        The numbers are taken from the counter row of the scope, which stays
+        locked until the current transaction ends; a rollback returns them
+        to the series.
+        
+        Args:
+            count (int): How many numbers to reserve
+            scope (str): Numbering scope, by default the one of the record
+                (or of the current company when called on the model)
+            
+        Returns:
+            range: The reserved file numbers
+            
+        Raises:
+            UserError: If unable to reserve the numbers
+        """
+        if scope is None:
+            scope = self._get_file_number_scope()
         try:
-            with self.env.cr.savepoint():
-                # Lock only the records we're interested in
-                self.env.cr.execute("""
-                    SELECT office_file_number 
-                    FROM project_project 
-                    WHERE office_file_number IS NOT NULL 
-                    AND office_file_number > 0
-                    ORDER BY office_file_number DESC
-                    LIMIT 1
-                    FOR UPDATE
-                """)
-                
-                result = self.env.cr.fetchone()
-                max_number = result[0] if result else 0
-                next_number = max_number + 1
-                
-                # Double-check that the next number doesn't exist (extra safety)
-                self.env.cr.execute("""
-                    SELECT id FROM project_project 
-                    WHERE office_file_number = %s 
-                    LIMIT 1
-                """, (next_number,))
-                
-                if self.env.cr.fetchone():
-                    # This should rarely happen, but if it does, try a few more numbers
-                    for i in range(1, 11):  # Try up to 10 more numbers
-                        candidate = max_number + 1 + i
-                        self.env.cr.execute("""
-                            SELECT id FROM project_project 
-                            WHERE office_file_number = %s 
-                            LIMIT 1
-                        """, (candidate,))
-                        
-                        if not self.env.cr.fetchone():
-                            return candidate
-                    
-                    # If we still can't find a number, raise an error
-                    raise UserError(_(
-                        "Unable to generate a valid file number. "
-                        "Please contact your system administrator."
-                    ))
-                
-                return next_number
-                
+            return self.env['legal.file.number.counter']._reserve(count, scope)
         except Exception as e:
-            _logger.error("Error generating next file number: %s", str(e), exc_info=True)
+            _logger.error("Error reserving file numbers: %s", str(e), exc_info=True)
             raise UserError(_(
                 "Could not generate the next file number. "
                 "Please try again or contact your system administrator."
             ))
     
-    def _get_current_max_file_number(self):
-        """Get the current maximum file number from the database.
+    def _get_current_max_file_number(self, scope=None):
+        """Get the current maximum file number of a numbering scope.
+        
+        Args:
+            scope (str): Numbering scope, by default the one of the record
+                (or of the current company when called on the model)
         
         Returns:
             int: The maximum file number found, or 0 if none exist
         """
+        if scope is None:
+            scope = self._get_file_number_scope()
         try:
             # Use raw SQL for better performance and reliability
             self.env.cr.execute("""
                 SELECT COALESCE(MAX(office_file_number), 0) 
                 FROM project_project 
-                WHERE office_file_number IS NOT NULL 
+                WHERE file_number_scope = %s
                 AND office_file_number > 0
-            """)
+            """, (scope,))
             result = self.env.cr.fetchone()
             return result[0] if result else 0
             
@@ -152,14 +370,62 @@ class ProjectProject(models.Model):
             _logger.error("Error getting max file number: %s", str(e), exc_info=True)
             return 0
     
-    def action_get_next_office_file_number(self):
-        """Button action to get the next available office file number.
+    def _get_file_number_scope(self):
+        """Return the numbering scope of the case.
+        
+        Called on an empty recordset, returns the scope of a new case of the
+        current company.
         
         Returns:
-            dict: Action result to update the view
+            str: Scope key of the file number counter
         """
-        self.ensure_one()
+        if self:
+            self.ensure_one()
+        return self.env['legal.file.number.counter']._make_scope(
+            self.company_id, self.lawsuit_filing_date)
+
+    @api.model
+    def _get_file_number_scope_from_values(self, vals):
+        """Return the numbering scope of a case about to be created.
         
+        Args:
+            vals (dict): Creation values of the case
+            
+        Returns:
+            str: Scope key of the file number counter
+        """
+        company = self.env['res.company'].browse(vals.get('company_id') or self.env.company.id)
+        return self.env['legal.file.number.counter']._make_scope(
+            company, fields.Date.to_date(vals.get('lawsuit_filing_date')))
+
+    def _group_by_file_number_scope(self):
+        """Split the cases by numbering scope.
+        
+        Returns:
+            dict: Records keyed by scope
+        """
+        groups = defaultdict(lambda: self.browse())
+        for record in self:
+            groups[record._get_file_number_scope()] |= record
+        return groups
+
+    def allocate_office_file_number(self):
+        """Allocate the next office file number of the case and return it.
+        
+        Lightweight alternative to reloading the form: JSON-RPC clients call
+        it through ``/web/dataset/call_kw`` and only receive the two values
+        to display.
+        
+        Returns:
+            dict: The allocated ``office_file_number`` and ``is_file_number_locked``
+            
+        Raises:
+            UserError: If the case is already numbered or no number can be allocated
+        """
+        self.ensure_one()
+        if self.office_file_number or self.is_file_number_locked:
+            raise UserError(_("This case already has a file number."))
+
         try:
             # Get the next available file number
             next_number = self._get_next_file_number()
@@ -167,22 +433,14 @@ class ProjectProject(models.Model):
             # Update the field with proper context to skip validations
             self.with_context(
                 skip_lock_update=True,
-                skip_sequence_validation=True
+                skip_sequence_validation=True,
+                file_number_reserved=True
             ).write({
                 'office_file_number': next_number,
+                'file_number_scope': self._get_file_number_scope(),
                 'is_file_number_locked': True
             })
             
-            # Reload the form to show the updated file number
-            return {
-                'type': 'ir.actions.act_window',
-                'res_model': 'project.project',
-                'res_id': self.id,
-                'view_mode': 'form',
-                'target': 'current',
-                'context': dict(self.env.context),
-            }
-            
         except Exception as e:
             _logger.error("Error getting next file number: %s", str(e), exc_info=True)
             raise UserError(_(
@@ -190,71 +448,117 @@ class ProjectProject(models.Model):
                 "Please try again or contact your system administrator."
             ))
 
+        return {
+            'office_file_number': next_number,
+            'is_file_number_locked': True,
+        }
+
+    def action_get_next_office_file_number(self):
+        """Button action to get the next available office file number.
+        
+        Returns False so the form re-reads the current record in place,
+        instead of running a new window action that reloads the views,
+        the record and the chatter.
+        
+        Returns:
+            bool: False
+        """
+        self.allocate_office_file_number()
+        return False
+
     # ========== Validation Methods ==========
     
     @api.constrains('office_file_number')
+    @instrumented('project.validate_office_file_number')
     def _validate_office_file_number(self):
         """Validate office file number meets all requirements:
         - Must be a positive integer
-        - Must be unique across all projects
-        - Cannot be more than 1 greater than the current maximum (unless generated by system)
+        - Must be unique within its numbering scope
+        - Cannot be more than 1 greater than the current maximum of its scope
+          (unless generated by system)
+        
+        The whole recordset is checked with one grouped duplicate query and
+        one max lookup per scope, so the cost does not grow with the batch
+        size and only the rows of the scopes involved are read.
         """
-        for record in self:
-            if not record.office_file_number:
-                continue
-                
+        numbered = self.filtered('office_file_number')
+        if not numbered:
+            return
+
+        for record in numbered:
             # Check if it's a positive integer
             if not isinstance(record.office_file_number, int) or record.office_file_number <= 0:
                 raise ValidationError(_(
                     "File number must be a positive integer. "
                     "Current value: %s" % record.office_file_number
                 ))
-            
-            # Check for duplicates
-            duplicate = self.search([
-                ('office_file_number', '=', record.office_file_number),
-                ('id', '!=', record.id)
-            ], limit=1)
-            
-            if duplicate:
-                raise ValidationError(_(
-                    "File number %s already exists in another case." % 
-                    record.office_file_number
-                ))
-            
-            # Skip max+1 validation if this was generated by the system or during import
-            if self._context.get('skip_sequence_validation') or self._context.get('install_mode'):
-                continue
-                
-            # Get current maximum number (excluding this record)
-            max_number = self._get_current_max_file_number_excluding(record.id)
-            
-            # If there are existing numbers, enforce the max+1 rule for manual entries
-            if max_number > 0 and record.office_file_number > max_number + 1:
-                raise ValidationError(_(
-                    "File number cannot be more than 1 greater than the "
-                    "highest existing number (%s). Current value: %s. "
-                    "Use the 'Get Next Number' button for automatic numbering." % 
-                    (max_number, record.office_file_number)
-                ))
+
+        numbers_by_scope = defaultdict(set)
+        for record in numbered:
+            numbers_by_scope[record.file_number_scope or FILE_NUMBER_DEFAULT_SCOPE].add(record.office_file_number)
+        pairs = [(scope, number) for scope, numbers in numbers_by_scope.items() for number in numbers]
+
+        # Check for duplicates, both inside the batch and against the database
+        self.flush_model(['office_file_number', 'file_number_scope'])
+        self.env.cr.execute("""
+            SELECT p.office_file_number
+            FROM project_project p
+            JOIN unnest(%s::varchar[], %s::int[]) AS v(scope, number)
+              ON p.file_number_scope = v.scope AND p.office_file_number = v.number
+            WHERE p.office_file_number > 0
+            GROUP BY p.file_number_scope, p.office_file_number
+            HAVING COUNT(*) > 1
+            LIMIT 1
+        """, ([pair[0] for pair in pairs], [pair[1] for pair in pairs]))
+        duplicate = self.env.cr.fetchone()
+
+        if duplicate:
+            raise ValidationError(_(
+                "File number %s already exists in another case." % 
+                duplicate[0]
+            ))
+
+        # Skip max+1 validation if this was generated by the system or during import
+        if self._context.get('skip_sequence_validation') or self._context.get('install_mode'):
+            return
+
+        for scope, numbers in numbers_by_scope.items():
+            # Get current maximum number of the scope (excluding the validated records)
+            max_number = self._get_current_max_file_number_excluding(numbered.ids, scope)
+
+            # If there are existing numbers, enforce the max+1 rule for manual entries;
+            # numbers of the same batch may follow each other
+            if max_number > 0:
+                for number in sorted(numbers):
+                    if number > max_number + 1:
+                        raise ValidationError(_(
+                            "File number cannot be more than 1 greater than the "
+                            "highest existing number (%s). Current value: %s. "
+                            "Use the 'Get Next Number' button for automatic numbering." % 
+                            (max_number, number)
+                        ))
+                    max_number = number
     
-    def _get_current_max_file_number_excluding(self, exclude_record_id):
-        """Get the current maximum file number, excluding a specific record.
+    def _get_current_max_file_number_excluding(self, exclude_record_ids, scope=FILE_NUMBER_DEFAULT_SCOPE):
+        """Get the current maximum file number of a scope, excluding specific records.
         
         Args:
-            exclude_record_id (int): ID of the record to exclude
+            exclude_record_ids (int or list): ID(s) of the records to exclude
+            scope (str): Numbering scope to look in
             
         Returns:
             int: The maximum file number found, or 0 if none exist
         """
+        if isinstance(exclude_record_ids, int):
+            exclude_record_ids = [exclude_record_ids]
         try:
             self.env.cr.execute("""
                 SELECT COALESCE(MAX(office_file_number), 0) 
                 FROM project_project 
-                WHERE office_file_number IS NOT NULL 
+                WHERE file_number_scope = %s
                 AND office_file_number > 0
-                AND id != %s
-            """, (exclude_record_id,))
+                AND id != ALL(%s)
+            """, (scope, list(exclude_record_ids)))
             result = self.env.cr.fetchone()
             return result[0] if result else 0
             
@@ -263,15 +567,24 @@ class ProjectProject(models.Model):
             return 0
 
     @api.model
-    def generate_missing_file_numbers(self):
+    def generate_missing_file_numbers(self, bulk=False, chunk_size=5000, auto_commit=False):
         """Administrative method to generate file numbers for records that don't have them.
         
         This method can be used to fix data inconsistencies or during migration.
         It only affects records that don't already have a file number.
         
+        Args:
+            bulk (bool): Use the set-based backfill, meant for large migrated databases
+            chunk_size (int): Number of records updated per statement in bulk mode
+            auto_commit (bool): Commit after every chunk in bulk mode, so an
+                interrupted run resumes where it stopped
+        
         Returns:
             dict: Summary of the operation
         """
+        if bulk:
+            return self._generate_missing_file_numbers_bulk(chunk_size, auto_commit)
+
         try:
             # Find records without file numbers
             records_without_numbers = self.search([
@@ -285,20 +598,21 @@ class ProjectProject(models.Model):
                     'updated_count': 0
                 }
             
-            # Get the current maximum to continue sequence
-            max_number = self._get_current_max_file_number()
-            
             updated_count = 0
-            for record in records_without_numbers:
-                max_number += 1
-                record.with_context(
-                    skip_sequence_validation=True,
-                    skip_lock_update=True
-                ).write({
-                    'office_file_number': max_number,
-                    'is_file_number_locked': True
-                })
-                updated_count += 1
+            for scope, records in records_without_numbers._group_by_file_number_scope().items():
+                # Reserve the whole block of the scope up front to continue its sequence
+                numbers = self._reserve_file_numbers(len(records), scope)
+                for record, number in zip(records, numbers):
+                    record.with_context(
+                        skip_sequence_validation=True,
+                        skip_lock_update=True,
+                        file_number_reserved=True
+                    ).write({
+                        'office_file_number': number,
+                        'file_number_scope': scope,
+                        'is_file_number_locked': True
+                    })
+                    updated_count += 1
                 
             return {
                 'success': True,
@@ -314,8 +628,155 @@ class ProjectProject(models.Model):
                 'updated_count': 0
             }
 
+    @api.model
+    def _generate_missing_file_numbers_bulk(self, chunk_size, auto_commit):
+        """Assign file numbers to unnumbered records with one UPDATE per chunk.
+        
+        Records are numbered in (create_date, id) order. Each chunk reserves
+        one block of numbers per numbering scope and is written in a single
+        statement that also sets the scope and the lock flag, bypassing the
+        per-record write overrides.
+        When auto_commit is set, every committed chunk is a checkpoint: the
+        next run picks up the records that are still unnumbered, in the same
+        order, so an interrupted backfill can simply be started again.
+        Without it, the whole run is one savepoint of the caller's
+        transaction and a failure rolls back every chunk; with it, each chunk
+        has its own savepoint so a failing chunk leaves no partial numbering
+        behind the last checkpoint.
+        
+        Args:
+            chunk_size (int): Number of records per UPDATE statement
+            auto_commit (bool): Commit after every chunk
+            
+        Returns:
+            dict: Summary of the operation
+        """
+        cr = self.env.cr
+        self.flush_model(['office_file_number', 'file_number_scope', 'is_file_number_locked'])
+        cr.execute("""
+            SELECT COUNT(*)
+            FROM project_project
+            WHERE (office_file_number IS NULL OR office_file_number = 0)
+            AND active
+        """)
+        total = cr.fetchone()[0]
+        if not total:
+            return {
+                'success': True,
+                'message': 'No records found without file numbers.',
+                'updated_count': 0
+            }
+
+        scope_type = self.env['legal.file.number.counter']._get_scope_type()
+        updated_count = 0
+        started = time.monotonic()
+        try:
+            # Without checkpoints the run is all or nothing: a failing chunk
+            # must not leave the earlier ones in the caller's transaction
+            with contextlib.nullcontext() if auto_commit else cr.savepoint():
+                while True:
+                    with cr.savepoint() if auto_commit else contextlib.nullcontext():
+                        chunk_count = self._generate_missing_file_numbers_chunk(chunk_size, scope_type)
+                    if not chunk_count:
+                        break
+                    updated_count += chunk_count
+
+                    if auto_commit:
+                        cr.commit()  # pylint: disable=invalid-commit
+
+                    elapsed = time.monotonic() - started
+                    _logger.info(
+                        "File number backfill: %s/%s records numbered (%.0f records/s)",
+                        updated_count, total, updated_count / elapsed if elapsed else 0.0,
+                    )
+
+        except Exception as e:
+            _logger.error("Error in bulk file number generation: %s", str(e), exc_info=True)
+            return {
+                'success': False,
+                'message': f'Error occurred after {updated_count} records: {str(e)}',
+                'updated_count': updated_count if auto_commit else 0
+            }
+
+        return {
+            'success': True,
+            'message': f'Successfully assigned file numbers to {updated_count} records.',
+            'updated_count': updated_count
+        }
+
+    @api.model
+    def _generate_missing_file_numbers_chunk(self, chunk_size, scope_type):
+        """Number the next ``chunk_size`` unnumbered records in one UPDATE.
+
+        Args:
+            chunk_size (int): Number of records to number
+            scope_type (str): Configured numbering scope type
+
+        Returns:
+            int: Number of records numbered, 0 when none are left
+        """
+        cr = self.env.cr
+        cr.execute("""
+            SELECT id, company_id, lawsuit_filing_date
+            FROM project_project
+            WHERE (office_file_number IS NULL OR office_file_number = 0)
+            AND active
+            ORDER BY create_date, id
+            LIMIT %s
+        """, (chunk_size,))
+        rows = cr.fetchall()
+        if not rows:
+            return 0
+
+        Counter = self.env['legal.file.number.counter']
+        Company = self.env['res.company']
+        ids_by_scope = defaultdict(list)
+        for record_id, company_id, filing_date in rows:
+            scope = Counter._make_scope(Company.browse(company_id), filing_date, scope_type)
+            ids_by_scope[scope].append(record_id)
+        ids, numbers, scopes = [], [], []
+        for scope, scope_ids in ids_by_scope.items():
+            ids += scope_ids
+            numbers += self._reserve_file_numbers(len(scope_ids), scope)
+            scopes += [scope] * len(scope_ids)
+        cr.execute("""
+            UPDATE project_project AS p
+            SET office_file_number = v.number,
+                file_number_scope = v.scope,
+                is_file_number_locked = TRUE,
+                write_uid = %s,
+                write_date = NOW() AT TIME ZONE 'UTC'
+            FROM unnest(%s::int[], %s::int[], %s::varchar[]) AS v(id, number, scope)
+            WHERE p.id = v.id
+        """, (self.env.uid, ids, numbers, scopes))
+        self.invalidate_model([
+            'office_file_number', 'file_number_scope', 'is_file_number_locked', 'write_uid', 'write_date',
+        ])
+        return len(ids)
+
     # ==================== TAG MANAGEMENT ====================
     
+    @api.model
+    @tools.ormcache()
+    def _get_legal_tag_ids(self):
+        """
+        Resolve the Case and Matter tag ids once per registry.
+        
+        The cache is cleared whenever ir.model.data records are written or
+        removed, which covers renamed or deleted tag xmlids.
+        
+        Returns:
+            dict: Tag ids keyed by legal entity type, False when missing
+        """
+        IrModelData = self.env['ir.model.data']
+        return {
+            'case': IrModelData._xmlid_to_res_id(
+                'legal_practice_management.project_tag_case', raise_if_not_found=False),
+            'matter': IrModelData._xmlid_to_res_id(
+                'legal_practice_management.project_tag_matter', raise_if_not_found=False),
+        }
+
+    @instrumented('project.get_context_tag')
     def _get_context_tag(self):
         """
         Determine which tag to add based on the current context.
@@ -324,10 +785,12 @@ class ProjectProject(models.Model):
             project.tags record or None: The appropriate tag based on context
         """
         if self.env.context.get('create_from_cases'):
-            return self.env.ref('legal_practice_management.project_tag_case', raise_if_not_found=False)
-        if self.env.context.get('create_from_matters'):
-            return self.env.ref('legal_practice_management.project_tag_matter', raise_if_not_found=False)
-        return None
+            tag_id = self._get_legal_tag_ids()['case']
+        elif self.env.context.get('create_from_matters'):
+            tag_id = self._get_legal_tag_ids()['matter']
+        else:
+            return None
+        return self.env['project.tags'].browse(tag_id) if tag_id else None
     
     def _default_tag_ids(self):
         """
@@ -347,10 +810,198 @@ class ProjectProject(models.Model):
         default=_default_tag_ids,
         help='Tags for categorizing legal entities'
     )
+
+    legal_entity_type = fields.Selection(
+        LEGAL_ENTITY_TYPE_SELECTION,
+        string=_("Legal Entity Type"),
+        compute='_compute_legal_entity_type',
+        store=True,
+        index=True,
+        help=_("Whether the project is a legal case or a matter, derived from its Case / Matter tag")
+    )
+
+    @api.depends('tag_ids')
+    def _compute_legal_entity_type(self):
+        """Derive the legal entity type from the Case / Matter tags."""
+        legal_tag_ids = self._get_legal_tag_ids()
+        for project in self:
+            tag_ids = project.tag_ids.ids
+            if legal_tag_ids['case'] and legal_tag_ids['case'] in tag_ids:
+                project.legal_entity_type = 'case'
+            elif legal_tag_ids['matter'] and legal_tag_ids['matter'] in tag_ids:
+                project.legal_entity_type = 'matter'
+            else:
+                project.legal_entity_type = False
+    
+    # ==================== DOCKET SEARCH ====================
+
+    @api.model
+    def _name_search(self, name, domain=None, operator='ilike', limit=None, order=None):
+        """Resolve court docket references such as "1234/2023" through the
+        indexed number and year columns, and fragments of the case details
+        through the search text, in addition to the name."""
+        if name and operator in ('ilike', 'like', '=', '=ilike', '=like'):
+            extra_domains = [self._get_docket_domain(name)]
+            if operator == 'ilike' and len(normalize_name(name) or '') >= LEGAL_SEARCH_MIN_LENGTH:
+                extra_domains.append([('legal_search', 'ilike', name)])
+            extra_domains = [extra_domain for extra_domain in extra_domains if extra_domain]
+            if extra_domains:
+                name_domain = expression.OR(extra_domains + [[('name', operator, name)]])
+                return self._search(expression.AND([domain or [], name_domain]), limit=limit, order=order)
+        return super()._name_search(name, domain=domain, operator=operator, limit=limit, order=order)
+
+    @api.model
+    def _get_docket_domain(self, reference):
+        """Return the domain matching a docket reference on either degree.
+        
+        Args:
+            reference (str): Text typed by the user
+            
+        Returns:
+            list: Domain on the parsed docket columns, or [] if the text is
+            not a "number/year" reference
+        """
+        if not DOCKET_REFERENCE.match(reference):
+            return []
+        number, year = parse_case_number(reference)
+        if not (number and year):
+            return []
+        return expression.OR([
+            [(f'{degree}_degree_case_number', '=', number), (f'{degree}_degree_case_year', '=', year)]
+            for degree in ('first', 'second')
+        ])
+    
+    # ==================== DEADLINES ====================
+
+    def _sync_filing_deadlines(self):
+        """Bring the deadlines counted from the lawsuit filing date in line."""
+        self.env['legal.deadline']._sync_rule_deadlines('filing', [
+            (project, None, project.lawsuit_filing_date) for project in self
+        ])
+
+    # ==================== RELATED MATTERS ====================
+
+    def action_view_related_cases(self):
+        """Smart button action listing the cases sharing a party with this one.
+
+        Archived cases are included: closed matters of the same client or
+        opponent are part of the history the lawyer is looking for.
+
+        Returns:
+            dict: Window action on the related cases
+        """
+        self.ensure_one()
+        related_ids = self.env['legal.case.link']._get_related(self.id)
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _("Related Matters of %s", self.display_name),
+            'res_model': 'project.project',
+            'view_mode': 'list,kanban,form',
+            'domain': [('id', 'in', related_ids)],
+            'context': {'active_test': False, 'create': False},
+        }
+
+    # ==================== CONFLICT CHECK ====================
+
+    def action_check_conflicts(self):
+        """Button action to run the conflict-of-interest check on the case.
+        
+        Returns:
+            dict: Notification summarizing the hits
+        """
+        hits = self.env['legal.conflict.check'].check_projects(self)
+        if not hits:
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': _("Conflict Check"),
+                    'message': _("No conflict of interest found."),
+                    'type': 'success',
+                },
+            }
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _("Possible Conflict of Interest"),
+                'message': "\n".join(self._format_conflict_hit(hit) for hit in hits[:10]),
+                'type': 'warning',
+                'sticky': True,
+            },
+        }
+
+    def _format_conflict_hit(self, hit):
+        return _(
+            "%(party)s matches %(match)s (%(role)s, score %(score)s)",
+            party=hit['party'], match=hit['match_name'], role=hit['match_role'], score=hit['score'],
+        )
+
+    def _post_conflict_check_results(self):
+        """Run the conflict check on the cases and log the hits in their chatter."""
+        hits = self.env['legal.conflict.check'].check_projects(self)
+        hits_by_project = {}
+        for hit in hits:
+            hits_by_project.setdefault(hit['project_id'], []).append(hit)
+        for project in self.filtered(lambda p: p.id in hits_by_project):
+            body = Markup("<p>%s</p><ul>%s</ul>") % (
+                _("Possible conflict of interest:"),
+                Markup().join(
+                    Markup("<li>%s</li>") % self._format_conflict_hit(hit)
+                    for hit in hits_by_project[project.id]
+                ),
+            )
+            project.message_post(body=body)
+        return hits
     
+    # ========== Archival ==========
+
+    @api.model
+    def _cron_archive_closed_cases(self, batch_size=1000, auto_commit=False):
+        """Archive the cases and matters closed for longer than the archival delay.
+        
+        Archived cases leave the default lists, searches and partial indexes
+        of the working set; the "Include Archived" filter brings them back.
+        They stay in conflict checks and case statistics.
+        
+        Like any project archival, ``action_archive`` also archives every
+        task of the case, so they leave the task lists too. Restoring the case
+        restores all of its tasks, including the ones archived by hand before.
+        
+        Args:
+            batch_size (int): Number of cases archived per batch
+            auto_commit (bool): Commit after every batch
+            
+        Returns:
+            int: Number of archived cases
+        """
+        days = int(self.env['ir.config_parameter'].sudo().get_param(
+            ARCHIVE_AFTER_DAYS_PARAM, DEFAULT_ARCHIVE_AFTER_DAYS))
+        if days <= 0:
+            return 0
+        limit_date = fields.Date.context_today(self) - datetime.timedelta(days=days)
+        domain = [
+            ('legal_closed_date', '<=', limit_date),
+            ('legal_entity_type', 'in', ('case', 'matter')),
+        ]
+        archived = 0
+        while True:
+            projects = self.search(domain, order='legal_closed_date, id', limit=batch_size)
+            if not projects:
+                break
+            projects.action_archive()
+            archived += len(projects)
+            if auto_commit:
+                self.env.cr.commit()  # pylint: disable=invalid-commit
+            self.env.invalidate_all()
+        if archived:
+            _logger.info("Archived %s closed legal cases", archived)
+        return archived
+
     # ==================== OVERRIDE METHODS ====================
     
     @api.model_create_multi
+    @instrumented('project.create')
     def create(self, vals_list):
         """
         Override create method to handle file number locking and tag management.
@@ -361,13 +1012,35 @@ class ProjectProject(models.Model):
         Returns:
             project.project: Created records
         """
+        # Every numbered case is stamped with the numbering scope it belongs to
+        assign_numbers = self.env.context.get('assign_office_file_number')
+        manual_numbers = defaultdict(int)
+        unnumbered = defaultdict(list)
+        for vals in vals_list:
+            if not vals.get('office_file_number') and not assign_numbers:
+                continue
+            scope = vals.get('file_number_scope') or self._get_file_number_scope_from_values(vals)
+            vals['file_number_scope'] = scope
+            if vals.get('office_file_number'):
+                manual_numbers[scope] = max(manual_numbers[scope], vals['office_file_number'])
+            else:
+                unnumbered[scope].append(vals)
+
+        # Pre-allocate file numbers as one block per scope when asked to
+        for scope, scope_vals in unnumbered.items():
+            numbers = self._reserve_file_numbers(len(scope_vals), scope)
+            for vals, number in zip(scope_vals, numbers):
+                vals['office_file_number'] = number
+
+        # Resolve the context tag once for the whole batch
+        tag = self._get_context_tag()
+
         for vals in vals_list:
             # Handle file number locking
             if 'office_file_number' in vals and vals.get('office_file_number'):
                 vals['is_file_number_locked'] = True
             
             # Handle tag assignment based on context
-            tag = self._get_context_tag()
             if tag:
                 # Initialize tag_ids if not present
                 if 'tag_ids' not in vals:
@@ -393,4 +1066,19 @@ class ProjectProject(models.Model):
                         if tag.id not in vals['tag_ids']:
                             vals['tag_ids'].append(tag.id)
         
-        return super().create(vals_list)
\ No newline at end of file
+        records = super().create(vals_list)
+
+        # Keep the allocator ahead of manually entered numbers
+        if not self.env.context.get('file_number_reserved'):
+            for scope, number in manual_numbers.items():
+                self.env['legal.file.number.counter']._bump(number, scope)
+
+        # Check the new cases for conflicts of interest when asked to
+        if self.env.context.get('legal_conflict_check'):
+            records._post_conflict_check_results()
+
+        records.filtered('lawsuit_filing_date')._sync_filing_deadlines()
+
+        self.env['legal.case.link']._sync_projects(records)
+
+        return records
\ No newline at end of file
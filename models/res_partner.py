@@ -4,26 +4,48 @@ legal practice management - Partner Extensions
 Extends res.partner with legal practice management fields.
 """
 
-from odoo import models, fields, _
-from .constants import LANGUAGE_SELECTION, ENTITY_TYPE_SELECTION, SEX_SELECTION
+from odoo import models, fields, api, _
+from ..utils.normalize import normalize_name, phonetic_key
+from .legal_case_link import CASE_LINK_PARTNER_FIELDS
 
 class ResPartner(models.Model):
-    _inherit = 'res.partner'
+    _inherit = ['res.partner', 'legal.client.identity.mixin']
     _description = 'Legal Case Partner'
 
-    x_client_open_date = fields.Date(string=_('Client Open Date'))
-    x_name_en = fields.Char(string=_('Name in English'))
-    x_nationality = fields.Many2one('res.country', string=_('Nationality'))
-    x_residence_country = fields.Many2one('res.country', string=_('Residence Country'))
-    x_national_id = fields.Char(string=_('National ID'))
-    x_passport_number = fields.Char(string=_('Passport Number'))
-    x_birth_date = fields.Date(string=_('Birth Date'))
-    x_sex = fields.Selection(SEX_SELECTION, string=_('Sex'))
-    x_preferred_language = fields.Selection(LANGUAGE_SELECTION, string=_('Preferred Language'))
-    x_communication_preferences = fields.Text(string=_('Communication Preferences'))
-    x_representative = fields.Char(string=_('Representative'))
-    x_representative_title = fields.Char(string=_('Representative Title'))
-    x_entity_type = fields.Selection(ENTITY_TYPE_SELECTION, string=_('Entity Type'))
-    x_commercial_register_no = fields.Char(string=_('Commercial Register No.'))
-    x_tax_registration_number = fields.Char(string=_('Tax Registration Number'))
-    x_company_activity = fields.Char(string=_('Company Activity')) 
\ No newline at end of file
+    # Lookup keys of the partner's own name and phones. Unlike the client
+    # profile they apply to partners without a profile too: the clients of
+    # cases in the conflict check, and any contact in the caller lookup. On
+    # the profile, they would force a profile row on every partner.
+
+    # Conflict check keys, the English name's key is on the profile
+    legal_name_key = fields.Char(
+        compute='_compute_legal_name_keys', store=True, index='trigram', copy=False)
+    legal_phonetic_key = fields.Char(
+        compute='_compute_legal_name_keys', store=True, index=True, copy=False)
+
+    # Caller lookup keys, see legal.phone.lookup
+    legal_phone_e164 = fields.Char(
+        compute='_compute_legal_phone_keys', store=True, index=True, copy=False)
+    legal_mobile_e164 = fields.Char(
+        compute='_compute_legal_phone_keys', store=True, index=True, copy=False)
+
+    def write(self, vals):
+        """Keep the client links of the related matters in sync."""
+        result = super().write(vals)
+        if any(fname in vals for fname in CASE_LINK_PARTNER_FIELDS):
+            self.env['legal.case.link']._sync_partners(
+                self, keys_changed='parent_id' in vals or 'is_company' in vals)
+        return result
+
+    @api.depends('name')
+    def _compute_legal_name_keys(self):
+        for partner in self:
+            partner.legal_name_key = normalize_name(partner.name)
+            partner.legal_phonetic_key = phonetic_key(partner.name)
+
+    @api.depends('phone', 'mobile', 'country_id', 'company_id')
+    def _compute_legal_phone_keys(self):
+        keys = self.env['legal.phone.lookup']._normalize_record_phones(self, ['phone', 'mobile'], 'country_id')
+        for partner, (phone_key, mobile_key) in zip(self, keys):
+            partner.legal_phone_e164 = phone_key
+            partner.legal_mobile_e164 = mobile_key
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Online Migration Runner
+Build the queued indexes and run the queued backfills of legal.migration.task.
+
+Module upgrades queue the indexes and backfills of large tables instead of
+running them inside the upgrade transaction. Indexes can only be built here:
+``CREATE INDEX CONCURRENTLY`` waits for every older transaction of the
+database, which rules out cron jobs and requests. Backfills are also run by
+the "Legal: Run Online Migrations" cron; running them here just finishes
+them sooner.
+
+Run it after ``-u legal_practice_management``, while Odoo serves users:
+
+    python3 scripts/online_migrate.py -c odoo.conf -d production_db
+    python3 scripts/online_migrate.py -c odoo.conf -d production_db --list
+"""
+
+import argparse
+import sys
+
+import odoo
+from odoo import api, SUPERUSER_ID
+
+
+def list_tasks(env):
+    for task in env['legal.migration.task'].search([]):
+        print(f"{task.state:8} {task.progress:6.1f}%  {task.task_type:9} {task.name}"
+              + (f"  ({task.error.splitlines()[0]})" if task.error else ''))
+
+
+def run_tasks(env, indexes, backfills):
+    """Run the pending tasks in sequence order.
+
+    Returns:
+        int: Number of failed tasks
+    """
+    Tasks = env['legal.migration.task']
+    types = (['index'] if indexes else []) + (['recompute', 'sql'] if backfills else [])
+    failed = 0
+    for task in Tasks.search([('task_type', 'in', types), ('state', 'in', ('pending', 'running'))]):
+        print(f"Running {task.name}...", flush=True)
+        if task.task_type == 'index':
+            succeeded = task._run_index()
+        else:
+            succeeded = task._run_backfill(auto_commit=True)
+        if not succeeded:
+            failed += 1
+            print(f"  failed: {task.error}", flush=True)
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-c', '--config', help="Odoo configuration file")
+    parser.add_argument('-d', '--database', required=True)
+    parser.add_argument('--list', action='store_true', help="Only show the tasks and their progress")
+    parser.add_argument('--indexes-only', action='store_true', help="Leave the backfills to the cron")
+    args = parser.parse_args()
+
+    odoo.tools.config.parse_config(['-c', args.config] if args.config else [])
+    from odoo.modules.registry import Registry
+    registry = Registry(args.database)
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        if args.list:
+            list_tasks(env)
+            return 0
+        failed = run_tasks(env, indexes=True, backfills=not args.indexes_only)
+        list_tasks(env)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
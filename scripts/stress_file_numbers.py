@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - File Number Stress Harness
+Hammer office file number allocation from parallel cursors.
+
+Every worker thread owns its own database cursor and repeatedly runs one of
+the allocation paths, committing after each operation:
+
+    button  create a project, then action_get_next_office_file_number
+    create  create a project with the assign_office_file_number context
+    manual  create a project with MAX + 1 typed in, checked by
+            _validate_office_file_number and the unique index
+
+Serialization failures, deadlocks, unique violations and validation errors
+are rolled back and retried. The counter statements (the allocator's
+UPDATE ... RETURNING and the bump after manual entries) are timed on their
+own, and lock waits sampled from pg_stat_activity are split between the
+counter table and everything else, so the report shows whether the counter
+row is the bottleneck. At the end the harness reports throughput, latency
+percentiles, counter statement time, lock-wait time, failures and retries,
+and checks the series for duplicates and gaps.
+
+Run it against a scratch database, never production:
+
+    python3 scripts/stress_file_numbers.py -c odoo.conf -d stress_db \\
+        --workers 8 --iterations 200 --operations button,create,manual
+"""
+
+import argparse
+import collections
+import json
+import threading
+import time
+import uuid
+
+import psycopg2
+import psycopg2.errors
+
+import odoo
+from odoo import api, SUPERUSER_ID
+from odoo.exceptions import UserError, ValidationError
+from odoo.addons.legal_practice_management.utils.instrumentation import measure_locks
+
+APPLICATION_PREFIX = 'legal_stress_'
+LOCK_SAMPLE_INTERVAL = 0.005
+COUNTER_TABLE = 'legal_file_number_counter'
+
+
+class FileNumberStress:
+
+    def __init__(self, dbname, workers, iterations, operations, max_retries):
+        from odoo.modules.registry import Registry
+        self.registry = Registry(dbname)
+        self.workers = workers
+        self.iterations = iterations
+        self.operations = operations
+        self.max_retries = max_retries
+        self.run_id = uuid.uuid4().hex[:8]
+        self.lock = threading.Lock()
+        self.latencies = collections.defaultdict(list)
+        self.failures = collections.Counter()
+        self.retries = 0
+        self.gave_up = 0
+        self.numbers = []
+        self.counter_seconds = collections.defaultdict(list)
+        self.lock_wait = collections.Counter()
+        self.running = False
+
+    # ========== Operations ==========
+
+    def _op_button(self, env, name):
+        project = env['project.project'].create({'name': name})
+        project.action_get_next_office_file_number()
+        return project.file_number_scope, project.office_file_number
+
+    def _op_create(self, env, name):
+        project = env['project.project'].with_context(assign_office_file_number=True).create({'name': name})
+        return project.file_number_scope, project.office_file_number
+
+    def _op_manual(self, env, name):
+        project = env['project.project'].create({'name': name})
+        number = project._get_current_max_file_number(project._get_file_number_scope()) + 1
+        project.office_file_number = number
+        env.flush_all()
+        return project.file_number_scope, number
+
+    # ========== Workers ==========
+
+    def _worker(self, index):
+        cr = self.registry.cursor()
+        try:
+            cr.execute("SET application_name = %s", ('%s%s_%s' % (APPLICATION_PREFIX, self.run_id, index),))
+            cr.commit()
+            for iteration in range(self.iterations):
+                operation = self.operations[(index + iteration) % len(self.operations)]
+                self._run_with_retries(cr, operation, 'stress-%s-%s-%s' % (self.run_id, index, iteration))
+        finally:
+            cr.close()
+
+    def _run_with_retries(self, cr, operation, name):
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            locks = {'lock_statement_seconds': 0.0}
+            try:
+                env = api.Environment(cr, SUPERUSER_ID, {
+                    'tracking_disable': True,
+                    'mail_create_nolog': True,
+                    'mail_create_nosubscribe': True,
+                })
+                with measure_locks() as locks:
+                    number = getattr(self, '_op_%s' % operation)(env, name)
+                cr.commit()
+            except (psycopg2.Error, UserError, ValidationError) as e:
+                cr.rollback()
+                with self.lock:
+                    self.counter_seconds[operation].append(locks['lock_statement_seconds'])
+                    self.failures[self._classify(e)] += 1
+                    if attempt < self.max_retries:
+                        self.retries += 1
+                    else:
+                        self.gave_up += 1
+                time.sleep(0.001 * 2 ** min(attempt, 6))
+                continue
+            with self.lock:
+                self.latencies[operation].append(time.perf_counter() - started)
+                self.counter_seconds[operation].append(locks['lock_statement_seconds'])
+                self.numbers.append(number)
+            return
+
+    def _classify(self, error):
+        """Name the database error behind an exception, following the chain."""
+        while error is not None:
+            if isinstance(error, psycopg2.errors.SerializationFailure):
+                return 'serialization_failure'
+            if isinstance(error, psycopg2.errors.DeadlockDetected):
+                return 'deadlock'
+            if isinstance(error, psycopg2.errors.UniqueViolation):
+                return 'unique_violation'
+            if isinstance(error, ValidationError):
+                return 'validation_error'
+            error = error.__cause__ or error.__context__
+        return 'other'
+
+    def _sample_lock_waits(self):
+        """Accumulate the time the workers spend waiting on locks, split
+        between the counter statements and the other statements."""
+        with self.registry.cursor() as cr:
+            while self.running:
+                cr.execute("""
+                    SELECT COUNT(*) FILTER (WHERE query LIKE %s), COUNT(*)
+                    FROM pg_stat_activity
+                    WHERE wait_event_type = 'Lock'
+                    AND application_name LIKE %s
+                """, ('%%%s%%' % COUNTER_TABLE, '%s%s_%%' % (APPLICATION_PREFIX, self.run_id)))
+                counter, waiting = cr.fetchone()
+                cr.rollback()
+                self.lock_wait['counter'] += counter * LOCK_SAMPLE_INTERVAL
+                self.lock_wait['other'] += (waiting - counter) * LOCK_SAMPLE_INTERVAL
+                time.sleep(LOCK_SAMPLE_INTERVAL)
+
+    # ========== Run & Report ==========
+
+    def run(self):
+        self.running = True
+        sampler = threading.Thread(target=self._sample_lock_waits, daemon=True)
+        sampler.start()
+        threads = [threading.Thread(target=self._worker, args=(index,)) for index in range(self.workers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        self.running = False
+        sampler.join()
+        return self._report(elapsed)
+
+    def _report(self, elapsed):
+        all_latencies = sorted(latency for values in self.latencies.values() for latency in values)
+        duplicates, gaps = self._check_series()
+        return {
+            'workers': self.workers,
+            'allocations': len(self.numbers),
+            'elapsed': round(elapsed, 3),
+            'allocations_per_second': round(len(self.numbers) / elapsed, 1) if elapsed else 0.0,
+            'latency': {
+                operation: self._percentiles(sorted(values))
+                for operation, values in dict(self.latencies, all=all_latencies).items()
+            },
+            'counter_statement': self._counter_report(),
+            'lock_wait_seconds': {kind: round(seconds, 3) for kind, seconds in self.lock_wait.items()},
+            'failures': dict(self.failures),
+            'retries': self.retries,
+            'gave_up': self.gave_up,
+            'duplicates': duplicates,
+            'gaps': gaps,
+        }
+
+    def _counter_report(self):
+        """Time spent in the counter statements, including their lock waits,
+        per operation and as a share of the successful operations' latency."""
+        all_seconds = sorted(seconds for values in self.counter_seconds.values() for seconds in values)
+        latency = sum(latency for values in self.latencies.values() for latency in values)
+        return {
+            'seconds': round(sum(all_seconds), 3),
+            'share_of_latency': round(sum(all_seconds) / latency, 3) if latency else 0.0,
+            'per_attempt': {
+                operation: self._percentiles(sorted(values))
+                for operation, values in dict(self.counter_seconds, all=all_seconds).items()
+            },
+        }
+
+    def _percentiles(self, values):
+        if not values:
+            return {}
+        return {
+            'p50_ms': round(values[int(len(values) * 0.50)] * 1000, 2),
+            'p99_ms': round(values[min(int(len(values) * 0.99), len(values) - 1)] * 1000, 2),
+            'max_ms': round(values[-1] * 1000, 2),
+        }
+
+    def _check_series(self):
+        """Return the duplicated numbers and the gaps in the ranges used by the
+        run, as (scope, number) pairs."""
+        if not self.numbers:
+            return [], []
+        ranges = collections.defaultdict(list)
+        for scope, number in self.numbers:
+            ranges[scope].append(number)
+        with self.registry.cursor() as cr:
+            cr.execute("""
+                SELECT file_number_scope, office_file_number
+                FROM project_project
+                WHERE office_file_number > 0
+                GROUP BY file_number_scope, office_file_number
+                HAVING COUNT(*) > 1
+                ORDER BY file_number_scope, office_file_number
+            """)
+            duplicates = cr.fetchall()
+            gaps = []
+            for scope, numbers in ranges.items():
+                cr.execute("""
+                    SELECT %s, number
+                    FROM generate_series(%s, %s) AS number
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM project_project
+                        WHERE file_number_scope = %s AND office_file_number = number
+                    )
+                    ORDER BY number
+                """, (scope, min(numbers), max(numbers), scope))
+                gaps += cr.fetchall()
+        return duplicates, gaps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-c', '--config', help="Odoo configuration file")
+    parser.add_argument('-d', '--database', required=True, help="Scratch database with the module installed")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--iterations', type=int, default=100, help="Operations per worker")
+    parser.add_argument('--operations', default='button,create,manual')
+    parser.add_argument('--max-retries', type=int, default=5)
+    args = parser.parse_args()
+
+    odoo.tools.config.parse_config(['-c', args.config] if args.config else [])
+    stress = FileNumberStress(
+        args.database, args.workers, args.iterations, args.operations.split(','), args.max_retries)
+    report = stress.run()
+    print(json.dumps(report, indent=2))
+    return 1 if report['duplicates'] or report['gaps'] else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
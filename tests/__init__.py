@@ -0,0 +1,10 @@
+from . import test_legal_archive
+from . import test_legal_case_import
+from . import test_legal_conflict_check
+from . import test_legal_deadlines
+from . import test_legal_file_numbers
+from . import test_legal_lead_convert
+from . import test_legal_normalize
+from . import test_legal_perf
+from . import test_legal_phone
+from . import test_legal_reminders
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Closed Case Archival Tests
+Closing dates, the archival cron and restoring archived cases.
+"""
+
+import datetime
+
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+from ..models.project import ARCHIVE_AFTER_DAYS_PARAM
+
+
+@tagged('post_install', '-at_install')
+class TestLegalArchive(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.Project = cls.env['project.project'].with_context(create_from_cases=True)
+        cls.closed_stage = cls.env['project.project.stage'].create({'name': 'Closed', 'fold': True})
+        cls.today = fields.Date.context_today(cls.Project)
+        cls.env['ir.config_parameter'].sudo().set_param(ARCHIVE_AFTER_DAYS_PARAM, '30')
+
+        cls.old_case = cls.Project.create({'name': 'Closed Long Ago'})
+        cls.task = cls.env['project.task'].create({'name': 'File the appeal', 'project_id': cls.old_case.id})
+        cls.recent_case = cls.Project.create({'name': 'Closed Recently'})
+        cls.open_case = cls.Project.create({'name': 'Still Open'})
+        (cls.old_case | cls.recent_case).write({'stage_id': cls.closed_stage.id})
+        cls.old_case.legal_closed_date = cls.today - datetime.timedelta(days=31)
+        cls.recent_case.legal_closed_date = cls.today - datetime.timedelta(days=10)
+
+    def test_closing_date(self):
+        case = self.Project.create({'name': 'Closing'})
+        self.assertFalse(case.legal_closed_date)
+        case.stage_id = self.closed_stage
+        self.assertEqual(case.legal_closed_date, self.today)
+
+    def test_archive_closed_cases(self):
+        self.Project._cron_archive_closed_cases(batch_size=1)
+        self.assertFalse(self.old_case.active)
+        self.assertTrue(self.recent_case.active)
+        self.assertTrue(self.open_case.active)
+        # Archiving a project archives its tasks
+        self.assertFalse(self.task.active)
+
+    def test_archival_disabled(self):
+        self.env['ir.config_parameter'].sudo().set_param(ARCHIVE_AFTER_DAYS_PARAM, '0')
+        self.assertEqual(self.Project._cron_archive_closed_cases(), 0)
+        self.assertTrue(self.old_case.active)
+
+    def test_restore_archived_case(self):
+        self.Project._cron_archive_closed_cases()
+        self.old_case.action_unarchive()
+        self.assertTrue(self.old_case.active)
+        self.assertTrue(self.task.active)
+        # A restored case gets a full archival delay again
+        self.assertEqual(self.old_case.legal_closed_date, self.today)
+        self.Project._cron_archive_closed_cases()
+        self.assertTrue(self.old_case.active)
+
+    def test_archived_cases_hidden_by_default(self):
+        self.Project._cron_archive_closed_cases()
+        self.assertNotIn(self.old_case, self.Project.search([('name', '=', 'Closed Long Ago')]))
+        self.assertIn(self.old_case, self.Project.with_context(active_test=False).search([
+            ('name', '=', 'Closed Long Ago'),
+        ]))
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Case Import Tests
+Row mapping, rejected rows and the single-row fallback of failed batches.
+"""
+
+import csv
+import io
+
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import mute_logger
+
+from ..models.file_number_counter import FILE_NUMBER_SCOPE_PARAM
+
+CSV_HEADER = 'name,office_file_number,lawsuit_filing_date,client_status,court_name,tags\n'
+
+
+@tagged('post_install', '-at_install')
+class TestLegalCaseImport(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.Import = cls.env['legal.case.import']
+        cls.env['ir.config_parameter'].sudo().set_param(FILE_NUMBER_SCOPE_PARAM, 'year')
+
+    def _import(self, lines, **kwargs):
+        kwargs.setdefault('assign_file_numbers', False)
+        rejects = io.StringIO()
+        data = io.BytesIO((CSV_HEADER + ''.join(lines)).encode('utf-8'))
+        with mute_logger('odoo.sql_db'):
+            stats = self.Import._import_stream(
+                data, 'csv', reject_stream=rejects, **kwargs)
+        rejects.seek(0)
+        return stats, list(csv.DictReader(rejects))
+
+    def _imported(self, *names):
+        return self.env['project.project'].search([('name', 'in', names)], order='name')
+
+    def test_import_rows(self):
+        stats, rejected = self._import([
+            'Import A,1,1902-01-10,Plaintiff,Cairo Economic Court,Rent\n',
+            'Import B,2,10/01/1902,defendant, Cairo  economic court ,"Rent, Labour"\n',
+        ])
+        self.assertEqual((stats['imported'], stats['rejected']), (2, 0))
+        self.assertFalse(rejected)
+        cases = self._imported('Import A', 'Import B')
+        self.assertEqual(cases.mapped('office_file_number'), [1, 2])
+        self.assertEqual(cases.mapped('client_status'), ['plaintiff', 'defendant'])
+        # Court spellings of one import are unified, tags created once
+        self.assertEqual(set(cases.mapped('court_name')), {'Cairo Economic Court'})
+        self.assertEqual(len(cases.tag_ids.filtered(lambda tag: tag.name == 'Rent')), 1)
+        self.assertTrue(all(case.legal_entity_type == 'case' for case in cases))
+
+    def test_invalid_rows_rejected(self):
+        stats, rejected = self._import([
+            'Import A,1,1902-01-10,plaintiff,,\n',
+            ',2,1902-01-10,,,\n',
+            'Import C,x,1902-01-10,,,\n',
+            'Import D,,1902-31-31,,,\n',
+            'Import E,,1902-01-10,witness,,\n',
+        ])
+        self.assertEqual((stats['imported'], stats['rejected']), (1, 4))
+        self.assertEqual([row['line'] for row in rejected], ['3', '4', '5', '6'])
+        self.assertEqual(rejected[1]['name'], 'Import C')
+        self.assertEqual(self._imported('Import A', 'Import C', 'Import D', 'Import E').mapped('name'), ['Import A'])
+
+    def test_failed_batch_falls_back_to_single_rows(self):
+        stats, rejected = self._import([
+            'Import A,1,1902-01-10,,,\n',
+            'Import B,1,1902-01-11,,,\n',
+            'Import C,2,1902-01-12,,,\n',
+        ], batch_size=10)
+        # The duplicate file number fails the batch, only its row is rejected
+        self.assertEqual((stats['imported'], stats['rejected']), (2, 1))
+        self.assertEqual([row['line'] for row in rejected], ['3'])
+        self.assertEqual(self._imported('Import A', 'Import B', 'Import C').mapped('name'), ['Import A', 'Import C'])
+
+    def test_failed_batch_renumbers_retried_rows(self):
+        Project = self.env['project.project'].with_context(create_from_cases=True, assign_office_file_number=True)
+        missing_partner_id = self.env['res.partner'].search([], order='id desc', limit=1).id + 1000
+        batch = [(line, {}, vals) for line, vals in enumerate([
+            {'name': 'Import A', 'lawsuit_filing_date': '1903-01-10'},
+            {'name': 'Import B', 'lawsuit_filing_date': '1903-01-11', 'partner_id': missing_partner_id},
+            {'name': 'Import C', 'lawsuit_filing_date': '1903-01-12'},
+        ], start=2)]
+        stats = {'imported': 0, 'rejected': 0}
+        rejected = []
+        with mute_logger('odoo.sql_db'):
+            self.Import._create_batch(Project, batch, stats, lambda line, row, error: rejected.append(line))
+        # The bad row took number 2 of the rolled back block; the retried
+        # rows are numbered again, without the gap
+        self.assertEqual((stats['imported'], stats['rejected']), (2, 1))
+        self.assertEqual(rejected, [3])
+        self.assertEqual(self._imported('Import A', 'Import C').mapped('office_file_number'), [1, 2])
+        self.assertEqual([vals.get('office_file_number') for _line, _row, vals in batch], [None] * 3)
+
+    def test_assign_missing_file_numbers(self):
+        stats, _rejected = self._import([
+            'Import A,,1903-01-10,,,\n',
+            'Import B,2,1903-01-11,,,\n',
+            'Import C,,1903-01-12,,,\n',
+        ], assign_file_numbers=True, batch_size=1)
+        self.assertEqual(stats['imported'], 3)
+        # The manual number moves the counter, the next row continues after it
+        self.assertEqual(self._imported('Import A', 'Import B', 'Import C').mapped('office_file_number'), [1, 2, 3])
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Conflict Check Tests
+Opponents against clients, and clients against other cases' opponents.
+"""
+
+from odoo.tests import TransactionCase, new_test_user, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestLegalConflictCheck(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.Check = cls.env['legal.conflict.check']
+        cls.Partner = cls.env['res.partner']
+        cls.Project = cls.env['project.project'].with_context(create_from_cases=True)
+
+        # Clients: partners with a case, or with a legal client profile
+        cls.nile = cls.Partner.create({'name': 'Nile Trading Company'})
+        cls.Project.create({'name': 'Nile v. Port Authority', 'partner_id': cls.nile.id})
+        cls.mohamed = cls.Partner.create({'name': 'محمد عبدالله', 'x_name_en': 'Mohamed Abdallah'})
+        cls.omar = cls.Partner.create({'name': 'Omar', 'x_national_id': '29001011234567'})
+        # A plain contact is not a client
+        cls.contact = cls.Partner.create({'name': 'Delta Supplies'})
+
+    def _partner_hits(self, opponent_name, partner):
+        case = self.Project.create({'name': 'New Case', 'opponent_name': opponent_name})
+        return [
+            hit for hit in self.Check.check_projects(case)
+            if hit['match_model'] == 'res.partner' and hit['match_id'] == partner.id
+        ]
+
+    def test_opponent_is_client(self):
+        hits = self._partner_hits('  nile trading  company', self.nile)
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(hits[0]['role'], 'opponent')
+        self.assertEqual(hits[0]['score'], 1.0)
+
+    def test_opponent_is_not_client(self):
+        self.assertFalse(self._partner_hits('Delta Supplies', self.contact))
+
+    def test_opponent_matches_english_name(self):
+        if not self.env.registry.has_trigram:
+            self.skipTest("Phonetic matches need pg_trgm")
+        hits = self._partner_hits('Mohamed Abdalla', self.mohamed)
+        self.assertEqual(len(hits), 1)
+        self.assertGreaterEqual(hits[0]['score'], 0.9)
+
+    def test_phonetic_hit_needs_similarity(self):
+        # 'Amr' and 'Omar' share a phonetic key but are different names
+        self.assertFalse(self._partner_hits('Amr', self.omar))
+
+    def test_client_is_opponent_elsewhere(self):
+        other = self.Project.create({'name': 'Other Case', 'opponent_attorney_name': 'Nile Trading Company'})
+        case = self.Project.create({'name': 'Nile v. Customs', 'partner_id': self.nile.id})
+        hits = [hit for hit in self.Check.check_projects(case) if hit['match_id'] == other.id]
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(
+            (hits[0]['role'], hits[0]['match_model'], hits[0]['match_role'], hits[0]['score']),
+            ('client', 'project.project', 'opponent_attorney', 1.0),
+        )
+
+    def test_conflict_with_unreadable_case(self):
+        other = self.Project.create({
+            'name': 'Confidential Case',
+            'opponent_name': 'Nile Trading Company',
+            'privacy_visibility': 'followers',
+        })
+        user = new_test_user(self.env, 'legal_restricted', groups='base.group_user,project.group_project_user')
+        self.assertFalse(other.with_user(user)._filter_access_rules('read'))
+        case = self.Project.create({'name': 'Nile v. Tax Authority', 'partner_id': self.nile.id})
+        hits = [
+            hit for hit in self.Check.with_user(user).check_projects(case.with_user(user))
+            if hit['match_id'] == other.id
+        ]
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(hits[0]['match_name'], 'Confidential Case')
+
+    def test_batch_skips_checked_cases(self):
+        other = self.Project.create({'name': 'Other Case', 'opponent_name': 'Nile Trading Company'})
+        cases = self.Project.create([
+            {'name': 'Batch 1', 'partner_id': self.nile.id},
+            {'name': 'Batch 2', 'opponent_name': 'Nile Trading Company'},
+        ])
+        hits = self.Check.check_projects(cases)
+        project_hits = [hit for hit in hits if hit['match_model'] == 'project.project']
+        # The cases of the batch are not matched against each other
+        self.assertEqual([hit['match_id'] for hit in project_hits], [other.id])
+        self.assertEqual(project_hits[0]['project_id'], cases[0].id)
+
+    def test_threshold_does_not_leak(self):
+        if not self.env.registry.has_trigram:
+            self.skipTest("The similarity threshold needs pg_trgm")
+        self.env.cr.execute("SELECT current_setting('pg_trgm.similarity_threshold')")
+        before = self.env.cr.fetchone()[0]
+        self.Check.check_projects(self.Project.create({'name': 'Threshold', 'opponent_name': 'Nile'}), threshold=0.9)
+        self.env.cr.execute("SELECT current_setting('pg_trgm.similarity_threshold')")
+        self.assertEqual(self.env.cr.fetchone()[0], before)
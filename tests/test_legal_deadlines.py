@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Deadline Rule Tests
+Deadlines generated, moved and cancelled with the events they count from.
+"""
+
+import datetime
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestLegalDeadlines(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        Rule = cls.env['legal.deadline.rule']
+        # Only the rules of the tests apply
+        Rule.search([]).active = False
+        cls.answer_rule = Rule.create({
+            'name': 'Statement of defence', 'trigger': 'filing',
+            'offset_number': 30, 'offset_unit': 'days', 'legal_entity_type': 'case',
+        })
+        cls.matter_rule = Rule.create({
+            'name': 'Matter review', 'trigger': 'filing',
+            'offset_number': 2, 'offset_unit': 'weeks', 'legal_entity_type': 'matter',
+        })
+        cls.appeal_rule = Rule.create({
+            'name': 'Appeal window', 'trigger': 'judgment',
+            'offset_number': 1, 'offset_unit': 'months',
+        })
+        cls.case = cls.env['project.project'].with_context(create_from_cases=True).create({
+            'name': 'Deadline Case',
+            'lawsuit_filing_date': '2024-01-01',
+        })
+
+    def _deadlines(self, rule, state='open'):
+        return self.env['legal.deadline'].search([
+            ('project_id', '=', self.case.id),
+            ('rule_id', '=', rule.id),
+            ('state', '=', state),
+        ])
+
+    def test_filing_rules(self):
+        deadline = self._deadlines(self.answer_rule)
+        self.assertEqual(len(deadline), 1)
+        self.assertEqual(deadline.date_deadline, datetime.date(2024, 1, 31))
+        self.assertEqual(deadline.name, 'Statement of defence')
+        # Rules of the other entity type do not apply
+        self.assertFalse(self._deadlines(self.matter_rule))
+
+    def test_filing_date_moves_deadline(self):
+        deadline = self._deadlines(self.answer_rule)
+        self.case.lawsuit_filing_date = datetime.date(2024, 2, 1)
+        self.assertEqual(self._deadlines(self.answer_rule), deadline)
+        self.assertEqual(deadline.date_deadline, datetime.date(2024, 3, 2))
+
+    def test_cleared_filing_date_cancels_deadline(self):
+        deadline = self._deadlines(self.answer_rule)
+        self.case.lawsuit_filing_date = False
+        self.assertEqual(deadline.state, 'cancelled')
+        self.assertFalse(self._deadlines(self.answer_rule))
+
+    def test_done_deadline_is_kept(self):
+        deadline = self._deadlines(self.answer_rule)
+        deadline.action_done()
+        self.case.lawsuit_filing_date = datetime.date(2024, 2, 1)
+        self.assertEqual(deadline.date_deadline, datetime.date(2024, 1, 31))
+        # A new open deadline is counted from the new date
+        self.assertEqual(self._deadlines(self.answer_rule).date_deadline, datetime.date(2024, 3, 2))
+
+    def test_judgment_rules(self):
+        hearing = self.env['legal.hearing'].create({
+            'name': 'Judgment',
+            'project_id': self.case.id,
+            'date': datetime.datetime(2024, 5, 10, 9, 0),
+            'is_judgment': True,
+        })
+        self.assertFalse(self._deadlines(self.appeal_rule))
+        hearing.state = 'held'
+        deadline = self._deadlines(self.appeal_rule)
+        self.assertEqual(deadline.date_deadline, datetime.date(2024, 6, 10))
+        self.assertEqual(deadline.hearing_id, hearing)
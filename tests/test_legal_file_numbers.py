@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - File Number Tests
+Counter allocation and office file number validation.
+"""
+
+from psycopg2 import IntegrityError
+
+from odoo.exceptions import ValidationError
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import mute_logger
+
+from ..models.file_number_counter import FILE_NUMBER_SCOPE_PARAM
+
+
+@tagged('post_install', '-at_install')
+class TestLegalFileNumbers(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.Counter = cls.env['legal.file.number.counter']
+        cls.Project = cls.env['project.project'].with_context(create_from_cases=True)
+        # Yearly series of years no real case is filed in keep the tests apart
+        cls.env['ir.config_parameter'].sudo().set_param(FILE_NUMBER_SCOPE_PARAM, 'year')
+
+    def _create_case(self, number, year=1901, **vals):
+        return self.Project.create(dict(
+            vals, name='Case %s/%s' % (number, year),
+            office_file_number=number, lawsuit_filing_date='%s-03-01' % year,
+        ))
+
+    def _last_number(self, scope):
+        return self.Counter.search([('scope', '=', scope)]).last_number
+
+    # ========== Counter ==========
+
+    def test_reserve_blocks(self):
+        scope = 'year:1900'
+        self.assertEqual(self.Counter._reserve(3, scope), range(1, 4))
+        self.assertEqual(self.Counter._reserve(1, scope), range(4, 5))
+        self.assertEqual(self.Counter._reserve(0, scope), range(0))
+        self.assertEqual(self._last_number(scope), 4)
+
+    def test_seed_from_existing_numbers(self):
+        case = self._create_case(1)
+        self._create_case(2)
+        self.Counter.search([('scope', '=', case.file_number_scope)]).unlink()
+        self.Counter._seed(case.file_number_scope)
+        self.assertEqual(self._last_number(case.file_number_scope), 2)
+        self.assertEqual(self.Counter._reserve(2, case.file_number_scope), range(3, 5))
+
+    def test_reserve_seeds_missing_scope(self):
+        case = self._create_case(1)
+        self.Counter.search([('scope', '=', case.file_number_scope)]).unlink()
+        self.assertEqual(self.Counter._reserve(1, case.file_number_scope), range(2, 3))
+
+    def test_bump_never_goes_back(self):
+        scope = 'year:1900'
+        self.Counter._bump(10, scope)
+        self.assertEqual(self._last_number(scope), 10)
+        self.Counter._bump(5, scope)
+        self.Counter._bump(0, scope)
+        self.assertEqual(self._last_number(scope), 10)
+        self.assertEqual(self.Counter._reserve(1, scope), range(11, 12))
+
+    def test_manual_number_bumps_counter(self):
+        case = self._create_case(1)
+        self.assertEqual(case.file_number_scope, 'year:1901')
+        self.assertTrue(case.is_file_number_locked)
+        self.assertEqual(self._last_number(case.file_number_scope), 1)
+
+    def test_assigned_numbers_per_scope(self):
+        cases = self.Project.with_context(assign_office_file_number=True).create([
+            {'name': 'Assigned 1', 'lawsuit_filing_date': '1902-01-01'},
+            {'name': 'Assigned 2', 'lawsuit_filing_date': '1902-06-01'},
+            {'name': 'Assigned 3', 'lawsuit_filing_date': '1903-01-01'},
+        ])
+        self.assertEqual(cases.mapped('office_file_number'), [1, 2, 1])
+        self.assertEqual(cases.mapped('file_number_scope'), ['year:1902', 'year:1902', 'year:1903'])
+
+    # ========== Validation ==========
+
+    def test_consecutive_batch_is_valid(self):
+        self._create_case(1)
+        cases = self.Project.create([
+            {'name': 'Batch 2', 'office_file_number': 2, 'lawsuit_filing_date': '1901-04-01'},
+            {'name': 'Batch 3', 'office_file_number': 3, 'lawsuit_filing_date': '1901-05-01'},
+        ])
+        self.assertEqual(cases.mapped('office_file_number'), [2, 3])
+
+    def test_same_number_in_other_scope_is_valid(self):
+        self._create_case(1, year=1901)
+        case = self._create_case(1, year=1902)
+        self.assertEqual(case.file_number_scope, 'year:1902')
+
+    @mute_logger('odoo.sql_db')
+    def test_duplicate_number_rejected(self):
+        self._create_case(1)
+        with self.assertRaises((ValidationError, IntegrityError)):
+            self._create_case(1)
+
+    @mute_logger('odoo.sql_db')
+    def test_duplicate_number_in_batch_rejected(self):
+        with self.assertRaises((ValidationError, IntegrityError)):
+            self.Project.create([
+                {'name': 'Twin 1', 'office_file_number': 1, 'lawsuit_filing_date': '1901-04-01'},
+                {'name': 'Twin 2', 'office_file_number': 1, 'lawsuit_filing_date': '1901-05-01'},
+            ])
+
+    def test_gap_above_max_rejected(self):
+        self._create_case(1)
+        with self.assertRaises(ValidationError):
+            self._create_case(3)
+
+    def test_gap_allowed_for_system_numbers(self):
+        self._create_case(1)
+        case = self.Project.with_context(skip_sequence_validation=True).create({
+            'name': 'Migrated', 'office_file_number': 10, 'lawsuit_filing_date': '1901-04-01',
+        })
+        self.assertEqual(case.office_file_number, 10)
+
+    def test_non_positive_number_rejected(self):
+        with self.assertRaises(ValidationError):
+            self._create_case(-4)
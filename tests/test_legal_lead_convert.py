@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Lead Conversion Tests
+Matching leads to existing clients by identity number and opening cases.
+"""
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestLegalLeadConvert(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True, mail_create_nolog=True))
+        cls.Lead = cls.env['crm.lead']
+        cls.client = cls.env['res.partner'].create({
+            'name': 'Hassan Ali',
+            'x_national_id': '29801-0112 345',
+        })
+
+    def _convert(self, leads, **vals):
+        wizard = self.env['legal.lead.convert'].create(dict(vals, lead_ids=[(6, 0, leads.ids)]))
+        wizard.action_convert()
+        return wizard
+
+    def test_match_existing_client(self):
+        lead = self.Lead.create({
+            'name': 'Rent dispute',
+            'type': 'lead',
+            'contact_name': 'H. Ali',
+            'x_national_id': '٢٩٨٠١٠١١٢٣٤٥',
+            'x_passport_number': 'A1234567',
+        })
+        wizard = self._convert(lead)
+        self.assertEqual(lead.partner_id, self.client)
+        self.assertEqual(lead.type, 'opportunity')
+        # Missing profile fields are filled, existing ones kept
+        self.assertEqual(self.client.x_passport_number, 'A1234567')
+        self.assertEqual(self.client.x_national_id, '29801-0112 345')
+        self.assertEqual((wizard.created_partner_count, wizard.matched_partner_count), (0, 1))
+
+    def test_leads_of_one_new_client_share_it(self):
+        leads = self.Lead.create([{
+            'name': 'Contract review %s' % index,
+            'type': 'lead',
+            'partner_name': 'Acme Legal Holdings',
+            'x_commercial_register_no': register_no,
+        } for index, register_no in enumerate(['CR-555', 'cr 555'])])
+        wizard = self._convert(leads)
+        partner = leads[0].partner_id
+        self.assertTrue(partner)
+        self.assertEqual(leads[1].partner_id, partner)
+        self.assertTrue(partner.is_company)
+        self.assertEqual(partner.x_commercial_register_no, 'CR-555')
+        self.assertEqual((wizard.created_partner_count, wizard.matched_partner_count), (1, 0))
+        self.assertEqual(set(leads.mapped('type')), {'opportunity'})
+
+    def test_convert_with_cases(self):
+        leads = self.Lead.create([
+            {'name': 'Labour claim', 'type': 'lead', 'x_national_id': '298010112345'},
+            {'name': 'Appeal', 'type': 'lead', 'contact_name': 'Sara Kamel', 'x_national_id': '29505051234567'},
+        ])
+        wizard = self._convert(leads, create_cases=True)
+        self.assertEqual(wizard.created_case_count, 2)
+        cases = self.env['project.project'].search([('partner_id', 'in', leads.partner_id.ids)])
+        self.assertEqual(len(cases), 2)
+        self.assertEqual(set(cases.mapped('partner_id')), set(leads.mapped('partner_id')))
+        self.assertEqual(set(cases.mapped('legal_entity_type')), {'case'})
+        numbers = cases.mapped('office_file_number')
+        self.assertTrue(all(numbers))
+        self.assertEqual(len(set(numbers)), 2)
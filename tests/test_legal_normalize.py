@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Normalization Tests
+Folding of digits, names, docket numbers and phone numbers.
+"""
+
+from odoo.tests import TransactionCase, tagged
+
+from ..utils.normalize import (
+    fold_digits,
+    normalize_identifier,
+    normalize_name,
+    normalize_phone,
+    parse_case_number,
+    phonetic_key,
+)
+
+
+@tagged('post_install', '-at_install')
+class TestLegalNormalize(TransactionCase):
+
+    def test_fold_digits(self):
+        self.assertEqual(fold_digits('١٢٣٤'), '1234')
+        self.assertEqual(fold_digits('۱۲۳۴'), '1234')
+        self.assertEqual(fold_digits('Case 12/٢٠٢٣'), 'Case 12/2023')
+        self.assertFalse(fold_digits(False))
+
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name('  Ahmed  AL-Sayed '), 'ahmed al sayed')
+        self.assertEqual(normalize_name('أحمد'), normalize_name('احمد'))
+        self.assertFalse(normalize_name('--'))
+
+    def test_normalize_identifier(self):
+        self.assertEqual(normalize_identifier('29801-0112 345'), '298010112345')
+        self.assertEqual(normalize_identifier('٢٩٨٠١٠١١٢٣٤٥'), '298010112345')
+        self.assertEqual(normalize_identifier('ab-12'), 'AB12')
+        self.assertFalse(normalize_identifier(' - '))
+
+    def test_phonetic_key(self):
+        self.assertEqual(phonetic_key('Mohamed Abdallah'), 'mhmdbdl')
+        self.assertEqual(phonetic_key('محمد عبدالله'), 'mhmdbdl')
+        self.assertEqual(phonetic_key('Al Sayed'), phonetic_key('السيد'))
+        # Coarse on purpose: the conflict check confirms these by similarity
+        self.assertEqual(phonetic_key('Amr'), phonetic_key('Omar'))
+        self.assertFalse(phonetic_key(''))
+
+    def test_parse_case_number(self):
+        self.assertEqual(parse_case_number('1234/2023'), (1234, 2023))
+        self.assertEqual(parse_case_number('1234 - 2023'), (1234, 2023))
+        self.assertEqual(parse_case_number('١٢٣٤ لسنة ٢٠٢٣'), (1234, 2023))
+        self.assertEqual(parse_case_number('2023/1234'), (1234, 2023))
+        self.assertEqual(parse_case_number('12/99'), (12, 1999))
+        self.assertEqual(parse_case_number('1234'), (1234, False))
+
+    def test_parse_case_number_invalid(self):
+        self.assertEqual(parse_case_number(''), (False, False))
+        self.assertEqual(parse_case_number('no digits'), (False, False))
+        # Too large for an INTEGER column
+        self.assertEqual(parse_case_number('99999999999/2020'), (False, 2020))
+
+    def test_normalize_phone(self):
+        expected = '+201001234567'
+        self.assertEqual(normalize_phone('+20-100-123-4567'), expected)
+        self.assertEqual(normalize_phone('0020 100 123 4567'), expected)
+        self.assertEqual(normalize_phone('٠١٠٠ ١٢٣ ٤٥٦٧', region='EG', calling_code=20), expected)
+        self.assertEqual(normalize_phone('0100 123 4567', region='EG', calling_code=20), expected)
+        # National number without a default country
+        self.assertEqual(normalize_phone('0100 123 4567'), '01001234567')
+        self.assertFalse(normalize_phone('--'))
+        self.assertFalse(normalize_phone(False))
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Performance Benchmarks
+Query-count ceilings and timings of the project.project legal overrides.
+
+Tagged -standard, so plain --test-enable runs skip it. Run with:
+    ./odoo-bin -d <db> -i legal_practice_management --test-tags legal_perf --stop-after-init
+
+Environment variables:
+    LEGAL_PERF_SCALES       Comma separated project counts to seed (default 100,
+                            use 1000,10000,100000 for a full benchmark)
+    LEGAL_PERF_BASELINE     JSON file with reference timings (default tests/perf_baseline.json)
+    LEGAL_PERF_TOLERANCE    Allowed slowdown against the baseline (default 0.5, i.e. +50%)
+    LEGAL_PERF_OUTPUT       Where to write the measured timings (default: not written)
+"""
+
+import json
+import logging
+import os
+import time
+
+from lxml import etree
+
+from odoo.tests import TransactionCase, tagged
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_SCALES = '100'
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'perf_baseline.json')
+BATCH_SIZE = 100
+
+# Query ceilings. Allocator and validation paths are constant; batch create
+# and write may only add a fixed number of queries over a single-record call.
+QUERY_CEILINGS = {
+    'next_file_number': 1,
+    'reserve_block': 1,
+    # reserve, UPDATE, duplicate check
+    'get_next_number_button': 3,
+    # reserve, duplicate check, max + 1 check
+    'numbered_create_extra': 3,
+    'validate_batch': 3,
+    # COUNT, SAVEPOINT, SELECT, reserve, UPDATE, empty SELECT, RELEASE
+    'backfill_chunk': 7,
+    'batch_create_extra': 10,
+    'batch_write_extra': 5,
+    'related_cases': 1,
+}
+
+
+@tagged('post_install', '-at_install', '-standard', 'legal_perf')
+class TestLegalPerformance(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(
+            cls.env.context,
+            tracking_disable=True,
+            mail_create_nolog=True,
+            mail_create_nosubscribe=True,
+        ))
+        cls.Project = cls.env['project.project']
+        cls.template = cls.Project.with_context(create_from_cases=True).create({
+            'name': 'Legal Perf Template',
+            'court_name': 'Cairo Economic Court',
+            'opponent_name': 'Legal Perf Opponent',
+        })
+        cls.scales = [int(scale) for scale in os.environ.get('LEGAL_PERF_SCALES', DEFAULT_SCALES).split(',')]
+        cls.baseline_path = os.environ.get('LEGAL_PERF_BASELINE', DEFAULT_BASELINE)
+        cls.tolerance = float(os.environ.get('LEGAL_PERF_TOLERANCE', '0.5'))
+        cls.baseline = {}
+        if os.path.exists(cls.baseline_path):
+            with open(cls.baseline_path) as baseline_file:
+                cls.baseline = json.load(baseline_file)
+        cls.timings = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        output_path = os.environ.get('LEGAL_PERF_OUTPUT')
+        if output_path:
+            with open(output_path, 'w') as output_file:
+                json.dump(cls.timings, output_file, indent=2, sort_keys=True)
+            _logger.info("Legal performance timings written to %s", output_path)
+        super().tearDownClass()
+
+    # ========== Helpers ==========
+
+    def _seed_projects(self, count, numbered=True):
+        """Clone the template project ``count`` times with one INSERT ... SELECT."""
+        cr = self.env.cr
+        self.env.flush_all()
+        cr.execute("""
+            SELECT column_name
+            FROM information_schema.columns
+            WHERE table_schema = current_schema()
+            AND table_name = 'project_project'
+            AND column_name NOT IN (
+                'id', 'office_file_number', 'file_number_scope', 'is_file_number_locked', 'alias_id')
+        """)
+        columns = ', '.join('"%s"' % row[0] for row in cr.fetchall())
+        scope = self.Project._get_file_number_scope()
+        offset = self.Project._get_current_max_file_number(scope)
+        cr.execute(f"""
+            INSERT INTO project_project ({columns}, office_file_number, file_number_scope, is_file_number_locked)
+            SELECT {columns}, CASE WHEN %(numbered)s THEN %(offset)s + g END,
+                   CASE WHEN %(numbered)s THEN %(scope)s END, %(numbered)s
+            FROM project_project, generate_series(1, %(count)s) AS g
+            WHERE id = %(template)s
+        """, {'numbered': numbered, 'offset': offset, 'scope': scope, 'count': count, 'template': self.template.id})
+        if numbered:
+            self.env['legal.file.number.counter']._bump(offset + count, scope)
+        self.env.invalidate_all()
+
+    def _count_queries(self, func):
+        self.env.flush_all()
+        start = self.env.cr.sql_log_count
+        func()
+        self.env.flush_all()
+        return self.env.cr.sql_log_count - start
+
+    def _timed(self, operation, scale, func):
+        """Run ``func``, record its wall time and compare it with the baseline."""
+        started = time.perf_counter()
+        result = func()
+        self.env.flush_all()
+        elapsed = time.perf_counter() - started
+        key = f'{operation}@{scale}'
+        self.timings[key] = elapsed
+        reference = self.baseline.get(key)
+        if reference is None:
+            _logger.warning("No baseline timing for %s in %s", key, self.baseline_path)
+        else:
+            self.assertLessEqual(
+                elapsed, reference * (1 + self.tolerance),
+                f"{key} took {elapsed:.4f}s, baseline is {reference:.4f}s",
+            )
+        return result
+
+    def _allocate_with_reload(self, project):
+        """The former "Get Next Number" round trip: the button answered with a
+        window action, for which the client loaded the form view and read the
+        record again.
+
+        Returns:
+            int: Size in bytes of the JSON sent back to the client
+        """
+        number = project.allocate_office_file_number()['office_file_number']
+        views = project.get_views([(False, 'form')])
+        arch = etree.fromstring(views['views']['form']['arch'])
+        spec = {node.get('name'): {} for node in arch.xpath('//field[not(ancestor::field)]')}
+        records = project.web_read(spec)
+        self.assertEqual(records[0]['office_file_number'], number)
+        return len(json.dumps([views, records], default=str))
+
+    def _new_vals(self, count, prefix):
+        return [{'name': f'{prefix} {index}', 'court_name': 'Giza Court'} for index in range(count)]
+
+    # ========== Benchmarks ==========
+
+    def test_benchmarks(self):
+        seeded = 0
+        for scale in self.scales:
+            self._seed_projects(scale - seeded)
+            seeded = scale
+            with self.subTest(scale=scale):
+                self._run_benchmarks(scale)
+
+    def _run_benchmarks(self, scale):
+        Project = self.Project.with_context(create_from_cases=True)
+
+        # Warm the registry caches (tag ids, counter row) before counting
+        Project.create(self._new_vals(1, 'Warm-up'))
+        self.Project._get_next_file_number()
+
+        # File number allocation
+        with self.assertQueryCount(QUERY_CEILINGS['next_file_number']):
+            self._timed('next_file_number', scale, self.Project._get_next_file_number)
+        with self.assertQueryCount(QUERY_CEILINGS['reserve_block']):
+            self._timed('reserve_block', scale, lambda: self.Project._reserve_file_numbers(BATCH_SIZE))
+
+        # "Get Next Number" from the form: RPC answer against a full reload
+        reload_case, rpc_case = Project.create(self._new_vals(2, 'Allocate'))
+        payloads = {}
+        self.env.invalidate_all()
+        reload_queries = self._count_queries(lambda: payloads.update(reload=self._timed(
+            'allocate_reload', scale, lambda: self._allocate_with_reload(reload_case))))
+        self.env.invalidate_all()
+        rpc_queries = self._count_queries(lambda: payloads.update(rpc=self._timed(
+            'allocate_rpc', scale, lambda: len(json.dumps(rpc_case.allocate_office_file_number())))))
+        _logger.info(
+            "Get Next Number at %s projects: reload %s queries / %s bytes, rpc %s queries / %s bytes",
+            scale, reload_queries, payloads['reload'], rpc_queries, payloads['rpc'],
+        )
+        self.assertLess(rpc_queries, reload_queries)
+        self.assertLess(payloads['rpc'], payloads['reload'])
+
+        # The form button itself, on a case the form has already read
+        button_case = Project.create(self._new_vals(1, 'Button'))
+        button_case.read(['office_file_number', 'is_file_number_locked', 'company_id', 'lawsuit_filing_date'])
+        self.env.flush_all()
+        with self.assertQueryCount(QUERY_CEILINGS['get_next_number_button']):
+            self.assertFalse(self._timed(
+                'get_next_number_button', scale, button_case.action_get_next_office_file_number))
+        self.assertTrue(button_case.is_file_number_locked)
+
+        # Single and batch create
+        single_create = self._count_queries(lambda: Project.create(self._new_vals(1, 'Single')))
+        with self.assertQueryCount(single_create + QUERY_CEILINGS['batch_create_extra']):
+            records = self._timed('batch_create', scale, lambda: Project.create(self._new_vals(BATCH_SIZE, 'Batch')))
+
+        numbered_context = dict(assign_office_file_number=True)
+        with self.assertQueryCount(single_create + QUERY_CEILINGS['numbered_create_extra']):
+            single_numbered = self._count_queries(
+                lambda: Project.with_context(**numbered_context).create(self._new_vals(1, 'Numbered')))
+        with self.assertQueryCount(single_numbered + QUERY_CEILINGS['batch_create_extra']):
+            numbered = self._timed('batch_create_numbered', scale, lambda: Project.with_context(
+                **numbered_context).create(self._new_vals(BATCH_SIZE, 'Numbered')))
+
+        # Single and batch write
+        single_write = self._count_queries(lambda: records[0].write({'court_circle': 'Single'}))
+        with self.assertQueryCount(single_write + QUERY_CEILINGS['batch_write_extra']):
+            self._timed('batch_write', scale, lambda: records.write({'court_circle': 'Batch'}))
+
+        # Set-based validation
+        with self.assertQueryCount(QUERY_CEILINGS['validate_batch']):
+            self._timed('validate_batch', scale, numbered._validate_office_file_number)
+
+        # Related matters: the seeded cases all share the template's opponent
+        self._timed('case_links_rebuild', scale, self.env['legal.case.link'].rebuild)
+        with self.assertQueryCount(QUERY_CEILINGS['related_cases']):
+            related_ids = self._timed('related_cases', scale, lambda: self.env['legal.case.link']._get_related(
+                self.template.id))
+        self.assertGreaterEqual(len(related_ids), scale)
+
+        # Bulk backfill of one chunk
+        self._seed_projects(BATCH_SIZE, numbered=False)
+        with self.assertQueryCount(QUERY_CEILINGS['backfill_chunk']):
+            result = self._timed('backfill_chunk', scale, lambda: self.Project.generate_missing_file_numbers(
+                bulk=True, chunk_size=BATCH_SIZE * 10))
+        self.assertTrue(result['success'])
+        self.assertGreaterEqual(result['updated_count'], BATCH_SIZE)
+        self.assertFalse(self.Project.search_count([('office_file_number', '=', False)]))
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Caller Lookup Tests
+Stored phone keys and looked up numbers resolved in the same country.
+"""
+
+from odoo.tests import TransactionCase, tagged
+
+from ..models.legal_phone import PHONE_COUNTRY_PARAM
+
+
+@tagged('post_install', '-at_install')
+class TestLegalPhoneLookup(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.Lookup = cls.env['legal.phone.lookup']
+        cls.env['ir.config_parameter'].sudo().set_param(PHONE_COUNTRY_PARAM, False)
+        cls.env.ref('base.main_company').country_id = cls.env.ref('base.eg')
+        cls.partner = cls.env['res.partner'].create({
+            'name': 'Caller', 'phone': '0100 123 4567', 'company_id': False,
+        })
+        cls.case = cls.env['project.project'].create({
+            'name': 'Caller Case', 'opponent_phone': '0100 123 4567',
+        })
+
+    def test_lookup_returns_ids(self):
+        result = self.Lookup.lookup_phone('+20 100 123 4567')
+        self.assertEqual(result['key'], '+201001234567')
+        self.assertIn(self.partner.id, result['partner_ids'])
+        self.assertIn(self.case.id, result['project_ids'])
+        self.assertEqual((result['archived_partner_ids'], result['archived_project_ids']), ([], []))
+
+    def test_lookup_finds_archived_callers(self):
+        self.partner.active = False
+        result = self.Lookup.lookup_phone('0100 123 4567')
+        self.assertIn(self.partner.id, result['partner_ids'])
+        self.assertEqual(result['archived_partner_ids'], [self.partner.id])
+
+    def test_company_without_country_uses_stored_fallback(self):
+        self.assertEqual(self.partner.legal_phone_e164, '+201001234567')
+        company = self.env['res.company'].create({'name': 'No Country Branch'})
+        result = self.Lookup.with_company(company).lookup_phone('0100 123 4567')
+        self.assertEqual(result['key'], '+201001234567')
+        self.assertIn(self.partner.id, result['partner_ids'])
+
+    def test_unknown_number(self):
+        result = self.Lookup.lookup_phone('--')
+        self.assertEqual(result, {
+            'key': False, 'project_ids': [], 'partner_ids': [],
+            'archived_project_ids': [], 'archived_partner_ids': [],
+        })
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Reminder Tests
+Reminder dates and activities of hearings and deadlines.
+"""
+
+import datetime
+
+from odoo.tests import TransactionCase, new_test_user, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestLegalReminders(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.case = cls.env['project.project'].with_context(create_from_cases=True).create({'name': 'Reminder Case'})
+        cls.lawyer = new_test_user(cls.env, 'legal_riyadh', groups='base.group_user', tz='Asia/Riyadh')
+
+    def test_evening_hearing_local_date(self):
+        # 22:30 UTC is 01:30 the next day in Riyadh (UTC+3)
+        hearing = self.env['legal.hearing'].create({
+            'name': 'Evening Session',
+            'project_id': self.case.id,
+            'date': datetime.datetime(2024, 5, 9, 22, 30),
+            'user_id': self.lawyer.id,
+            'reminder_days': 1,
+        })
+        self.assertEqual(hearing.reminder_date, datetime.date(2024, 5, 9))
+        values = hearing._prepare_reminder_activity_values()
+        self.assertEqual(values['date_deadline'], datetime.date(2024, 5, 10))
+        self.assertEqual(values['summary'], 'Hearing: Evening Session')
+        self.assertEqual(values['user_id'], self.lawyer.id)
+
+    def test_cron_creates_deadline_activity(self):
+        deadline = self.env['legal.deadline'].create({
+            'name': 'File the memo',
+            'project_id': self.case.id,
+            'date_deadline': datetime.date.today() + datetime.timedelta(days=2),
+            'reminder_days': 7,
+        })
+        self.assertGreaterEqual(self.env['legal.deadline']._cron_send_reminders(), 1)
+        self.assertTrue(deadline.reminder_sent)
+        self.assertEqual(deadline.activity_id.summary, 'Deadline: File the memo')
+        self.assertEqual(deadline.activity_id.res_id, self.case.id)
+        self.assertEqual(deadline.activity_id.date_deadline, deadline.date_deadline)
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management Utilities
+Plain helpers shared by models and migration scripts.
+"""
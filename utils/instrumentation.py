@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Instrumentation
+Opt-in timing of the legal case hot paths.
+
+Instrumentation is enabled for one call with the ``legal_instrumentation``
+context key, or for the whole database with the
+``legal_practice_management.instrumentation`` system parameter. Every
+instrumented call then records its wall time, SQL query count, rows locked
+and the time of the locking statements, logs them as one JSON line and adds
+them to per-process counters. Only the outermost call of a name is recorded,
+so methods calling themselves (such as a write split per numbering scope)
+are not counted twice. When disabled, the only cost is a context lookup and a cached
+parameter read.
+"""
+
+import functools
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+_logger = logging.getLogger(__name__)
+
+INSTRUMENTATION_PARAM = 'legal_practice_management.instrumentation'
+INSTRUMENTATION_CONTEXT_KEY = 'legal_instrumentation'
+
+# Counters aggregated per instrumented name, for this worker process
+METRIC_FIELDS = ('calls', 'errors', 'seconds', 'max_seconds', 'queries', 'rows_locked', 'lock_statement_seconds')
+
+_local = threading.local()
+_metrics_lock = threading.Lock()
+_metrics = defaultdict(lambda: dict.fromkeys(METRIC_FIELDS, 0))
+
+
+def is_enabled(env):
+    """Is instrumentation enabled for this environment?"""
+    if INSTRUMENTATION_CONTEXT_KEY in env.context:
+        return bool(env.context[INSTRUMENTATION_CONTEXT_KEY])
+    return env['ir.config_parameter'].sudo().get_param(INSTRUMENTATION_PARAM, 'False').lower() in ('1', 'true')
+
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def record_lock(rows, seconds):
+    """Report locked rows and the wall time of the statement locking them.
+
+    The statement time includes any wait for the lock but also the work of
+    the statement itself; actual lock waits show in ``pg_stat_activity`` or
+    with ``log_lock_waits``. Called by lock holders such as the file number
+    allocator. The lock is
+    charged to every instrumented call currently running in this thread, so
+    an allocation made inside ``create`` shows up in both. Does nothing when
+    no instrumented call is running.
+    """
+    for frame in _stack():
+        frame['rows_locked'] += rows
+        frame['lock_statement_seconds'] += seconds
+
+
+@contextmanager
+def measure_locks():
+    """Collect the locks reported by ``record_lock`` within the block.
+
+    Works whether instrumentation is enabled or not, for callers measuring
+    one code path such as a stress harness; the yielded frame holds the
+    ``rows_locked`` and ``lock_statement_seconds`` of the current thread.
+    """
+    frame = {'name': None, 'rows_locked': 0, 'lock_statement_seconds': 0.0}
+    stack = _stack()
+    stack.append(frame)
+    try:
+        yield frame
+    finally:
+        stack.remove(frame)
+
+
+def instrumented(name):
+    """Decorate a model method so its calls can be measured.
+
+    Args:
+        name (str): Metric name, e.g. 'project.create'
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            stack = _stack()
+            if any(frame['name'] == name for frame in stack) or not is_enabled(self.env):
+                return method(self, *args, **kwargs)
+            frame = {'name': name, 'rows_locked': 0, 'lock_statement_seconds': 0.0}
+            stack.append(frame)
+            cr = self.env.cr
+            queries = cr.sql_log_count
+            started = time.perf_counter()
+            result = None
+            failed = True
+            try:
+                result = method(self, *args, **kwargs)
+                failed = False
+                return result
+            finally:
+                stack.pop()
+                # create() is called on an empty recordset and returns the records
+                _record(name, {
+                    'records': len(self) or len(getattr(result, '_ids', ())),
+                    'seconds': time.perf_counter() - started,
+                    'queries': cr.sql_log_count - queries,
+                    'rows_locked': frame['rows_locked'],
+                    'lock_statement_seconds': frame['lock_statement_seconds'],
+                    'error': failed,
+                })
+        return wrapper
+    return decorator
+
+
+def _record(name, sample):
+    with _metrics_lock:
+        metric = _metrics[name]
+        metric['calls'] += 1
+        metric['errors'] += int(sample['error'])
+        metric['seconds'] += sample['seconds']
+        metric['max_seconds'] = max(metric['max_seconds'], sample['seconds'])
+        metric['queries'] += sample['queries']
+        metric['rows_locked'] += sample['rows_locked']
+        metric['lock_statement_seconds'] += sample['lock_statement_seconds']
+    _logger.info(json.dumps({
+        'metric': name,
+        'records': sample['records'],
+        'ms': round(sample['seconds'] * 1000, 3),
+        'queries': sample['queries'],
+        'rows_locked': sample['rows_locked'],
+        'lock_statement_ms': round(sample['lock_statement_seconds'] * 1000, 3),
+        'error': sample['error'],
+    }))
+
+
+def get_metrics():
+    """Return a copy of the counters of this worker process."""
+    with _metrics_lock:
+        return {name: dict(metric) for name, metric in _metrics.items()}
+
+
+def reset_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+
+
+def format_prometheus(metrics):
+    """Render counters in the Prometheus text exposition format."""
+    lines = []
+    for field in METRIC_FIELDS:
+        metric_name = 'legal_practice_%s' % field
+        lines.append('# TYPE %s %s' % (metric_name, 'gauge' if field == 'max_seconds' else 'counter'))
+        for name, metric in sorted(metrics.items()):
+            lines.append('%s{operation="%s"} %s' % (metric_name, name, metric[field]))
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management Migration Helpers
+Chunked data migrations and online schema changes for large databases.
+"""
+
+import contextlib
+import logging
+
+from odoo.sql_db import db_connect
+from odoo.tools.sql import column_exists, create_column
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 10000
+
+# Tables with more (estimated) rows than this are migrated online
+ONLINE_MIN_ROWS = 100000
+
+
+def estimate_rows(cr, table):
+    """Return the planner estimate of the number of rows of a table.
+
+    Read from the catalog, so it costs nothing on large tables. Tables that
+    were never analyzed count as empty.
+    """
+    cr.execute("SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)", (table,))
+    row = cr.fetchone()
+    return max(int(row[0]), 0) if row else 0
+
+
+def add_column(cr, table, column, column_type, lock_timeout='5s'):
+    """Add a nullable column without default.
+
+    Postgres only updates its catalog for such a column, the table is not
+    rewritten. The exclusive table lock is still taken for an instant: the
+    statement gives up after ``lock_timeout`` instead of queueing every
+    request behind a long running transaction, and the upgrade can simply
+    be started again.
+
+    Args:
+        cr: Database cursor
+        table (str): Table to alter
+        column (str): New column
+        column_type (str): SQL type of the column
+        lock_timeout (str): Longest wait for the table lock
+
+    Returns:
+        bool: Whether the column was created
+    """
+    if column_exists(cr, table, column):
+        return False
+    cr.execute("SET LOCAL lock_timeout = %s", (lock_timeout,))
+    create_column(cr, table, column, column_type)
+    cr.execute("SET LOCAL lock_timeout = DEFAULT")
+    return True
+
+
+def get_index_state(cr, name):
+    """Return ``'valid'``, ``'invalid'`` (interrupted concurrent build) or
+    None when the index does not exist."""
+    cr.execute("""
+        SELECT i.indisvalid
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = %s AND pg_table_is_visible(c.oid)
+    """, (name,))
+    row = cr.fetchone()
+    if row is None:
+        return None
+    return 'valid' if row[0] else 'invalid'
+
+
+def index_sql(name, table, expressions, unique=False, method='btree', where=None, concurrently=False):
+    """Return the ``CREATE INDEX`` statement of an index."""
+    return 'CREATE {unique}INDEX {concurrently}IF NOT EXISTS "{name}" ON "{table}" USING {method} ({expressions}){where}'.format(
+        unique='UNIQUE ' if unique else '',
+        concurrently='CONCURRENTLY ' if concurrently else '',
+        name=name,
+        table=table,
+        method=method,
+        expressions=', '.join(expressions),
+        where=f' WHERE {where}' if where else '',
+    )
+
+
+@contextlib.contextmanager
+def autocommit_cursor(dbname):
+    """Yield a cursor on its own connection, outside of any transaction."""
+    with db_connect(dbname).cursor() as cr:
+        cr._cnx.autocommit = True
+        try:
+            yield cr
+        finally:
+            cr._cnx.autocommit = False
+
+
+def create_index_concurrently(dbname, name, table, expressions, unique=False, method='btree', where=None,
+                              replaces=None):
+    """Build an index with ``CREATE INDEX CONCURRENTLY``, without blocking
+    writes to the table.
+
+    A concurrent build waits for every transaction of the database holding
+    an older snapshot, the caller's included: never call it while a cursor
+    of the same database is in a transaction in this process (requests,
+    cron jobs), or both wait for each other forever. An invalid index left
+    by an interrupted build is dropped and built again.
+
+    Args:
+        dbname (str): Database name
+        name (str): Index name
+        table (str): Indexed table
+        expressions (list): Indexed columns or expressions
+        unique (bool): Whether the index is unique
+        method (str): Index access method
+        where (str): Predicate of a partial index
+        replaces (str): Index made redundant by this one, dropped once this
+            one is valid
+
+    Returns:
+        bool: Whether the index was built
+    """
+    with autocommit_cursor(dbname) as cr:
+        state = get_index_state(cr, name)
+        if state != 'valid':
+            if state == 'invalid':
+                cr.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+            cr.execute(index_sql(name, table, expressions, unique, method, where, concurrently=True))
+        if replaces and get_index_state(cr, name) == 'valid':
+            cr.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{replaces}"')
+    return state != 'valid'
+
+
+def iter_id_ranges(cr, table, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield consecutive ``[start, stop)`` id ranges covering a table.
+
+    Args:
+        cr: Database cursor
+        table (str): Table to walk
+        chunk_size (int): Width of each id range
+    """
+    cr.execute(f"SELECT MIN(id), MAX(id) FROM {table}")
+    min_id, max_id = cr.fetchone()
+    if min_id is None:
+        return
+    for start in range(min_id, max_id + 1, chunk_size):
+        yield start, start + chunk_size
+        _logger.info(
+            "Backfilling %s: ids up to %s of %s processed",
+            table, min(start + chunk_size - 1, max_id), max_id,
+        )
+
+
+def backfill_in_chunks(cr, table, assignment, params=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Run ``UPDATE table SET assignment`` over consecutive id ranges.
+
+    Every statement touches at most ``chunk_size`` ids, which keeps row locks,
+    WAL bursts and statement time bounded on large tables.
+
+    Args:
+        cr: Database cursor
+        table (str): Table to update, aliased as ``t`` in the statement
+        assignment (str): SQL ``SET`` clause, may use named parameters
+        params (dict): Named parameters for the assignment
+        chunk_size (int): Width of each id range
+
+    Returns:
+        int: Number of updated rows
+    """
+    updated = 0
+    for start, stop in iter_id_ranges(cr, table, chunk_size):
+        cr.execute(
+            f"UPDATE {table} AS t SET {assignment} WHERE t.id >= %(_start)s AND t.id < %(_stop)s",
+            dict(params or {}, _start=start, _stop=stop),
+        )
+        updated += cr.rowcount
+    return updated
+
+
+def backfill_with_python(cr, table, source_columns, target_columns, target_types, compute,
+                         where='TRUE', chunk_size=DEFAULT_CHUNK_SIZE):
+    """Fill columns from values computed in Python, one id range at a time.
+
+    Args:
+        cr: Database cursor
+        table (str): Table to update
+        source_columns (list): Columns read and passed to ``compute``
+        target_columns (list): Columns written with the computed values
+        target_types (list): SQL types of the target columns
+        compute (callable): Takes the source values of a row, returns a
+            tuple of values for the target columns (False is stored as NULL)
+        where (str): Extra SQL condition selecting the rows to process
+        chunk_size (int): Width of each id range
+
+    Returns:
+        int: Number of updated rows
+    """
+    assignment = ', '.join(
+        f'{column} = v.{column}::{column_type}'
+        for column, column_type in zip(target_columns, target_types)
+    )
+    updated = 0
+    for start, stop in iter_id_ranges(cr, table, chunk_size):
+        cr.execute(
+            f"SELECT id, {', '.join(source_columns)} FROM {table} "
+            f"WHERE id >= %s AND id < %s AND ({where})",
+            (start, stop),
+        )
+        rows = [
+            (row[0],) + tuple(None if value is False else value for value in compute(*row[1:]))
+            for row in cr.fetchall()
+        ]
+        if not rows:
+            continue
+        values = ', '.join(['%s'] * len(rows))
+        cr.execute(
+            f"UPDATE {table} AS t SET {assignment} "
+            f"FROM (VALUES {values}) AS v(id, {', '.join(target_columns)}) "
+            f"WHERE t.id = v.id",
+            rows,
+        )
+        updated += cr.rowcount
+    return updated
+
+
+def move_columns(cr, source_table, target_table, link_column, columns, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Move columns of a table into rows of a one-to-one side table.
+
+    Every source row with at least one non-null value gets a new target row
+    holding the values, linked back through ``link_column``. Target ids are
+    drawn from the target sequence up front, so each id range is moved with
+    a single statement. Source rows already linked are skipped, which makes
+    the move resumable.
+
+    Args:
+        cr: Database cursor
+        source_table (str): Table the columns are moved out of
+        target_table (str): Side table receiving the values
+        link_column (str): Column of the source table referencing the side table
+        columns (list): Columns present in both tables
+        chunk_size (int): Width of each id range
+
+    Returns:
+        int: Number of moved rows
+    """
+    column_list = ', '.join(columns)
+    not_empty = ' OR '.join(f'{column} IS NOT NULL' for column in columns)
+    moved = 0
+    for start, stop in iter_id_ranges(cr, source_table, chunk_size):
+        cr.execute(f"""
+            WITH source AS MATERIALIZED (
+                SELECT id AS owner_id, nextval('{target_table}_id_seq') AS target_id, {column_list}
+                FROM {source_table}
+                WHERE id >= %(start)s AND id < %(stop)s
+                AND {link_column} IS NULL AND ({not_empty})
+            ), inserted AS (
+                INSERT INTO {target_table} (id, {column_list}, create_uid, create_date, write_uid, write_date)
+                SELECT target_id, {column_list}, 1, NOW() AT TIME ZONE 'UTC', 1, NOW() AT TIME ZONE 'UTC'
+                FROM source
+            )
+            UPDATE {source_table} AS t
+            SET {link_column} = source.target_id
+            FROM source
+            WHERE t.id = source.owner_id
+        """, {'start': start, 'stop': stop})
+        moved += cr.rowcount
+    return moved
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management Normalization
+Text folding shared by imports, lookups and search keys.
+"""
+
+import datetime
+import re
+import unicodedata
+
+try:
+    import phonenumbers
+except ImportError:
+    phonenumbers = None
+
+# Arabic-Indic (U+0660..U+0669) and Extended Arabic-Indic (U+06F0..U+06F9) digits
+DIGIT_TRANSLATION = str.maketrans(
+    '٠١٢٣٤٥٦٧٨٩'
+    '۰۱۲۳۴۵۶۷۸۹',
+    '0123456789' * 2,
+)
+
+
+def fold_digits(value):
+    """Replace Arabic-Indic digits by their ASCII equivalents."""
+    return value.translate(DIGIT_TRANSLATION) if value else value
+
+
+def normalize_label(value):
+    """Case-fold and collapse whitespace, for in-memory lookup tables."""
+    return ' '.join(str(value).split()).casefold() if value else ''
+
+
+# Separators dropped from identity numbers: whitespace and the common dashes
+IDENTIFIER_SEPARATORS = re.compile(r'[\s\-‐-―−_]+')
+
+
+def normalize_identifier(value):
+    """Build the lookup key of an identity number (national ID, passport,
+    commercial register, tax number).
+
+    Separators are stripped, Arabic-Indic digits folded and letters
+    upper-cased, so '29801-0112 345' and '٢٩٨٠١٠١١٢٣٤٥' share one key.
+    """
+    if not value:
+        return False
+    return IDENTIFIER_SEPARATORS.sub('', fold_digits(value)).upper() or False
+
+
+PHONE_NON_DIGITS = re.compile(r'\D+')
+
+
+def normalize_phone(value, region=False, calling_code=False):
+    """Normalize a phone number to E.164 for exact, indexed lookups.
+
+    Arabic-Indic digits are folded first. The phonenumbers library is used
+    when installed; otherwise separators are stripped, a '00' prefix becomes
+    '+', and national numbers get the default calling code in place of
+    their trunk '0'.
+
+    Args:
+        value (str): Phone number as typed
+        region (str): ISO code of the default country, e.g. 'EG'
+        calling_code (int): Calling code of the default country, e.g. 20
+
+    Returns:
+        str: '+201001234567', bare digits when the number is national and
+        no default country is known, or False
+    """
+    if not value:
+        return False
+    value = fold_digits(value).strip()
+    if phonenumbers:
+        try:
+            parsed = phonenumbers.parse(value, region.upper() if region else None)
+        except phonenumbers.NumberParseException:
+            parsed = None
+        if parsed and phonenumbers.is_possible_number(parsed):
+            return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+    digits = PHONE_NON_DIGITS.sub('', value)
+    if not digits:
+        return False
+    if value.startswith('+'):
+        return '+' + digits
+    if digits.startswith('00'):
+        return '+' + digits[2:]
+    if calling_code:
+        return '+%s%s' % (calling_code, digits.lstrip('0'))
+    return digits
+
+
+# Arabic short vowels, shadda, sukun, dagger alef and tatweel
+ARABIC_MARKS = re.compile('[ـً-ٰٟ]')
+ARABIC_LETTER_VARIANTS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ة': 'ه', 'ى': 'ي', 'ؤ': 'و', 'ئ': 'ي',
+})
+NON_WORD = re.compile(r'[\W_]+')
+
+# Consonant skeleton used by phonetic_key. Vowels, semivowels, alef, hamza
+# and ain are dropped so Arabic and Latin spellings reduce to the same key.
+PHONETIC_DIGRAPHS = [('kh', 'k'), ('sh', 's'), ('th', 't'), ('dh', 'd'), ('gh', 'j'), ('ph', 'f'), ('ck', 'k')]
+PHONETIC_LETTERS = str.maketrans({
+    'ب': 'b', 'ت': 't', 'ث': 't', 'ج': 'j', 'ح': 'h', 'خ': 'k', 'د': 'd',
+    'ذ': 'z', 'ر': 'r', 'ز': 'z', 'س': 's', 'ش': 's', 'ص': 's', 'ض': 'd',
+    'ط': 't', 'ظ': 'z', 'غ': 'j', 'ف': 'f', 'ق': 'k', 'ك': 'k', 'ل': 'l',
+    'م': 'm', 'ن': 'n', 'ه': 'h',
+    'g': 'j', 'q': 'k', 'c': 'k', 'x': 'ks', 'v': 'f', 'p': 'b',
+})
+PHONETIC_DROPPED = re.compile('[aeiouywءاعوي]')
+
+
+def normalize_name(value):
+    """Normalize a person or company name for matching.
+
+    Latin accents and Arabic diacritics are removed, Arabic letter variants
+    unified (alef forms, taa marbuta, alef maqsura), punctuation dropped and
+    whitespace collapsed, then the result is case-folded.
+    """
+    if not value:
+        return False
+    value = unicodedata.normalize('NFKD', fold_digits(value))
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    value = ARABIC_MARKS.sub('', value).translate(ARABIC_LETTER_VARIANTS)
+    return ' '.join(NON_WORD.sub(' ', value).split()).casefold() or False
+
+
+def build_search_text(values):
+    """Concatenate the normalized values into one searchable text.
+
+    Values are separated by ' / ', which normalized search terms never
+    contain, so a term cannot match across two fields.
+    """
+    return ' / '.join(filter(None, map(normalize_name, values))) or False
+
+
+def phonetic_key(value):
+    """Build a script-independent phonetic key of a name.
+
+    Both 'Mohamed Abdallah' and 'محمد عبدالله' reduce to 'mhmdbdl': letters
+    are mapped to consonant classes, vowels dropped, repeated letters
+    collapsed, word-final 'h' removed, and the words concatenated so spacing
+    differences (e.g. 'Al Sayed' / 'السيد') do not matter.
+    """
+    name = normalize_name(value)
+    if not name:
+        return False
+    words = []
+    for word in name.split():
+        for digraph, replacement in PHONETIC_DIGRAPHS:
+            word = word.replace(digraph, replacement)
+        word = PHONETIC_DROPPED.sub('', word.translate(PHONETIC_LETTERS))
+        word = re.sub(r'(.)\1+', r'\1', word)
+        if len(word) > 1 and word.endswith('h'):
+            word = word[:-1]
+        words.append(word)
+    return ''.join(words) or False
+
+
+def parse_case_number(value):
+    """Split a court docket reference into its number and year.
+
+    Accepts Arabic-Indic digits and any separator, e.g. '1234/2023',
+    '1234 - 2023', '١٢٣٤ لسنة ٢٠٢٣' or '2023/1234'. A four digit group in a
+    plausible range is taken as the year, two digit years are expanded.
+
+    Returns:
+        tuple: (number, year), each an int or False
+    """
+    if not value:
+        return False, False
+    groups = re.findall(r'\d+', fold_digits(value))
+    if not groups:
+        return False, False
+    if len(groups) == 1:
+        return _as_int4(groups[0]), False
+
+    year_index = next(
+        (index for index in range(len(groups) - 1, -1, -1)
+         if len(groups[index]) == 4 and 1900 <= int(groups[index]) <= 2100),
+        None,
+    )
+    if year_index is None:
+        if len(groups[-1]) != 2:
+            return _as_int4(groups[0]), False
+        year_index = len(groups) - 1
+    year = int(groups[year_index])
+    if len(groups[year_index]) == 2:
+        current = datetime.date.today().year
+        year += 2000 if 2000 + year <= current else 1900
+    number = next(group for index, group in enumerate(groups) if index != year_index)
+    return _as_int4(number), year
+
+
+def _as_int4(digits):
+    """Return the digits as an int if they fit an INTEGER column, else False."""
+    number = int(digits)
+    return number if number < 2 ** 31 else False
@@ -0,0 +1,2 @@
+from . import legal_case_import
+from . import legal_lead_convert
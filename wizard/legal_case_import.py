@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Case Import
+Streaming bulk import of legal case registers into project.project.
+"""
+
+import base64
+import csv
+import datetime
+import io
+import logging
+import tempfile
+import time
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+from ..config.settings import LEGAL_CASE_FIELDS
+from ..utils.normalize import fold_digits, normalize_label
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+_logger = logging.getLogger(__name__)
+
+# Columns accepted besides LEGAL_CASE_FIELDS
+IMPORT_NAME_COLUMN = 'name'
+IMPORT_TAGS_COLUMN = 'tags'
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%Y/%m/%d')
+
+
+class LegalCaseImport(models.TransientModel):
+    """Import a case register from CSV or XLSX.
+
+    Rows are streamed from the uploaded file with a generator and created in
+    batches, so memory use depends on the batch size and not on the file size.
+    The column contract is ``name`` plus ``LEGAL_CASE_FIELDS`` and an optional
+    comma separated ``tags`` column.
+    """
+    _name = 'legal.case.import'
+    _description = 'Legal Case Import'
+
+    data_file = fields.Binary(string=_("File"), required=True)
+    filename = fields.Char(string=_("File Name"))
+    entity_type = fields.Selection(
+        [('case', _('Case')), ('matter', _('Matter'))],
+        string=_("Import As"),
+        default='case',
+        required=True
+    )
+    batch_size = fields.Integer(string=_("Batch Size"), default=1000, required=True)
+    assign_file_numbers = fields.Boolean(
+        string=_("Assign Missing File Numbers"),
+        default=True,
+        help=_("Reserve office file numbers for rows without one, as one block per batch")
+    )
+    run_conflict_check = fields.Boolean(
+        string=_("Run Conflict Check"),
+        help=_("Check the imported cases for conflicts of interest and log the hits on each case")
+    )
+    state = fields.Selection([('draft', 'Draft'), ('done', 'Done')], default='draft')
+    imported_count = fields.Integer(string=_("Imported Rows"), readonly=True)
+    rejected_count = fields.Integer(string=_("Rejected Rows"), readonly=True)
+    rows_per_second = fields.Float(string=_("Rows per Second"), readonly=True, digits=(16, 1))
+    reject_file = fields.Binary(string=_("Rejected Rows File"), readonly=True)
+    reject_filename = fields.Char(string=_("Rejected Rows File Name"), readonly=True)
+
+    # ========== Actions ==========
+
+    def action_import(self):
+        """Run the import and show its summary in the wizard."""
+        self.ensure_one()
+        if self.batch_size <= 0:
+            raise UserError(_("The batch size must be a positive number."))
+
+        with self._open_data_file() as fileobj, tempfile.TemporaryFile('w+', newline='', encoding='utf-8') as rejects:
+            stats = self._import_stream(
+                fileobj,
+                self._get_file_type(),
+                batch_size=self.batch_size,
+                entity_type=self.entity_type,
+                assign_file_numbers=self.assign_file_numbers,
+                reject_stream=rejects,
+                conflict_check=self.run_conflict_check,
+            )
+            vals = {
+                'state': 'done',
+                'imported_count': stats['imported'],
+                'rejected_count': stats['rejected'],
+                'rows_per_second': stats['rows_per_second'],
+            }
+            if stats['rejected']:
+                rejects.seek(0)
+                vals.update({
+                    'reject_file': base64.b64encode(rejects.read().encode('utf-8')),
+                    'reject_filename': 'rejected_%s.csv' % (self.filename or 'cases').rsplit('.', 1)[0],
+                })
+        self.write(vals)
+
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    # ========== Streaming Pipeline ==========
+
+    @api.model
+    def _import_stream(self, fileobj, file_type, batch_size=1000, entity_type='case',
+                       assign_file_numbers=True, reject_stream=None, auto_commit=False,
+                       conflict_check=False):
+        """Import legal cases from a binary file object.
+
+        Args:
+            fileobj: Binary file object positioned at the start of the file
+            file_type (str): 'csv' or 'xlsx'
+            batch_size (int): Number of rows passed to each create() call
+            entity_type (str): 'case' or 'matter', selects the tag to apply
+            assign_file_numbers (bool): Reserve file numbers for unnumbered rows
+            reject_stream: Text stream receiving the rejected rows as CSV
+            auto_commit (bool): Commit after every batch (shell / cron usage)
+            conflict_check (bool): Run the conflict check on every created batch
+
+        Returns:
+            dict: Imported and rejected row counts and throughput
+        """
+        rows = self._iter_csv_rows(fileobj) if file_type == 'csv' else self._iter_xlsx_rows(fileobj)
+        lookups = self._prepare_lookup_tables()
+        reject_writer = None
+        if reject_stream is not None:
+            reject_writer = csv.writer(reject_stream)
+            reject_writer.writerow(['line', 'error', IMPORT_NAME_COLUMN] + LEGAL_CASE_FIELDS + [IMPORT_TAGS_COLUMN])
+
+        Project = self.env['project.project'].with_context(
+            create_from_cases=entity_type == 'case',
+            create_from_matters=entity_type == 'matter',
+            assign_office_file_number=assign_file_numbers,
+            legal_conflict_check=conflict_check,
+            tracking_disable=True,
+            mail_create_nolog=True,
+            mail_create_nosubscribe=True,
+        )
+        stats = {'imported': 0, 'rejected': 0}
+        started = time.monotonic()
+
+        def reject(line, row, error):
+            stats['rejected'] += 1
+            if reject_writer:
+                reject_writer.writerow(
+                    [line, error, row.get(IMPORT_NAME_COLUMN)]
+                    + [row.get(name) for name in LEGAL_CASE_FIELDS]
+                    + [row.get(IMPORT_TAGS_COLUMN)]
+                )
+
+        batch = []
+        for line, row in enumerate(rows, start=2):
+            try:
+                batch.append((line, row, self._row_to_vals(row, lookups)))
+            except (ValueError, UserError) as e:
+                reject(line, row, str(e))
+                continue
+            if len(batch) >= batch_size:
+                self._create_batch(Project, batch, stats, reject)
+                batch = []
+                if auto_commit:
+                    self.env.cr.commit()  # pylint: disable=invalid-commit
+                self._log_progress(stats, started)
+        if batch:
+            self._create_batch(Project, batch, stats, reject)
+            if auto_commit:
+                self.env.cr.commit()  # pylint: disable=invalid-commit
+
+        elapsed = time.monotonic() - started
+        stats['rows_per_second'] = (stats['imported'] + stats['rejected']) / elapsed if elapsed else 0.0
+        self._log_progress(stats, started)
+        return stats
+
+    @api.model
+    def _create_batch(self, Project, batch, stats, reject):
+        """Create one batch, isolating the failing rows if the batch fails.
+
+        create() fills in the values it is given, e.g. the file numbers of a
+        reserved block, so each attempt gets its own copies: a row retried
+        after a rolled back batch is numbered again, not as a manual entry.
+        """
+        try:
+            with self.env.cr.savepoint():
+                Project.create([dict(vals) for _line, _row, vals in batch])
+            stats['imported'] += len(batch)
+        except Exception:
+            for line, row, vals in batch:
+                try:
+                    with self.env.cr.savepoint():
+                        Project.create([dict(vals)])
+                    stats['imported'] += 1
+                except Exception as e:
+                    reject(line, row, str(e))
+        # Drop the created records from the cache to keep memory flat
+        self.env.invalidate_all()
+
+    @api.model
+    def _log_progress(self, stats, started):
+        elapsed = time.monotonic() - started
+        processed = stats['imported'] + stats['rejected']
+        _logger.info(
+            "Legal case import: %s rows imported, %s rejected (%.0f rows/s)",
+            stats['imported'], stats['rejected'], processed / elapsed if elapsed else 0.0,
+        )
+
+    @api.model
+    def _iter_csv_rows(self, fileobj):
+        """Yield CSV rows as dicts keyed by the header line."""
+        text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+        try:
+            yield from csv.DictReader(text)
+        finally:
+            text.detach()
+
+    @api.model
+    def _iter_xlsx_rows(self, fileobj):
+        """Yield rows of the first XLSX sheet as dicts keyed by the header row."""
+        if openpyxl is None:
+            raise UserError(_("The openpyxl library is required to import XLSX files."))
+        workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = [str(cell).strip() if cell is not None else '' for cell in next(rows, ())]
+            for values in rows:
+                if any(value is not None for value in values):
+                    yield dict(zip(header, values))
+        finally:
+            workbook.close()
+
+    # ========== Row Mapping ==========
+
+    @api.model
+    def _prepare_lookup_tables(self):
+        """Load the court spellings, tags and selection labels once per import."""
+        self.env.cr.execute("""
+            SELECT DISTINCT court_name
+            FROM project_project
+            WHERE court_name IS NOT NULL
+        """)
+        courts = {normalize_label(name): name for name, in self.env.cr.fetchall()}
+        tags = {
+            normalize_label(tag['name']): tag['id']
+            for tag in self.env['project.tags'].search_read([], ['name'])
+        }
+        selections = {}
+        for name in ('client_status', 'opponent_status'):
+            field = self.env['project.project']._fields[name]
+            options = {}
+            for key, label in field._description_selection(self.env):
+                options[normalize_label(key)] = key
+                options[normalize_label(label)] = key
+            selections[name] = options
+        return {'courts': courts, 'tags': tags, 'selections': selections}
+
+    @api.model
+    def _row_to_vals(self, row, lookups):
+        """Convert one source row into create() values.
+
+        Raises:
+            ValueError: If the row cannot be imported
+        """
+        name = self._cell_text(row.get(IMPORT_NAME_COLUMN))
+        if not name:
+            raise ValueError(_("Missing project name."))
+        vals = {'name': name}
+
+        for field_name in LEGAL_CASE_FIELDS:
+            value = row.get(field_name)
+            if value is None or value == '':
+                continue
+            if field_name == 'office_file_number':
+                vals[field_name] = self._parse_file_number(value)
+            elif field_name == 'lawsuit_filing_date':
+                vals[field_name] = self._parse_date(value)
+            elif field_name in lookups['selections']:
+                key = lookups['selections'][field_name].get(normalize_label(value))
+                if not key:
+                    raise ValueError(_("Invalid value for %s: %s") % (field_name, value))
+                vals[field_name] = key
+            elif field_name == 'court_name':
+                text = self._cell_text(value)
+                vals[field_name] = lookups['courts'].setdefault(normalize_label(text), text)
+            else:
+                vals[field_name] = self._cell_text(value)
+
+        tag_names = self._cell_text(row.get(IMPORT_TAGS_COLUMN))
+        if tag_names:
+            vals['tag_ids'] = [(4, self._resolve_tag(tag_name, lookups)) for tag_name in tag_names.split(',') if tag_name.strip()]
+        return vals
+
+    @api.model
+    def _resolve_tag(self, tag_name, lookups):
+        """Return the id of a tag, creating it the first time it is seen."""
+        key = normalize_label(tag_name)
+        if key not in lookups['tags']:
+            lookups['tags'][key] = self.env['project.tags'].create({'name': tag_name.strip()}).id
+        return lookups['tags'][key]
+
+    @api.model
+    def _cell_text(self, value):
+        if value is None:
+            return ''
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return str(value).strip()
+
+    @api.model
+    def _parse_file_number(self, value):
+        try:
+            number = int(float(fold_digits(self._cell_text(value))))
+        except ValueError:
+            raise ValueError(_("Invalid file number: %s") % value)
+        if number <= 0:
+            raise ValueError(_("File number must be a positive integer: %s") % value)
+        return number
+
+    @api.model
+    def _parse_date(self, value):
+        if isinstance(value, datetime.datetime):
+            return value.date()
+        if isinstance(value, datetime.date):
+            return value
+        text = fold_digits(self._cell_text(value))
+        for date_format in DATE_FORMATS:
+            try:
+                return datetime.datetime.strptime(text, date_format).date()
+            except ValueError:
+                continue
+        raise ValueError(_("Invalid filing date: %s") % value)
+
+    # ========== File Access ==========
+
+    def _get_file_type(self):
+        filename = (self.filename or '').lower()
+        if filename.endswith('.xlsx'):
+            return 'xlsx'
+        if filename.endswith('.csv'):
+            return 'csv'
+        raise UserError(_("Only CSV and XLSX files can be imported."))
+
+    def _open_data_file(self):
+        """Open the uploaded file without decoding it in memory when possible."""
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'data_file'),
+            ('res_id', '=', self.id),
+        ], limit=1)
+        if attachment.store_fname:
+            return open(attachment._full_path(attachment.store_fname), 'rb')
+        return io.BytesIO(base64.b64decode(self.with_context(bin_size=False).data_file))
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+legal practice management - Lead Conversion
+Batched conversion of leads into clients, optionally opening their cases.
+"""
+
+import logging
+from collections import defaultdict
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+
+class LegalLeadConvert(models.TransientModel):
+    """Convert many leads into clients at once.
+
+    Each batch finds the existing clients of its leads by identity number
+    with one query, creates the missing partners with one ``create`` that
+    carries the CLIENT_FIELDS profile, fills the profile fields existing
+    clients are missing with one write per distinct set of values, converts
+    the leads with a constant number of writes, and can open one case per
+    lead with a block of office file numbers reserved in a single statement.
+    """
+    _name = 'legal.lead.convert'
+    _description = 'Legal Lead Conversion'
+
+    lead_ids = fields.Many2many('crm.lead', string=_("Leads"), required=True)
+    create_cases = fields.Boolean(
+        string=_("Open a Case per Lead"),
+        help=_("Create a project for each converted lead, with its office file number already allocated")
+    )
+    entity_type = fields.Selection(
+        [('case', _('Case')), ('matter', _('Matter'))],
+        string=_("Open As"),
+        default='case',
+        required=True
+    )
+    batch_size = fields.Integer(string=_("Batch Size"), default=500, required=True)
+    state = fields.Selection([('draft', 'Draft'), ('done', 'Done')], default='draft')
+    created_partner_count = fields.Integer(string=_("New Clients"), readonly=True)
+    matched_partner_count = fields.Integer(string=_("Existing Clients"), readonly=True)
+    created_case_count = fields.Integer(string=_("Opened Cases"), readonly=True)
+
+    @api.model
+    def default_get(self, fields_list):
+        values = super().default_get(fields_list)
+        if 'lead_ids' in fields_list and self.env.context.get('active_model') == 'crm.lead':
+            values['lead_ids'] = [(6, 0, self.env.context.get('active_ids', []))]
+        return values
+
+    # ========== Actions ==========
+
+    def action_convert(self):
+        """Convert the leads and show the summary in the wizard."""
+        self.ensure_one()
+        if self.batch_size <= 0:
+            raise UserError(_("The batch size must be a positive number."))
+        stats = defaultdict(int)
+        leads = self.lead_ids
+        for start in range(0, len(leads), self.batch_size):
+            batch_stats = self._convert_batch(leads[start:start + self.batch_size])
+            for key, value in batch_stats.items():
+                stats[key] += value
+        _logger.info(
+            "Converted %s leads: %s new clients, %s existing clients, %s cases",
+            len(leads), stats['created'], stats['matched'], stats['cases'],
+        )
+        self.write({
+            'state': 'done',
+            'created_partner_count': stats['created'],
+            'matched_partner_count': stats['matched'],
+            'created_case_count': stats['cases'],
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    def _convert_batch(self, leads):
+        """Convert one batch of leads.
+
+        Returns:
+            dict: Numbers of created and matched partners and opened cases
+        """
+        partners = {lead.id: lead.partner_id for lead in leads if lead.partner_id}
+        matched = leads.filtered(lambda lead: not lead.partner_id)._find_identity_partners()
+        partners.update(matched)
+
+        # One new partner per identity number, so leads of the same client share it
+        new_leads = leads.filtered(lambda lead: lead.id not in partners)
+        vals_list = []
+        lead_vals_index = {}
+        key_vals_index = {}
+        for lead in new_leads:
+            keys = lead._get_identity_match_keys()
+            index = next((key_vals_index[key] for key in keys if key in key_vals_index), None)
+            if index is None:
+                index = len(vals_list)
+                vals_list.append(lead._prepare_customer_values(
+                    lead.partner_name or lead.contact_name or lead.name, is_company=bool(lead.partner_name)))
+            for key in keys:
+                key_vals_index.setdefault(key, index)
+            lead_vals_index[lead.id] = index
+        new_partners = self.env['res.partner'].create(vals_list) if vals_list else self.env['res.partner']
+        for lead_id, index in lead_vals_index.items():
+            partners[lead_id] = new_partners[index]
+
+        # Existing clients only get the profile fields they are missing; the
+        # values of several leads of one client are merged, first lead first
+        missing_by_partner = defaultdict(dict)
+        for lead in leads.filtered(lambda lead: lead.id in matched or lead.partner_id):
+            partner = partners[lead.id]
+            for name, value in lead._get_client_field_values().items():
+                if value and not partner[name]:
+                    missing_by_partner[partner].setdefault(name, value)
+        partners_by_missing = defaultdict(lambda: self.env['res.partner'])
+        for partner, missing in missing_by_partner.items():
+            partners_by_missing[tuple(sorted(missing.items()))] |= partner
+        for missing, missing_partners in partners_by_missing.items():
+            missing_partners.write(dict(missing))
+
+        self._convert_to_opportunities(leads, partners)
+
+        cases = self._create_cases(leads, partners) if self.create_cases else []
+        return {'created': len(new_partners), 'matched': len(matched), 'cases': len(cases)}
+
+    def _convert_to_opportunities(self, leads, partners):
+        """Turn the leads into opportunities of their clients, set-based.
+
+        Does what ``crm.lead.convert_opportunity`` does lead by lead: the
+        type and conversion dates are written once for the whole batch, the
+        default stage once per sales team, and the clients with a single
+        UPDATE, after which the fields computed from the customer are
+        recomputed in batch.
+        """
+        Lead = self.env['crm.lead']
+        convertible = leads.filtered(lambda lead: lead.type == 'lead' and lead.active and lead.probability < 100)
+        if convertible:
+            now = self.env.cr.now()
+            convertible.write({'type': 'opportunity', 'date_open': now, 'date_conversion': now})
+            unstaged = defaultdict(lambda: Lead)
+            for lead in convertible.filtered(lambda lead: not lead.stage_id):
+                unstaged[lead.team_id] |= lead
+            for team, team_leads in unstaged.items():
+                team_leads.write({'stage_id': team_leads._stage_find(team_id=team.id).id})
+
+        moved = leads.filtered(lambda lead: lead.partner_id != partners[lead.id])
+        if not moved:
+            return
+        Lead.flush_model(['partner_id'])
+        self.env.cr.execute("""
+            UPDATE crm_lead AS l
+            SET partner_id = v.partner_id,
+                write_uid = %s,
+                write_date = NOW() AT TIME ZONE 'UTC'
+            FROM unnest(%s::int[], %s::int[]) AS v(id, partner_id)
+            WHERE l.id = v.id
+        """, (self.env.uid, moved.ids, [partners[lead.id].id for lead in moved]))
+        moved.invalidate_recordset(['partner_id', 'write_uid', 'write_date'])
+        moved.modified(['partner_id'])
+
+    def _create_cases(self, leads, partners):
+        """Open one project per lead, reserving their file numbers as one block."""
+        context = {
+            'assign_office_file_number': True,
+            'create_from_cases': self.entity_type == 'case',
+            'create_from_matters': self.entity_type == 'matter',
+        }
+        return self.env['project.project'].with_context(**context).create([
+            {'name': lead.name, 'partner_id': partners[lead.id].id}
+            for lead in leads
+        ])